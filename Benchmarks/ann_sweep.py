@@ -0,0 +1,169 @@
+"""Recall@k vs. latency sweep of HNSWVectorStore parameters for choosing production operating points.
+
+By default the sweep runs over the real TheBatch corpus, reading documents and embeddings from the
+persisted Chroma text collection. Queries are corpus embeddings with small Gaussian noise, and
+recall@k is measured against exact brute-force cosine search. Points on the recall/latency Pareto
+front are flagged in the JSON report.
+
+Usage:
+    python -m Benchmarks.ann_sweep --M 8 16 32 --ef-construction 100 200 --ef-search 16 32 64 128 256
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import datetime
+import tempfile
+import logging
+import json
+import time
+import os
+
+import numpy as np
+
+from Embedding.text_embedding import TextEmbeddingI
+from Schema.schema import BaseDocument, TextDocument
+from VectorStore.document_columns import DocumentColumns
+from VectorStore.hnsw_vector_store import HNSWVectorStore
+from Internals.logger import logger
+
+
+class _RandomTextEmbedding(TextEmbeddingI):
+    """Encodes sentences to random unit vectors. The sweep searches with precomputed query vectors,
+    so the store's embedding function only needs to produce vectors of the corpus dimension."""
+
+    def __init__(self, dim: int, seed: int = 0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        embeddings = self.rng.normal(size=(len(sentences), self.dim))
+        return (embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)).astype(np.float32)
+
+
+def load_chroma_corpus(persist_directory: str, collection_name: str) -> Tuple[List[BaseDocument], np.ndarray]:
+    """Reads every document and embedding of a persisted Chroma collection."""
+    import chromadb
+
+    collection = chromadb.PersistentClient(path=persist_directory).get_collection(collection_name)
+    data = collection.get(include=['embeddings', 'metadatas'])
+    documents = []
+    for metadata in data['metadatas']:
+        metadata = {name: value for name, value in metadata.items() if value is not None}
+        documents.append(DocumentColumns.document_types[metadata.pop('type')](**metadata))
+    return documents, np.asarray(data['embeddings'], dtype=np.float32)
+
+
+def synthetic_corpus(num_docs: int, dim: int, seed: int = 0) -> Tuple[List[BaseDocument], np.ndarray]:
+    """Clustered unit vectors, used when no persisted corpus is available."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(num_docs // 100, 1), dim))
+    embeddings = centers[rng.integers(0, len(centers), num_docs)] + 0.5 * rng.normal(size=(num_docs, dim))
+    documents = [TextDocument(id=str(index), content=f'doc {index}') for index in range(num_docs)]
+    return documents, embeddings.astype(np.float32)
+
+
+def _pareto_front(points: List[Dict[str, Any]]) -> None:
+    """Flags points not dominated by a point with higher-or-equal recall and lower-or-equal p50 latency."""
+    for point in points:
+        point['pareto'] = not any(
+            other is not point
+            and other['recall_at_k'] >= point['recall_at_k']
+            and other['latency_ms']['p50'] <= point['latency_ms']['p50']
+            and (other['recall_at_k'] > point['recall_at_k'] or other['latency_ms']['p50'] < point['latency_ms']['p50'])
+            for other in points)
+
+
+def sweep(documents: List[BaseDocument],
+          embeddings: np.ndarray,
+          Ms: List[int],
+          ef_constructions: List[int],
+          ef_searches: List[int],
+          k: int = 10,
+          num_queries: int = 200,
+          query_noise: float = 0.1,
+          seed: int = 0
+          ) -> List[Dict[str, Any]]:
+    """Builds one HNSW index per (M, ef_construction) and measures recall@k and latency for every ef_search."""
+    rng = np.random.default_rng(seed)
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    queries = normalized[rng.integers(0, len(normalized), num_queries)]
+    queries = queries + query_noise * rng.normal(size=queries.shape) / np.sqrt(queries.shape[1])
+    exact = np.argsort(-(queries @ normalized.T), axis=1)[:, :k]
+    exact_ids = [{documents[index].id for index in row} for row in exact]
+
+    points = []
+    for M in Ms:
+        for ef_construction in ef_constructions:
+            with tempfile.TemporaryDirectory() as persist_directory:
+                store = HNSWVectorStore(embedding_function=_RandomTextEmbedding(embeddings.shape[1], seed),
+                                        persist_directory=persist_directory,
+                                        M=M,
+                                        ef_construction=ef_construction)
+                start = time.perf_counter()
+                store.add_documents(documents, embeddings)
+                build_seconds = time.perf_counter() - start
+                store.save()
+                index_bytes = sum(os.path.getsize(os.path.join(persist_directory, name)) for name in os.listdir(persist_directory))
+                for ef_search in ef_searches:
+                    store.ef_search = ef_search
+                    latencies, recalls = [], []
+                    for query, relevant in zip(queries, exact_ids):
+                        start = time.perf_counter()
+                        retrieved = store.similarity_search_by_vector(query, k)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        recalls.append(len({document.id for document, _ in retrieved} & relevant) / k)
+                    points.append({'M': M,
+                                   'ef_construction': ef_construction,
+                                   'ef_search': ef_search,
+                                   'recall_at_k': float(np.mean(recalls)),
+                                   'latency_ms': {'p50': float(np.percentile(latencies, 50)),
+                                                  'p99': float(np.percentile(latencies, 99))},
+                                   'build_seconds': build_seconds,
+                                   'index_bytes': index_bytes})
+                    logger.warning("M=%s ef_construction=%s ef_search=%s recall@%s=%.3f p50=%.3fms",
+                                   M, ef_construction, ef_search, k, points[-1]['recall_at_k'], points[-1]['latency_ms']['p50'])
+    _pareto_front(points)
+    return points
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Sweep HNSW parameters and report recall@k vs latency.")
+    arg_parser.add_argument("--source", choices=['chroma', 'synthetic'], default='chroma')
+    arg_parser.add_argument("--persist-directory", type=str, default=None, help="Chroma directory. Defaults to TheBatch store.")
+    arg_parser.add_argument("--collection-name", type=str, default=None, help="Chroma collection. Defaults to TheBatch collection.")
+    arg_parser.add_argument("--num-docs", type=int, default=20000, help="Synthetic corpus size.")
+    arg_parser.add_argument("--dim", type=int, default=384, help="Synthetic corpus dimension.")
+    arg_parser.add_argument("--M", nargs='+', type=int, default=[8, 16, 32])
+    arg_parser.add_argument("--ef-construction", nargs='+', type=int, default=[100, 200])
+    arg_parser.add_argument("--ef-search", nargs='+', type=int, default=[16, 32, 64, 128, 256])
+    arg_parser.add_argument("--k", type=int, default=10)
+    arg_parser.add_argument("--num-queries", type=int, default=200)
+    arg_parser.add_argument("--output", type=str, default=None, help="JSON output path. Defaults to stdout.")
+    args = arg_parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    if args.source == 'chroma':
+        from TheBatch.the_batch_configs import THE_BATCH_VECTORESTORE_PERSIST_DIR, COLLECTION_NAME
+
+        documents, embeddings = load_chroma_corpus(args.persist_directory or THE_BATCH_VECTORESTORE_PERSIST_DIR,
+                                                   args.collection_name or COLLECTION_NAME)
+    else:
+        documents, embeddings = synthetic_corpus(args.num_docs, args.dim)
+    report = json.dumps({
+        'meta': {'timestamp': datetime.datetime.now().isoformat(),
+                 'source': args.source,
+                 'num_docs': len(documents),
+                 'dim': int(embeddings.shape[1]),
+                 'k': args.k},
+        'points': sweep(documents, embeddings, args.M, args.ef_construction, args.ef_search,
+                        k=args.k, num_queries=args.num_queries),
+    }, indent=4)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
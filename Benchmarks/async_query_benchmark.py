@@ -0,0 +1,167 @@
+"""Concurrency benchmark of the blocking and async OllamaRAGLLM query paths.
+
+Serves a burst of user queries from a single worker, once with the blocking `query` (one query
+at a time, as a synchronous worker would) and once with `aquery` gathered on one event loop.
+Retrieval runs against a NumPy vector store filled with synthetic documents, and generation
+against a local FakeOllamaServer (or the in-process FakeLLMBackend with --backend fake), so the
+measured difference is the client-side concurrency rather than the model speed. With --coalesce, the async run searches through a
+CoalescingVectorStore and its batch fill rate is reported.
+
+Usage:
+    python -m Benchmarks.async_query_benchmark --num-queries 32 --prefill-latency 0.2
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import datetime
+import platform
+import tempfile
+import logging
+import asyncio
+import json
+import time
+
+import numpy as np
+from langchain_core.prompts.prompt import PromptTemplate
+
+from Benchmarks.fake_ollama_server import FakeOllamaServer
+from Benchmarks.vector_store_benchmark import SyntheticTextEmbedding
+from LLM.rag_llm import OllamaRAGLLM
+from LLM.llm_backends import OllamaBackend, FakeLLMBackend
+from VectorStore.numpy_vector_store import NumpyVectorStore
+from VectorStore.coalescing_vector_store import CoalescingVectorStore
+from Schema.schema import TextDocument
+from Internals.logger import logger
+
+PROMPT_TEMPLATE = PromptTemplate(
+    input_variables=['context', 'user_query'],
+    template="Context: {context}\nQuestion: {user_query}\nAnswer:"
+)
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    return {'p50': float(np.percentile(latencies, 50)),
+            'p99': float(np.percentile(latencies, 99)),
+            'mean': float(np.mean(latencies))}
+
+
+def run_blocking(rag_llm: OllamaRAGLLM, queries: List[str], k: int = 5) -> Dict[str, Any]:
+    """Answers the queries one after the other with the blocking query."""
+    start = time.perf_counter()
+    latencies = []
+    for query in queries:
+        rag_llm.query(user_query=query, k=k)
+        latencies.append(time.perf_counter() - start)
+    wall_seconds = time.perf_counter() - start
+    return {'wall_seconds': wall_seconds,
+            'queries_per_sec': len(queries) / wall_seconds,
+            'completion_ms': _percentiles([latency * 1000 for latency in latencies])}
+
+
+async def _timed_aquery(rag_llm: OllamaRAGLLM, query: str, k: int, start: float) -> float:
+    await rag_llm.aquery(user_query=query, k=k)
+    return time.perf_counter() - start
+
+
+def run_async(rag_llm: OllamaRAGLLM, queries: List[str], k: int = 5) -> Dict[str, Any]:
+    """Answers all queries concurrently with aquery on one event loop."""
+    async def gather_queries() -> List[float]:
+        start = time.perf_counter()
+        return await asyncio.gather(*[_timed_aquery(rag_llm, query, k, start) for query in queries])
+
+    start = time.perf_counter()
+    latencies = asyncio.run(gather_queries())
+    wall_seconds = time.perf_counter() - start
+    return {'wall_seconds': wall_seconds,
+            'queries_per_sec': len(queries) / wall_seconds,
+            'completion_ms': _percentiles([latency * 1000 for latency in latencies])}
+
+
+def benchmark(num_queries: int = 32,
+              num_docs: int = 20000,
+              dim: int = 384,
+              k: int = 5,
+              prefill_latency: float = 0.2,
+              token_latency: float = 0.01,
+              coalesce: bool = False,
+              backend: str = 'fake_server',
+              seed: int = 0
+              ) -> Dict[str, Any]:
+    """Builds the synthetic store and fake server, then measures both query paths on the same queries."""
+    corpus_vectors = np.random.default_rng(seed).normal(size=(num_docs, dim)).astype(np.float32)
+    embedding_function = SyntheticTextEmbedding(corpus_vectors)
+    documents = [TextDocument(id=str(index), content=f'doc {index}', source_url=f'https://example.com/{index % 100}')
+                 for index in range(num_docs)]
+    queries = [f'query {index}' for index in np.random.default_rng(seed).integers(0, num_docs, num_queries)]
+
+    with tempfile.TemporaryDirectory() as persist_directory, \
+         FakeOllamaServer(prefill_latency=prefill_latency, token_latency=token_latency) as server:
+        vectorstore = NumpyVectorStore(embedding_function=embedding_function, persist_directory=persist_directory)
+        vectorstore.add_documents(documents, corpus_vectors)
+        model = (OllamaBackend(model='fake', base_url=server.base_url) if backend == 'fake_server'
+                 else FakeLLMBackend(prefill_latency=prefill_latency, token_latency=token_latency))
+        rag_llm = OllamaRAGLLM(model=model,
+                               prompt_template=PROMPT_TEMPLATE,
+                               vectorstore=vectorstore)
+        rag_llm.query(user_query=queries[0], k=k)
+        blocking = run_blocking(rag_llm, queries, k)
+        if coalesce:
+            rag_llm.vectorstore = CoalescingVectorStore(vectorstore=vectorstore)
+        concurrent = run_async(rag_llm, queries, k)
+        if coalesce:
+            stats = rag_llm.vectorstore.stats
+            concurrent['coalescing'] = {'num_batches': stats.num_batches,
+                                        'mean_batch_size': stats.mean_batch_size,
+                                        'batch_fill_rate': stats.batch_fill_rate,
+                                        'mean_wait_ms': stats.mean_wait_ms}
+            rag_llm.vectorstore.close()
+    return {
+        'num_queries': num_queries,
+        'num_docs': num_docs,
+        'k': k,
+        'backend': backend,
+        'prefill_latency_ms': prefill_latency * 1000,
+        'token_latency_ms': token_latency * 1000,
+        'blocking': blocking,
+        'async': concurrent,
+        'speedup': blocking['wall_seconds'] / concurrent['wall_seconds'],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark blocking vs async OllamaRAGLLM queries on one worker.")
+    arg_parser.add_argument("--num-queries", type=int, default=32)
+    arg_parser.add_argument("--num-docs", type=int, default=20000)
+    arg_parser.add_argument("--dim", type=int, default=384)
+    arg_parser.add_argument("--k", type=int, default=5)
+    arg_parser.add_argument("--prefill-latency", type=float, default=0.2, help="Fake server seconds before the first token.")
+    arg_parser.add_argument("--token-latency", type=float, default=0.01, help="Fake server seconds between tokens.")
+    arg_parser.add_argument("--backend", choices=['fake_server', 'fake'], default='fake_server',
+                            help="Generate through Ollama's client and a FakeOllamaServer, or with the in-process FakeLLMBackend.")
+    arg_parser.add_argument("--coalesce", action="store_true", help="Coalesce the async searches into batched searches.")
+    arg_parser.add_argument("--output", type=str, default=None, help="JSON output path. Defaults to stdout.")
+    args = arg_parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    report = json.dumps({
+        'meta': {'timestamp': datetime.datetime.now().isoformat(),
+                 'python': platform.python_version(),
+                 'platform': platform.platform()},
+        'results': benchmark(num_queries=args.num_queries,
+                             num_docs=args.num_docs,
+                             dim=args.dim,
+                             k=args.k,
+                             prefill_latency=args.prefill_latency,
+                             token_latency=args.token_latency,
+                             coalesce=args.coalesce,
+                             backend=args.backend),
+    }, indent=4)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+"""Throughput and latency benchmark for the embedding backends in Embedding/.
+
+Runs fully offline: either against locally cached checkpoints (HF_HUB_OFFLINE=1) or against
+tiny random-weight models built on the fly, over synthetic corpora with controllable length
+distributions. Results are written as JSON so runs can be compared between releases.
+
+Usage:
+    python -m Benchmarks.embedding_benchmark --models tiny --output embedding_benchmark.json
+"""
+
+from typing import Any, Callable, Dict, List, Literal, Optional
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict, field
+import multiprocessing
+import argparse
+import datetime
+import platform
+import resource
+import tempfile
+import logging
+import json
+import time
+import sys
+import os
+
+import numpy as np
+from PIL import Image
+
+from Internals.logger import logger
+
+Backend = Literal['sentence_transformer', 'clip_image', 'gaussian_projection']
+BACKENDS = ['sentence_transformer', 'clip_image', 'gaussian_projection']
+
+
+@dataclass
+class BenchmarkConfig:
+    """ Parameters of one benchmark run.
+
+    Attributes:
+        backend: Embedding backend to benchmark.
+        models: 'tiny' builds random-weight models, 'cached' loads default checkpoints from the local HF cache.
+        num_docs: Number of synthetic documents (or images / vectors) in the corpus.
+        length_distribution: Distribution of document lengths in words.
+        mean_length: Mean document length in words (image side in pixels for clip_image).
+        batch_sizes: Batch sizes of the throughput scaling curve.
+        num_latency_queries: Number of single-item calls used for latency percentiles.
+        projection_dims: (input_dim, target_dim) of the projection benchmark.
+        seed: Seed of the synthetic corpus.
+    """
+    backend: Backend
+    models: Literal['tiny', 'cached'] = 'tiny'
+    num_docs: int = 512
+    length_distribution: Literal['fixed', 'uniform', 'lognormal'] = 'lognormal'
+    mean_length: int = 64
+    batch_sizes: List[int] = field(default_factory=lambda: [1, 8, 32, 128])
+    num_latency_queries: int = 100
+    projection_dims: List[int] = field(default_factory=lambda: [384, 64])
+    seed: int = 0
+
+
+def _document_lengths(num_docs: int,
+                      length_distribution: str,
+                      mean_length: int,
+                      rng: np.random.Generator
+                      ) -> np.ndarray:
+    if length_distribution == 'fixed':
+        lengths = np.full(num_docs, mean_length)
+    elif length_distribution == 'uniform':
+        lengths = rng.integers(1, 2 * mean_length, num_docs)
+    else:
+        lengths = rng.lognormal(mean=np.log(mean_length) - 0.5, sigma=1.0, size=num_docs)
+    return np.maximum(np.rint(lengths), 1).astype(int)
+
+
+def synthetic_text_corpus(num_docs: int,
+                          length_distribution: str = 'lognormal',
+                          mean_length: int = 64,
+                          seed: int = 0
+                          ) -> List[str]:
+    """Generates documents of pseudo-words whose lengths (in words) follow the requested distribution."""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    vocabulary = [''.join(rng.choice(letters, rng.integers(2, 10))) for _ in range(5000)]
+    lengths = _document_lengths(num_docs, length_distribution, mean_length, rng)
+    return [' '.join(rng.choice(vocabulary, length)) for length in lengths]
+
+
+def synthetic_image_corpus(num_images: int,
+                           length_distribution: str = 'uniform',
+                           mean_side: int = 256,
+                           seed: int = 0
+                           ) -> List[Image.Image]:
+    """Generates random RGB images whose side lengths (in pixels) follow the requested distribution."""
+    rng = np.random.default_rng(seed)
+    sides = np.clip(_document_lengths(num_images, length_distribution, mean_side, rng), 16, 2048)
+    return [Image.fromarray(rng.integers(0, 256, (side, side, 3), dtype=np.uint8)) for side in sides]
+
+
+def _tiny_sentence_transformer(model_dir: str):
+    """Builds and saves a random-weight 2-layer BERT with a character vocabulary, returns its path."""
+    from transformers import BertConfig, BertModel, BertTokenizerFast
+
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + list('abcdefghijklmnopqrstuvwxyz') + ['##' + c for c in 'abcdefghijklmnopqrstuvwxyz']
+    vocab_file = os.path.join(model_dir, 'vocab.txt')
+    with open(vocab_file, 'w') as f:
+        f.write('\n'.join(vocab))
+    BertTokenizerFast(vocab_file=vocab_file).save_pretrained(model_dir)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=128, max_position_embeddings=512)
+    BertModel(config).save_pretrained(model_dir)
+    return model_dir
+
+
+def _tiny_clip(model_dir: str):
+    """Builds and saves a random-weight CLIP with a character vocabulary, returns its path."""
+    from transformers import CLIPConfig, CLIPModel, CLIPTokenizer, CLIPImageProcessor, CLIPProcessor
+
+    characters = list('abcdefghijklmnopqrstuvwxyz')
+    vocab = {token: index for index, token in enumerate(['<|startoftext|>', '<|endoftext|>'] + characters + [c + '</w>' for c in characters])}
+    with open(os.path.join(model_dir, 'vocab.json'), 'w') as f:
+        json.dump(vocab, f)
+    with open(os.path.join(model_dir, 'merges.txt'), 'w') as f:
+        f.write('#version: 0.2\n')
+    tokenizer = CLIPTokenizer(vocab_file=os.path.join(model_dir, 'vocab.json'), merges_file=os.path.join(model_dir, 'merges.txt'))
+    image_processor = CLIPImageProcessor(size={'shortest_edge': 32}, crop_size={'height': 32, 'width': 32})
+    CLIPProcessor(image_processor=image_processor, tokenizer=tokenizer).save_pretrained(model_dir)
+    config = CLIPConfig(text_config={'vocab_size': len(vocab), 'hidden_size': 32, 'intermediate_size': 64,
+                                     'num_hidden_layers': 2, 'num_attention_heads': 2},
+                        vision_config={'image_size': 32, 'patch_size': 8, 'hidden_size': 32, 'intermediate_size': 64,
+                                       'num_hidden_layers': 2, 'num_attention_heads': 2},
+                        projection_dim=32)
+    CLIPModel(config).save_pretrained(model_dir)
+    return model_dir
+
+
+def _build_backend(config: BenchmarkConfig, model_dir: str) -> Dict[str, Any]:
+    """Returns the encode callable, the corpus and a model description for the configured backend."""
+    if config.models == 'cached':
+        os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    if config.backend == 'sentence_transformer':
+        from Embedding.text_embedding import SentenceTransformerTextEmbedding
+
+        embedding = SentenceTransformerTextEmbedding() if config.models == 'cached' else \
+            SentenceTransformerTextEmbedding(model_name_or_path=_tiny_sentence_transformer(model_dir))
+        corpus = synthetic_text_corpus(config.num_docs, config.length_distribution, config.mean_length, config.seed)
+        return {'encode': embedding.encode, 'corpus': corpus, 'model': embedding.model_name_or_path}
+    if config.backend == 'clip_image':
+        from Embedding.image_embedding import CLIPImageEmbedding
+
+        embedding = CLIPImageEmbedding() if config.models == 'cached' else \
+            CLIPImageEmbedding(model_name_or_path=_tiny_clip(model_dir))
+        corpus = synthetic_image_corpus(config.num_docs, config.length_distribution, config.mean_length * 4, config.seed)
+        return {'encode': embedding.encode, 'corpus': corpus, 'model': embedding.model_name_or_path}
+    from Embedding.vector_projection import GaussianRandomVectorProjection
+
+    input_dim, target_dim = config.projection_dims
+    projection = GaussianRandomVectorProjection(target_dim=target_dim, random_state=config.seed).fit(input_dim)
+    corpus = list(np.random.default_rng(config.seed).normal(size=(config.num_docs, input_dim)).astype(np.float32))
+    return {'encode': lambda vectors: projection.project(np.vstack(vectors)),
+            'corpus': corpus,
+            'model': f'gaussian-{input_dim}x{target_dim}'}
+
+
+def _throughput(encode: Callable, corpus: List[Any], batch_size: int) -> float:
+    encode(corpus[:batch_size])
+    start = time.perf_counter()
+    for batch_start in range(0, len(corpus), batch_size):
+        encode(corpus[batch_start: batch_start + batch_size])
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def _latencies_ms(encode: Callable, corpus: List[Any], num_queries: int) -> np.ndarray:
+    latencies = []
+    for index in range(num_queries):
+        item = corpus[index % len(corpus)]
+        start = time.perf_counter()
+        encode([item])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.asarray(latencies)
+
+
+def _peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss / 1024 ** 2 if sys.platform == 'darwin' else peak_rss / 1024
+
+
+def run_benchmark(config: BenchmarkConfig) -> Dict[str, Any]:
+    """Benchmarks one backend and returns its JSON-serializable result.
+
+    The result contains the docs/sec batch-size scaling curve, single-item latency
+    percentiles and the peak RSS of the process after the run.
+    """
+    logger.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as model_dir:
+        backend = _build_backend(config, model_dir)
+        encode, corpus = backend['encode'], backend['corpus']
+        encode(corpus[:1])
+        scaling = [{'batch_size': batch_size, 'docs_per_sec': _throughput(encode, corpus, batch_size)}
+                   for batch_size in config.batch_sizes]
+        latencies = _latencies_ms(encode, corpus, config.num_latency_queries)
+    return {
+        'config': asdict(config),
+        'model': backend['model'],
+        'docs_per_sec': max(point['docs_per_sec'] for point in scaling),
+        'batch_size_scaling': scaling,
+        'latency_ms': {'p50': float(np.percentile(latencies, 50)),
+                       'p99': float(np.percentile(latencies, 99)),
+                       'mean': float(latencies.mean())},
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+def run_benchmarks(configs: List[BenchmarkConfig], isolate: bool = True) -> Dict[str, Any]:
+    """Runs benchmarks, each in a fresh process by default so peak RSS is measured per backend."""
+    if isolate:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = [executor.submit(run_benchmark, config).result() for config in configs]
+    else:
+        results = [run_benchmark(config) for config in configs]
+    return {
+        'meta': {'timestamp': datetime.datetime.now().isoformat(),
+                 'python': platform.python_version(),
+                 'platform': platform.platform(),
+                 'cpu_count': os.cpu_count()},
+        'results': results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark embedding backends offline.")
+    arg_parser.add_argument("--backends", nargs='+', choices=BACKENDS, default=BACKENDS)
+    arg_parser.add_argument("--models", choices=['tiny', 'cached'], default='tiny')
+    arg_parser.add_argument("--num-docs", type=int, default=512)
+    arg_parser.add_argument("--length-distribution", choices=['fixed', 'uniform', 'lognormal'], default='lognormal')
+    arg_parser.add_argument("--mean-length", type=int, default=64)
+    arg_parser.add_argument("--batch-sizes", nargs='+', type=int, default=[1, 8, 32, 128])
+    arg_parser.add_argument("--num-latency-queries", type=int, default=100)
+    arg_parser.add_argument("--no-isolate", action='store_true', help="Run all backends in this process.")
+    arg_parser.add_argument("--output", type=str, default=None, help="JSON output path. Defaults to stdout.")
+    args = arg_parser.parse_args(argv)
+
+    configs = [BenchmarkConfig(backend=backend,
+                               models=args.models,
+                               num_docs=args.num_docs,
+                               length_distribution=args.length_distribution,
+                               mean_length=args.mean_length,
+                               batch_sizes=args.batch_sizes,
+                               num_latency_queries=args.num_latency_queries)
+               for backend in args.backends]
+    report = json.dumps(run_benchmarks(configs, isolate=not args.no_isolate), indent=4)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
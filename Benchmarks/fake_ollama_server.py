@@ -0,0 +1,132 @@
+"""Local fake Ollama server, used to benchmark the LLM query paths without a model.
+
+Implements the streaming `/api/generate` endpoint of Ollama: after a prefill latency it
+streams a canned answer as JSON lines, one word per `token_latency`, followed by a final
+`done` line. Requests are served concurrently, so it behaves like an Ollama server with enough
+parallel slots and isolates the client-side concurrency of the code under test.
+
+Prefill optionally grows with the prompt tokens that are not shared with the previous prompt,
+mimicking Ollama's prompt cache, and the final line reports them as `prompt_eval_count` and
+`prompt_eval_duration` like Ollama does.
+
+Usage:
+    with FakeOllamaServer(prefill_latency=0.2, token_latency=0.01) as server:
+        model = OllamaBackend(model='fake', base_url=server.base_url)
+"""
+
+from typing import Optional
+import datetime
+import math
+import os
+import threading
+import asyncio
+import json
+
+from aiohttp import web
+
+DEFAULT_ANSWER = "This is a canned answer from the fake Ollama server used for benchmarking."
+
+
+class FakeOllamaServer:
+    """Fake Ollama `/api/generate` endpoint running on its own event loop in a background thread.
+
+    Attributes:
+        prefill_latency: Fixed seconds before the first token.
+        prefill_token_latency: Extra seconds before the first token per prompt token that is
+            not a prefix shared with the previous prompt.
+        chars_per_token: Characters per simulated prompt token.
+        token_latency: Seconds between streamed tokens.
+        answer: Text streamed back word by word for every prompt.
+        host: Interface the server binds to.
+        port: Port the server binds to, 0 picks a free port.
+        num_requests: Number of generate requests served so far.
+    """
+
+    def __init__(self,
+                 prefill_latency: float = 0.2,
+                 token_latency: float = 0.01,
+                 prefill_token_latency: float = 0.0,
+                 chars_per_token: float = 4.0,
+                 answer: str = DEFAULT_ANSWER,
+                 host: str = '127.0.0.1',
+                 port: int = 0
+                 ):
+        self.prefill_latency = prefill_latency
+        self.token_latency = token_latency
+        self.prefill_token_latency = prefill_token_latency
+        self.chars_per_token = chars_per_token
+        self.answer = answer
+        self.host = host
+        self.port = port
+        self.num_requests = 0
+        self._previous_prompt = ''
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    async def _generate(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.num_requests += 1
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        prompt = payload.get('prompt') or ''
+        cached_chars = len(os.path.commonprefix([prompt, self._previous_prompt]))
+        self._previous_prompt = prompt
+        prompt_eval_count = math.ceil((len(prompt) - cached_chars) / self.chars_per_token)
+        prefill_seconds = self.prefill_latency + self.prefill_token_latency * prompt_eval_count
+        await asyncio.sleep(prefill_seconds)
+        words = self.answer.split(' ')
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(self.token_latency)
+            line = {'model': payload.get('model'),
+                    'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    'response': word if index == 0 else ' ' + word,
+                    'done': False}
+            await response.write((json.dumps(line) + '\n').encode('utf-8'))
+        await response.write((json.dumps({'model': payload.get('model'),
+                                           'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                                           'response': '',
+                                           'done': True,
+                                           'prompt_eval_count': prompt_eval_count,
+                                           'prompt_eval_duration': int(prefill_seconds * 1e9),
+                                           'eval_count': len(words)}) + '\n').encode('utf-8'))
+        await response.write_eof()
+        return response
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_post('/api/generate', self._generate)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def start(self) -> "FakeOllamaServer":
+        """Starts the server in a background thread and returns once it accepts connections."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='fake-ollama', daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        """Shuts the server down and joins its thread."""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop, self._runner, self._thread = None, None, None
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
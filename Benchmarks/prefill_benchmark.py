@@ -0,0 +1,118 @@
+"""Prompt prefill benchmark of TheBatch prompt templates against an Ollama server.
+
+Sends the same sequence of (context, question) prompts once formatted with the interleaved
+template (instructions around the context) and once with the static prefix template (every
+instruction first), generating a single token each. Ollama reports `prompt_eval_count` and
+`prompt_eval_duration`, the tokens it had to process after reusing its cached prefix of the
+previous prompt, so the difference between the templates is the prefill time saved.
+
+Runs against the local Ollama server by default, or against a FakeOllamaServer simulating
+prompt caching with --fake.
+
+Usage:
+    python -m Benchmarks.prefill_benchmark --num-queries 20
+    python -m Benchmarks.prefill_benchmark --fake
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import datetime
+import platform
+import logging
+import json
+
+import numpy as np
+from langchain_core.prompts.prompt import PromptTemplate
+
+from Benchmarks.fake_ollama_server import FakeOllamaServer
+from LLM.prompt_assembly import static_prefix
+from LLM.llm_backends import OllamaBackend
+from TheBatch.the_batch_configs import the_batch_prompt_template, the_batch_static_prefix_prompt_template
+from TheBatch.the_batch_configs import OLLAMA_MODEL, OLLAMA_KEEP_ALIVE, OLLAMA_NUM_CTX, OLLAMA_NUM_THREAD
+from Internals.logger import logger
+
+WORDS = ("model training data agents robotics vision language research benchmark inference "
+         "hardware startup regulation open source weights dataset evaluation reasoning").split()
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    return {'p50': float(np.percentile(values, 50)),
+            'p99': float(np.percentile(values, 99)),
+            'mean': float(np.mean(values))}
+
+
+def synthetic_queries(num_queries: int, context_words: int = 600, seed: int = 0) -> List[Dict[str, str]]:
+    """Returns (context, user_query) inputs with a different random context for every query."""
+    rng = np.random.default_rng(seed)
+    return [{'context': ' '.join(rng.choice(WORDS, context_words)),
+             'user_query': f"What is new in {' '.join(rng.choice(WORDS, 3))}?"}
+            for _ in range(num_queries)]
+
+
+def measure_template(model: OllamaBackend, prompt_template: PromptTemplate, queries: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Generates one token per query and returns Ollama's prompt evaluation counts and durations."""
+    prompt_eval_counts, prompt_eval_ms = [], []
+    # Warm-up query so the first measured prompt also finds the prefix of a previous one
+    model.client.generate([prompt_template.format(**queries[0])])
+    for query in queries:
+        generation_info = model.client.generate([prompt_template.format(**query)]).generations[0][0].generation_info or {}
+        prompt_eval_counts.append(generation_info.get('prompt_eval_count', 0))
+        prompt_eval_ms.append(generation_info.get('prompt_eval_duration', 0) / 1e6)
+    return {'static_prefix_chars': len(static_prefix(prompt_template)),
+            'prompt_eval_tokens': _percentiles(prompt_eval_counts),
+            'prompt_eval_ms': _percentiles(prompt_eval_ms)}
+
+
+def benchmark(model: OllamaBackend, num_queries: int = 20, context_words: int = 600) -> Dict[str, Any]:
+    """Measures both templates on the same queries."""
+    queries = synthetic_queries(num_queries, context_words)
+    interleaved = measure_template(model, the_batch_prompt_template, queries)
+    static = measure_template(model, the_batch_static_prefix_prompt_template, queries)
+    return {
+        'num_queries': num_queries,
+        'context_words': context_words,
+        'interleaved': interleaved,
+        'static_prefix': static,
+        'prefill_ms_saved_p50': interleaved['prompt_eval_ms']['p50'] - static['prompt_eval_ms']['p50'],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark prompt prefill time of TheBatch prompt templates.")
+    arg_parser.add_argument("--num-queries", type=int, default=20)
+    arg_parser.add_argument("--context-words", type=int, default=600)
+    arg_parser.add_argument("--base-url", type=str, default="http://localhost:11434")
+    arg_parser.add_argument("--fake", action="store_true", help="Run against a FakeOllamaServer simulating prompt caching.")
+    arg_parser.add_argument("--output", type=str, default=None, help="JSON output path. Defaults to stdout.")
+    args = arg_parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    fake_server = FakeOllamaServer(prefill_latency=0.0, prefill_token_latency=0.0005, token_latency=0.0).start() if args.fake else None
+    try:
+        model = OllamaBackend(model=OLLAMA_MODEL,
+                              base_url=fake_server.base_url if fake_server is not None else args.base_url,
+                              keep_alive=OLLAMA_KEEP_ALIVE,
+                              num_ctx=OLLAMA_NUM_CTX,
+                              num_thread=OLLAMA_NUM_THREAD,
+                              num_predict=1)
+        results = benchmark(model, num_queries=args.num_queries, context_words=args.context_words)
+    finally:
+        if fake_server is not None:
+            fake_server.stop()
+    report = json.dumps({
+        'meta': {'timestamp': datetime.datetime.now().isoformat(),
+                 'python': platform.python_version(),
+                 'platform': platform.platform(),
+                 'model': OLLAMA_MODEL,
+                 'fake_server': args.fake},
+        'results': results,
+    }, indent=4)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
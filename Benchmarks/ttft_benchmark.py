@@ -0,0 +1,101 @@
+"""Time to first token benchmark of TheBatchLLM, comparing the streaming and blocking query APIs.
+
+Runs against the configured TheBatch vector stores and the local Ollama server. For every
+question it measures the time until the retrieval event, the time to first token and the total
+time of query_stream, and the latency of the blocking query, which is what a user waited for
+before any text appeared.
+
+Usage:
+    python -m Benchmarks.ttft_benchmark --questions "What is new in GPT-4o?" --repeats 3
+"""
+
+from typing import Any, Dict, List, Optional
+import argparse
+import datetime
+import platform
+import logging
+import json
+import time
+
+import numpy as np
+
+from Internals.logger import logger
+
+DEFAULT_QUESTIONS = [
+    "What are the latest advances in large language models?",
+    "How is AI used in healthcare?",
+    "What did Andrew Ng say about AI agents?",
+]
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    return {'p50': float(np.percentile(latencies, 50)),
+            'p99': float(np.percentile(latencies, 99)),
+            'mean': float(np.mean(latencies))}
+
+
+def measure_stream(the_batch_llm, question: str, k: int = 5) -> Dict[str, float]:
+    """Consumes one streamed answer and returns retrieval, first token and total times in seconds."""
+    start = time.perf_counter()
+    stream = the_batch_llm.query_stream(user_query=question, k=k)
+    next(stream)
+    retrieval_seconds = time.perf_counter() - start
+    first_token_seconds = None
+    for _ in stream:
+        if first_token_seconds is None:
+            first_token_seconds = time.perf_counter() - start
+    total_seconds = time.perf_counter() - start
+    return {'retrieval_seconds': retrieval_seconds,
+            'first_token_seconds': first_token_seconds if first_token_seconds is not None else total_seconds,
+            'total_seconds': total_seconds}
+
+
+def measure_blocking(the_batch_llm, question: str, k: int = 5) -> float:
+    """Returns the latency in seconds of one blocking query."""
+    start = time.perf_counter()
+    the_batch_llm.query(user_query=question, k=k)
+    return time.perf_counter() - start
+
+
+def benchmark(the_batch_llm, questions: List[str], repeats: int = 3, k: int = 5) -> Dict[str, Any]:
+    """Runs every question `repeats` times through both APIs, after one warm-up query loading the model."""
+    measure_stream(the_batch_llm, questions[0], k)
+    streamed = [measure_stream(the_batch_llm, question, k) for question in questions for _ in range(repeats)]
+    blocking = [measure_blocking(the_batch_llm, question, k) for question in questions for _ in range(repeats)]
+    return {
+        'num_queries': len(streamed),
+        'k': k,
+        'stream_retrieval_ms': _percentiles([run['retrieval_seconds'] * 1000 for run in streamed]),
+        'stream_time_to_first_token_ms': _percentiles([run['first_token_seconds'] * 1000 for run in streamed]),
+        'stream_total_ms': _percentiles([run['total_seconds'] * 1000 for run in streamed]),
+        'blocking_query_ms': _percentiles([latency * 1000 for latency in blocking]),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark TheBatchLLM time to first token.")
+    arg_parser.add_argument("--questions", nargs='+', default=DEFAULT_QUESTIONS)
+    arg_parser.add_argument("--repeats", type=int, default=3)
+    arg_parser.add_argument("--k", type=int, default=5)
+    arg_parser.add_argument("--output", type=str, default=None, help="JSON output path. Defaults to stdout.")
+    args = arg_parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    from TheBatch.LLM.the_batch_trained_llms import the_batch_llm
+
+    report = json.dumps({
+        'meta': {'timestamp': datetime.datetime.now().isoformat(),
+                 'python': platform.python_version(),
+                 'platform': platform.platform(),
+                 'model': getattr(the_batch_llm.model, 'model', None)},
+        'results': benchmark(the_batch_llm, args.questions, repeats=args.repeats, k=args.k),
+    }, indent=4)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""Query latency and recall benchmark for the VectorStoreI implementations in VectorStore/.
+
+All stores are filled with the same synthetic documents and queried through the same cheap,
+deterministic embedding function, so the measured latency is the store's own overhead.
+Recall@k is measured against exact brute-force cosine search.
+
+Usage:
+    python -m Benchmarks.vector_store_benchmark --stores chroma numpy hnsw hybrid sharded --num-docs 20000
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import datetime
+import platform
+import tempfile
+import hashlib
+import logging
+import json
+import time
+
+import numpy as np
+
+from Embedding.text_embedding import TextEmbeddingI
+from Schema.schema import TextDocument
+from Internals.logger import logger
+
+
+class SyntheticTextEmbedding(TextEmbeddingI):
+    """Deterministic embedding mapping each text to a seeded random unit vector.
+
+    Texts of the form 'doc <i>' map to the i-th corpus vector, and 'query <i>' to a noisy copy of
+    a corpus vector, so queries have well-defined nearest neighbours without loading a model.
+    """
+
+    def __init__(self, corpus_vectors: np.ndarray, noise: float = 0.3):
+        self.corpus_vectors = corpus_vectors
+        self.noise = noise
+
+    def _vector(self, text: str) -> np.ndarray:
+        kind, _, index = text.partition(' ')
+        vector = self.corpus_vectors[int(index) % len(self.corpus_vectors)]
+        if kind == 'query':
+            seed = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+            vector = vector + self.noise * np.random.default_rng(seed).normal(size=vector.shape) / np.sqrt(vector.shape[0])
+        return vector
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        return np.vstack([self._vector(sentence) for sentence in sentences]).astype(np.float32)
+
+
+def _chroma_store(embedding_function: TextEmbeddingI, persist_directory: str):
+    from VectorStore.chroma_vector_store import ChromaVectorStore
+    from Internals.adapters import ChromaTextEmbeddingAdapter
+
+    return ChromaVectorStore(embedding_function=ChromaTextEmbeddingAdapter(embedding_function=embedding_function),
+                             collection_name='benchmark',
+                             persist_directory=persist_directory,
+                             collection_metadata={'hnsw:space': 'cosine'})
+
+
+def _numpy_store(embedding_function: TextEmbeddingI, persist_directory: str):
+    from VectorStore.numpy_vector_store import NumpyVectorStore
+
+    return NumpyVectorStore(embedding_function=embedding_function, persist_directory=persist_directory)
+
+
+def _hnsw_store(embedding_function: TextEmbeddingI, persist_directory: str):
+    from VectorStore.hnsw_vector_store import HNSWVectorStore
+
+    return HNSWVectorStore(embedding_function=embedding_function, persist_directory=persist_directory)
+
+
+def _hybrid_store(embedding_function: TextEmbeddingI, persist_directory: str):
+    import os
+    from VectorStore.bm25_index import BM25Index
+    from VectorStore.hybrid_retriever import HybridRetriever
+
+    # Dense NumPy search fused with BM25, to compare against the dense-only 'numpy' latency
+    return HybridRetriever(vectorstore=_numpy_store(embedding_function, os.path.join(persist_directory, 'dense')),
+                           bm25_index=BM25Index(persist_directory=os.path.join(persist_directory, 'bm25')))
+
+
+def _sharded_store(embedding_function: TextEmbeddingI, persist_directory: str, num_shards: int = 4):
+    import os
+    from VectorStore.sharded_vector_store import ShardedVectorStore
+
+    # NumPy shards searched in parallel, to compare fan-out and merge overhead against the single 'numpy' store
+    return ShardedVectorStore(shards=[_numpy_store(embedding_function, os.path.join(persist_directory, f'shard_{index}'))
+                                      for index in range(num_shards)],
+                              embedding_function=embedding_function,
+                              persist_directory=persist_directory)
+
+
+STORE_FACTORIES: Dict[str, Callable[[TextEmbeddingI, str], Any]] = {
+    'chroma': _chroma_store,
+    'numpy': _numpy_store,
+    'hnsw': _hnsw_store,
+    'hybrid': _hybrid_store,
+    'sharded': _sharded_store,
+}
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    return {'p50': float(np.percentile(latencies, 50)),
+            'p99': float(np.percentile(latencies, 99)),
+            'mean': float(np.mean(latencies))}
+
+
+def benchmark_store(store_name: str,
+                    corpus_vectors: np.ndarray,
+                    num_queries: int = 200,
+                    k: int = 10,
+                    batch_size: int = 1000,
+                    seed: int = 0
+                    ) -> Dict[str, Any]:
+    """Builds one store from the synthetic corpus and measures build time, search latency and recall@k."""
+    embedding_function = SyntheticTextEmbedding(corpus_vectors)
+    documents = [TextDocument(id=str(index), content=f'doc {index}', source_url=f'https://example.com/{index % 100}')
+                 for index in range(len(corpus_vectors))]
+    queries = [f'query {index}' for index in np.random.default_rng(seed).integers(0, len(corpus_vectors), num_queries)]
+    normalized_corpus = corpus_vectors / np.linalg.norm(corpus_vectors, axis=1, keepdims=True)
+    query_vectors = embedding_function.encode(queries)
+    exact_neighbours = np.argsort(-(query_vectors @ normalized_corpus.T), axis=1)[:, :k]
+
+    with tempfile.TemporaryDirectory() as persist_directory:
+        store = STORE_FACTORIES[store_name](embedding_function, persist_directory)
+        start = time.perf_counter()
+        for batch_start in range(0, len(documents), batch_size):
+            store.add_documents(documents[batch_start: batch_start + batch_size],
+                                corpus_vectors[batch_start: batch_start + batch_size])
+        build_seconds = time.perf_counter() - start
+
+        store.similarity_search(queries[0], k)
+        latencies, recalls = [], []
+        for query, exact in zip(queries, exact_neighbours):
+            start = time.perf_counter()
+            retrieved = store.similarity_search(query, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            recalls.append(len({int(document.id) for document in retrieved} & set(exact.tolist())) / k)
+
+        start = time.perf_counter()
+        store.similarity_search_batch(queries, k)
+        batch_seconds = time.perf_counter() - start
+    return {
+        'store': store_name,
+        'num_docs': len(documents),
+        'dim': corpus_vectors.shape[1],
+        'k': k,
+        'build_seconds': build_seconds,
+        'search_latency_ms': _percentiles(latencies),
+        'recall_at_k': float(np.mean(recalls)),
+        'batch_queries_per_sec': len(queries) / batch_seconds,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Benchmark vector store search latency and recall.")
+    arg_parser.add_argument("--stores", nargs='+', choices=list(STORE_FACTORIES), default=list(STORE_FACTORIES))
+    arg_parser.add_argument("--num-docs", type=int, default=20000)
+    arg_parser.add_argument("--dim", type=int, default=384)
+    arg_parser.add_argument("--num-queries", type=int, default=200)
+    arg_parser.add_argument("--k", type=int, default=10)
+    arg_parser.add_argument("--output", type=str, default=None, help="JSON output path. Defaults to stdout.")
+    args = arg_parser.parse_args(argv)
+
+    logger.setLevel(logging.WARNING)
+    corpus_vectors = np.random.default_rng(0).normal(size=(args.num_docs, args.dim)).astype(np.float32)
+    report = json.dumps({
+        'meta': {'timestamp': datetime.datetime.now().isoformat(),
+                 'python': platform.python_version(),
+                 'platform': platform.platform()},
+        'results': [benchmark_store(store_name, corpus_vectors, num_queries=args.num_queries, k=args.k)
+                    for store_name in args.stores],
+    }, indent=4)
+    if args.output is None:
+        print(report)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(report)
+
+
+if __name__ == '__main__':
+    main()
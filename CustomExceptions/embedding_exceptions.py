@@ -9,4 +9,7 @@ class TextEmbeddingError(BaseException):
     ...
 
 class VectorProjectionError(BaseException):
-    ...
\ No newline at end of file
+    ...
+
+class VectorCompressionError(BaseException):
+    ...
@@ -5,4 +5,13 @@ Large Language Models (LLMs), particularly those used in Retrieval-Augmented Gen
 from CustomExceptions.base_exceptions import BaseException
 
 class RAGLLMInitializationError(BaseException):
+    ...
+
+class TokenizerLoadingError(BaseException):
+    ...
+
+class RerankerError(BaseException):
+    ...
+
+class LLMBackendError(BaseException):
     ...
\ No newline at end of file
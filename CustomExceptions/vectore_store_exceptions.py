@@ -15,5 +15,8 @@ class VectoreStoreCleaningError(BaseException):
 class VectoreStoreInitializationError(BaseException):
     ...
 
+class VectoreStoreLoadingError(BaseException):
+    ...
+
 class VectoreStoreSavingError(BaseException):
     ...
\ No newline at end of file
@@ -13,6 +13,7 @@ from transformers import CLIPProcessor, CLIPModel
 
 from Internals import utils
 from Internals.logger import logger
+from Internals.model_registry import model_registry
 from CustomExceptions import embedding_exceptions
 
 class ImageEmbeddingI(ABC):
@@ -25,6 +26,9 @@ class ImageEmbeddingI(ABC):
 class CLIPImageEmbedding(pydantic.BaseModel, ImageEmbeddingI):
     """Image embedding using CLIP from HuggingFace.
 
+    The model and processor are loaded lazily on first use through the process-wide
+    model registry and shared with CLIPTextEmbedding of the same checkpoint.
+
     Attributes:
         model_name_or_path: HuggingFace hub model ID or path to local model.
         model: The CLIP model instance.
@@ -38,23 +42,28 @@ class CLIPImageEmbedding(pydantic.BaseModel, ImageEmbeddingI):
     model: Optional[CLIPModel] = pydantic.Field(default=None)
     processor: Optional[CLIPProcessor] = pydantic.Field(default=None)
 
-    def model_post_init(self, context):
-        """CLIPImageEmbedding initialization."""
+    def load_model(self) -> None:
+        """Loads the CLIP model and processor from the model registry if they are not set yet.
+
+        Raises:
+            ImageEmbeddingError: If model or processor loading fails.
+        """
         if self.model is None:
             try:
-                self.model = CLIPModel.from_pretrained(self.model_name_or_path)
+                self.model = model_registry.get(('CLIPModel', self.model_name_or_path),
+                                                lambda: CLIPModel.from_pretrained(self.model_name_or_path))
             except Exception as e:
-                msg = f'CLIPImageEmbedding initialization failed due to error in CLIPModel.from_pretrained with {self.model_name_path} model_name_or_path.'
+                msg = f'CLIPImageEmbedding model loading failed due to error in CLIPModel.from_pretrained with {self.model_name_or_path} model_name_or_path.'
                 logger.exception(msg)
                 raise embedding_exceptions.ImageEmbeddingError(msg) from e
         if self.processor is None:
             try:
-                self.processor = CLIPProcessor.from_pretrained(self.model_name_or_path)
+                self.processor = model_registry.get(('CLIPProcessor', self.model_name_or_path),
+                                                    lambda: CLIPProcessor.from_pretrained(self.model_name_or_path))
             except Exception as e:
-                msg = f'CLIPImageEmbedding initialization failed due to error in CLIPProcessor.from_pretraied with {self.model_name_or_path} model_namae_or_path.'
+                msg = f'CLIPImageEmbedding model loading failed due to error in CLIPProcessor.from_pretraied with {self.model_name_or_path} model_namae_or_path.'
                 logger.exception(msg)
                 raise embedding_exceptions.ImageEmbeddingError(msg) from e
-        logger.info("CLIPImageEmbedding initialization done successfully.")
 
     @override
     def encode(self, images: list[Image.Image]) -> np.ndarray:
@@ -81,11 +90,13 @@ class CLIPImageEmbedding(pydantic.BaseModel, ImageEmbeddingI):
                 input_names=['image'], 
                 required_dtypes=[Image.Image]
                 )
+        self.load_model()
         try:
             logger.info("ClipImageEmbedding encoding images.")
             inputs = self.processor(images=images, return_tensors="pt")
-            embeddings = self.model.get_image_features(**inputs)
-            np_embeddings = embeddings.detach().cpu().numpy().astype(np.float32)
+            with torch.no_grad():
+                embeddings = self.model.get_image_features(**inputs)
+            np_embeddings = embeddings.cpu().numpy().astype(np.float32)
             logger.info("ClipImageEmbedding successfully encoded images.")
             return np_embeddings
         except Exception as e:
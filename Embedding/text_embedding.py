@@ -1,16 +1,19 @@
 """Module for generating text embeddings."""
 
 
-from typing import List
+from typing import List, Optional
 from typing_extensions import override
 from abc import ABC, abstractmethod
 
 import numpy as np
+import torch
 import pydantic
 from sentence_transformers import SentenceTransformer
+from transformers import CLIPModel, CLIPTokenizer
 
 from Internals.utils import validate_dtypes
 from Internals.logger import logger
+from Internals.model_registry import model_registry
 from CustomExceptions import embedding_exceptions
 
 
@@ -23,6 +26,9 @@ class TextEmbeddingI(ABC):
 class SentenceTransformerTextEmbedding(pydantic.BaseModel, TextEmbeddingI):
     """Text Embedding with SentenceTransformer.
 
+    The model is loaded lazily on first use through the process-wide model registry, so
+    instances are cheap to create and share weights with each other.
+
     Attributes:
         model_name_or_path: If it is a filepath on disc, it loads the model from that path. 
                             If it is not a path, it first tries to download a pre-trained SentenceTransformer model. 
@@ -33,16 +39,21 @@ class SentenceTransformerTextEmbedding(pydantic.BaseModel, TextEmbeddingI):
     model_name_or_path: str = pydantic.Field(default="sentence-transformers/all-MiniLM-L6-v2")
     model: SentenceTransformer =  pydantic.Field(default=None)
 
-    def model_post_init(self, context):
-        logger.info("SentenceTransformerTextEmbedding initialization.")
-        if self.model is None:
-            try:
-                self.model = SentenceTransformer(self.model_name_or_path)
-            except Exception as e:
-                msg = f"SentenceTransformerTextEmbedding initialization failed due to error in SentenceTransformer initialization with {self.model_name_or_path} model_name_or_path."
-                logger.exception(msg)
-                raise embedding_exceptions.TextEmbeddingError(msg) from e
-        logger.info("SentenceTransformerTextEmbedding done successfully.")
+    def load_model(self) -> None:
+        """Loads the SentenceTransformer model from the model registry if it is not set yet.
+
+        Raises:
+            TextEmbeddingError: If model loading fails.
+        """
+        if self.model is not None:
+            return
+        try:
+            self.model = model_registry.get(('SentenceTransformer', self.model_name_or_path),
+                                            lambda: SentenceTransformer(self.model_name_or_path))
+        except Exception as e:
+            msg = f"SentenceTransformerTextEmbedding model loading failed due to error in SentenceTransformer initialization with {self.model_name_or_path} model_name_or_path."
+            logger.exception(msg)
+            raise embedding_exceptions.TextEmbeddingError(msg) from e
 
     @override
     def encode(self, sentences: List[str])  ->  np.ndarray:
@@ -70,6 +81,7 @@ class SentenceTransformerTextEmbedding(pydantic.BaseModel, TextEmbeddingI):
                 input_names=['sentences_element'], 
                 required_dtypes=[str]
                 )
+        self.load_model()
         try:
             logger.info("SentenceTransformerTextEmbedding encoding sentences.")
             embeddings = np.asarray(self.model.encode(sentences), dtype=np.float32)
@@ -79,4 +91,84 @@ class SentenceTransformerTextEmbedding(pydantic.BaseModel, TextEmbeddingI):
             msg = "SentenceTransformerTextEmbedding failed sentences embedding."
             logger.exception(msg)
             raise embedding_exceptions.TextEmbeddingError(msg) from e
-        
\ No newline at end of file
+
+
+class CLIPTextEmbedding(pydantic.BaseModel, TextEmbeddingI):
+    """Text embedding using the text tower of CLIP from HuggingFace.
+
+    Embeddings live in the same space as CLIPImageEmbedding outputs, so text queries
+    can be searched directly against an index of image embeddings. The CLIP model is loaded
+    lazily through the model registry and shared with CLIPImageEmbedding of the same checkpoint.
+
+    Attributes:
+        model_name_or_path: HuggingFace hub model ID or path to local model.
+        model: The CLIP model instance.
+        tokenizer: CLIP tokenizer for preparing text inputs.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    model_name_or_path: str = pydantic.Field(default="openai/clip-vit-base-patch32")
+    model: Optional[CLIPModel] = pydantic.Field(default=None, repr=False)
+    tokenizer: Optional[CLIPTokenizer] = pydantic.Field(default=None, repr=False)
+
+    def load_model(self) -> None:
+        """Loads the CLIP model and tokenizer from the model registry if they are not set yet.
+
+        Raises:
+            TextEmbeddingError: If model or tokenizer loading fails.
+        """
+        if self.model is None:
+            try:
+                self.model = model_registry.get(('CLIPModel', self.model_name_or_path),
+                                                lambda: CLIPModel.from_pretrained(self.model_name_or_path))
+            except Exception as e:
+                msg = f"CLIPTextEmbedding model loading failed due to error in CLIPModel.from_pretrained with {self.model_name_or_path} model_name_or_path."
+                logger.exception(msg)
+                raise embedding_exceptions.TextEmbeddingError(msg) from e
+        if self.tokenizer is None:
+            try:
+                self.tokenizer = model_registry.get(('CLIPTokenizer', self.model_name_or_path),
+                                                    lambda: CLIPTokenizer.from_pretrained(self.model_name_or_path))
+            except Exception as e:
+                msg = f"CLIPTextEmbedding model loading failed due to error in CLIPTokenizer.from_pretrained with {self.model_name_or_path} model_name_or_path."
+                logger.exception(msg)
+                raise embedding_exceptions.TextEmbeddingError(msg) from e
+
+    @override
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        """Computes CLIP text embeddings.
+
+        Args:
+            sentences: The sentences to embed.
+
+        Raises:
+            TypeError: If sentences is not a list or not all elements in sentences is a string.
+            TextEmbeddingError: If sentences embedding fails.
+
+        Returns:
+            2d numpy array with shape [num_inputs, projection_dim] obtained by applying the
+            projection layer to the pooled output of [CLIPTextModel].
+        """
+        validate_dtypes(
+            inputs=[sentences], 
+            input_names=['sentences'], 
+            required_dtypes=[list]
+            )
+        for sentence in sentences: 
+            validate_dtypes(
+                inputs=[sentence], 
+                input_names=['sentences_element'], 
+                required_dtypes=[str]
+                )
+        self.load_model()
+        try:
+            logger.info("CLIPTextEmbedding encoding sentences.")
+            inputs = self.tokenizer(sentences, padding=True, truncation=True, return_tensors="pt")
+            with torch.no_grad():
+                embeddings = self.model.get_text_features(**inputs)
+            np_embeddings = embeddings.cpu().numpy().astype(np.float32)
+            logger.info("CLIPTextEmbedding successfully encoded sentences.")
+            return np_embeddings
+        except Exception as e:
+            msg = "CLIPTextEmbedding failed sentences embedding."
+            logger.exception(msg)
+            raise embedding_exceptions.TextEmbeddingError(msg) from e
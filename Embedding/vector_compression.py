@@ -0,0 +1,335 @@
+"""Module for compressing embedding vectors to shrink vector indexes."""
+
+from typing import List, Optional, Literal, Tuple
+from typing_extensions import override
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, asdict
+import json
+import time
+import os
+
+import numpy as np
+import pydantic
+from sklearn.decomposition import PCA
+
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import embedding_exceptions
+
+
+class VectorCompressionI(ABC):
+    """Interface class for vector compression."""
+
+    @abstractmethod
+    def fit(self, vectors: np.ndarray) -> "VectorCompressionI":
+        ...
+
+    @abstractmethod
+    def compress(self, vectors: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def decompress(self, codes: np.ndarray) -> np.ndarray:
+        ...
+
+    @abstractmethod
+    def search(self, query_vectors: np.ndarray, codes: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        ...
+
+
+class PCAVectorCompression(pydantic.BaseModel, VectorCompressionI):
+    """Compress vectors with an optional PCA fitted on the corpus followed by float16 or scalar int8 quantization.
+
+    int8 quantization is symmetric with one scale per (reduced) dimension, so codes are
+    scored against queries without decompression by folding the scales into the query.
+
+    Attributes:
+        n_components: Number of PCA components to keep. None skips PCA.
+        dtype: Storage type of the compressed codes.
+        random_state: Seed for the PCA solver.
+        mean: Corpus mean removed before PCA, None until fitted.
+        components: PCA components with shape [n_components, input_dim], None until fitted.
+        scales: Per-dimension int8 quantization scales, None until fitted.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    n_components: Optional[int] = pydantic.Field(default=None)
+    dtype: Literal['float32', 'float16', 'int8'] = pydantic.Field(default='float16')
+    random_state: int = pydantic.Field(default=42)
+    mean: Optional[np.ndarray] = pydantic.Field(default=None, repr=False)
+    components: Optional[np.ndarray] = pydantic.Field(default=None, repr=False)
+    scales: Optional[np.ndarray] = pydantic.Field(default=None, repr=False)
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.mean is not None
+
+    def _reduce(self, vectors: np.ndarray) -> np.ndarray:
+        """Maps vectors to the (centered) PCA space, or leaves them unchanged if PCA is disabled."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self.components is None:
+            return vectors
+        return (vectors - self.mean) @ self.components.T
+
+    @override
+    def fit(self, vectors: np.ndarray) -> "PCAVectorCompression":
+        """Fits PCA and quantization scales on the corpus vectors.
+
+        Args:
+            vectors: 2D array of corpus vectors.
+
+        Raises:
+            TypeError: If vectors is not a numpy array.
+            VectorCompressionError: If fitting fails.
+
+        Returns:
+            PCAVectorCompression: The fitted compression.
+        """
+        utils.validate_dtypes(
+            inputs=[vectors],
+            input_names=['vectors'],
+            required_dtypes=[np.ndarray]
+            )
+        try:
+            logger.info("PCAVectorCompression fitting (n_components=%s, dtype=%s).", self.n_components, self.dtype)
+            vectors = np.asarray(vectors, dtype=np.float32)
+            self.mean = vectors.mean(axis=0)
+            if self.n_components is not None:
+                pca = PCA(n_components=self.n_components, random_state=self.random_state).fit(vectors)
+                self.components = np.ascontiguousarray(pca.components_, dtype=np.float32)
+            reduced = self._reduce(vectors)
+            if self.dtype == 'int8':
+                self.scales = np.maximum(np.abs(reduced).max(axis=0), 1e-12).astype(np.float32) / 127.0
+            logger.info("PCAVectorCompression successfully fitted.")
+            return self
+        except Exception as e:
+            msg = "PCAVectorCompression failed fitting."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorCompressionError(msg) from e
+
+    @override
+    def compress(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduces and quantizes vectors.
+
+        Args:
+            vectors: 2D array of vectors to compress.
+
+        Raises:
+            VectorCompressionError: If the compression is not fitted or compression fails.
+
+        Returns:
+            np.ndarray: Codes with shape [num_vectors, dim] and the configured dtype.
+        """
+        if not self.is_fitted:
+            msg = "PCAVectorCompression must be fitted before compressing vectors."
+            logger.error(msg)
+            raise embedding_exceptions.VectorCompressionError(msg)
+        try:
+            reduced = self._reduce(vectors)
+            if self.dtype == 'int8':
+                return np.clip(np.rint(reduced / self.scales), -127, 127).astype(np.int8)
+            return reduced.astype(self.dtype)
+        except Exception as e:
+            msg = "PCAVectorCompression failed vector compression."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorCompressionError(msg) from e
+
+    @override
+    def decompress(self, codes: np.ndarray) -> np.ndarray:
+        """Dequantizes codes back to float32 vectors in the reduced space.
+
+        Args:
+            codes: Codes returned by compress.
+
+        Returns:
+            np.ndarray: float32 vectors with shape [num_vectors, dim].
+        """
+        if self.dtype == 'int8':
+            return codes.astype(np.float32) * self.scales
+        return codes.astype(np.float32)
+
+    def encode_queries(self, query_vectors: np.ndarray) -> np.ndarray:
+        """Maps query vectors into the code space so that `encoded @ codes.T` ranks like `query @ vectors.T`.
+
+        Queries are projected without centering, since subtracting the mean would add a
+        per-document bias to inner products. int8 scales are folded into the query.
+
+        Args:
+            query_vectors: 2D array of full-dimension query vectors.
+
+        Returns:
+            np.ndarray: float32 query vectors in the code space.
+        """
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        if self.components is not None:
+            query_vectors = query_vectors @ self.components.T
+        if self.dtype == 'int8':
+            query_vectors = query_vectors * self.scales
+        return query_vectors
+
+    @override
+    def search(self,
+               query_vectors: np.ndarray,
+               codes: np.ndarray,
+               k: int
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """Inner-product top-k search of full-dimension queries against compressed codes.
+
+        Args:
+            query_vectors: 2D array of full-dimension query vectors.
+            codes: Codes returned by compress.
+            k: Number of results per query.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (indices, scores), each with shape [num_queries, k], best first.
+        """
+        scores = self.encode_queries(query_vectors) @ codes.T.astype(np.float32, copy=False)
+        return utils.top_k(scores, k)
+
+    def save(self, path: str) -> None:
+        """Saves the fitted compression parameters to a .npz file.
+
+        Raises:
+            TypeError: If path is not a string.
+            VectorCompressionError: If saving fails.
+        """
+        utils.validate_dtypes(
+            inputs=[path],
+            input_names=['path'],
+            required_dtypes=[str]
+            )
+        try:
+            arrays = {name: getattr(self, name) for name in ('mean', 'components', 'scales') if getattr(self, name) is not None}
+            with open(path + '.tmp', 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(path + '.tmp', path)
+            logger.info("PCAVectorCompression saved to %s", path)
+        except Exception as e:
+            msg = f"PCAVectorCompression failed to save to {path}."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorCompressionError(msg) from e
+
+    def load(self, path: str) -> None:
+        """Loads compression parameters saved with save."""
+        utils.validate_dtypes(
+            inputs=[path],
+            input_names=['path'],
+            required_dtypes=[str]
+            )
+        try:
+            with np.load(path) as arrays:
+                self.mean = arrays['mean']
+                self.components = arrays['components'] if 'components' in arrays else None
+                self.scales = arrays['scales'] if 'scales' in arrays else None
+            logger.info("PCAVectorCompression loaded from %s", path)
+        except Exception as e:
+            msg = f"PCAVectorCompression failed to load from {path}."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorCompressionError(msg) from e
+
+
+@dataclass
+class VectorCompressionReport:
+    """ Evaluation result of one compression mode.
+
+    Attributes:
+        mode: Human readable mode name (e.g. 'pca128-int8').
+        dim: Dimensionality of the stored codes.
+        index_bytes: Memory used by the stored codes.
+        compression_ratio: float32 full-dimension index size divided by index_bytes.
+        recall_at_k: Mean overlap between compressed and exact float32 top-k.
+        search_latency_ms: Mean single-query search latency.
+        search_speedup: Exact float32 search latency divided by search_latency_ms.
+    """
+    mode: str
+    dim: int
+    index_bytes: int
+    compression_ratio: float
+    recall_at_k: float
+    search_latency_ms: float
+    search_speedup: float
+
+
+def _mean_search_latency_ms(search, query_vectors: np.ndarray) -> float:
+    start = time.perf_counter()
+    for query_vector in query_vectors:
+        search(query_vector[np.newaxis, :])
+    return (time.perf_counter() - start) * 1000 / len(query_vectors)
+
+
+def evaluate_vector_compression(vectors: np.ndarray,
+                                query_vectors: np.ndarray,
+                                k: int = 10,
+                                modes: Optional[List[Tuple[Optional[int], str]]] = None
+                                ) -> List[VectorCompressionReport]:
+    """Measures memory, recall@k and search latency of compression modes against exact float32 search.
+
+    Args:
+        vectors: 2D array of corpus vectors (normalized for cosine similarity).
+        query_vectors: 2D array of query vectors.
+        k: Number of neighbours used for recall@k.
+        modes: (n_components, dtype) pairs to evaluate. Defaults to float32/float16/int8,
+               each without PCA and with PCA to half the input dimension.
+
+    Returns:
+        List[VectorCompressionReport]: One report per mode, starting with the exact baseline.
+    """
+    utils.validate_dtypes(
+        inputs=[vectors, query_vectors, k],
+        input_names=['vectors', 'query_vectors', 'k'],
+        required_dtypes=[np.ndarray, np.ndarray, int]
+        )
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    query_vectors = np.ascontiguousarray(query_vectors, dtype=np.float32)
+    if modes is None:
+        half_dim = vectors.shape[1] // 2
+        modes = [(None, 'float16'), (None, 'int8'), (half_dim, 'float32'), (half_dim, 'float16'), (half_dim, 'int8')]
+
+    exact_indices, _ = utils.top_k(query_vectors @ vectors.T, k)
+    exact_latency = _mean_search_latency_ms(lambda query: utils.top_k(query @ vectors.T, k), query_vectors)
+    reports = [VectorCompressionReport(mode='exact-float32',
+                                       dim=vectors.shape[1],
+                                       index_bytes=vectors.nbytes,
+                                       compression_ratio=1.0,
+                                       recall_at_k=1.0,
+                                       search_latency_ms=exact_latency,
+                                       search_speedup=1.0)]
+    for n_components, dtype in modes:
+        compression = PCAVectorCompression(n_components=n_components, dtype=dtype).fit(vectors)
+        codes = compression.compress(vectors)
+        indices, _ = compression.search(query_vectors, codes, k)
+        recall = np.mean([len(set(found) & set(exact)) / len(exact) for found, exact in zip(indices, exact_indices)])
+        latency = _mean_search_latency_ms(lambda query: compression.search(query, codes, k), query_vectors)
+        mode = f"{'pca' + str(n_components) if n_components else 'full'}-{dtype}"
+        reports.append(VectorCompressionReport(mode=mode,
+                                               dim=codes.shape[1],
+                                               index_bytes=codes.nbytes,
+                                               compression_ratio=vectors.nbytes / codes.nbytes,
+                                               recall_at_k=float(recall),
+                                               search_latency_ms=latency,
+                                               search_speedup=exact_latency / latency))
+        logger.info("Evaluated vector compression mode %s: %s", mode, reports[-1])
+    return reports
+
+
+if __name__ == '__main__':
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="Evaluate vector compression modes on a synthetic corpus with a decaying spectrum.")
+    arg_parser.add_argument("--num-vectors", type=int, default=20000)
+    arg_parser.add_argument("--num-queries", type=int, default=200)
+    arg_parser.add_argument("--dim", type=int, default=384)
+    arg_parser.add_argument("--k", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    # Sentence embeddings concentrate their variance in few directions, mimic that with decaying latent scales
+    rng = np.random.default_rng(0)
+    latent_scales = 1.0 / np.arange(1, args.dim + 1) ** 0.75
+    mixing = np.linalg.qr(rng.normal(size=(args.dim, args.dim)))[0]
+    corpus = (rng.normal(size=(args.num_vectors, args.dim)) * latent_scales) @ mixing
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = corpus[rng.choice(args.num_vectors, args.num_queries, replace=False)] + 0.1 * rng.normal(size=(args.num_queries, args.dim))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    print(json.dumps([asdict(report) for report in evaluate_vector_compression(corpus, queries, k=args.k)], indent=4))
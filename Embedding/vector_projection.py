@@ -1,62 +1,215 @@
 """Module for vector dimensionality reduction."""
 
+from typing import List, Optional, Literal
 from typing_extensions import override
 from abc import ABC, abstractmethod
+import os
 
 
 import numpy as np
+import pydantic
 from sklearn import random_projection
 
+from Embedding.text_embedding import TextEmbeddingI
 from Internals import utils
 from Internals.logger import logger
 from CustomExceptions import embedding_exceptions
 
-class VectorProjectionI:
+class VectorProjectionI(ABC):
     """Interface class for vector projection."""
     @abstractmethod
-    def project(self, vector: np.ndarray, target_dim) -> np.ndarray:
+    def project(self, vectors: np.ndarray) -> np.ndarray:
         ...
 
-class GaussianRandomVectorProjection(VectorProjectionI):
-    """Reduce dimensionality through Gaussian random projection."""
+class GaussianRandomVectorProjection(pydantic.BaseModel, VectorProjectionI):
+    """Reduce dimensionality through a fitted, persisted random projection.
+
+    The projection matrix is drawn once with a fixed seed and reused for every call, so
+    vectors projected at indexing time and at query time land in the same space.
+
+    Attributes:
+        target_dim: Target dimensionality.
+        random_state: Seed used to draw the projection matrix.
+        projection_type: 'gaussian' for a dense Gaussian matrix, 'achlioptas' for the sparse
+                         {-1, 0, +1} variant (density 1/3), which is cheaper to draw and store.
+        projection_path: Optional .npy path. If the file exists, the projection matrix is loaded from it.
+        components: Projection matrix with shape [target_dim, input_dim], None until fitted.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+        VectorProjectionError: If loading the projection matrix fails.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    target_dim: int
+    random_state: int = pydantic.Field(default=42)
+    projection_type: Literal['gaussian', 'achlioptas'] = pydantic.Field(default='gaussian')
+    projection_path: Optional[str] = pydantic.Field(default=None)
+    components: Optional[np.ndarray] = pydantic.Field(default=None, repr=False)
+
+    def model_post_init(self, context):
+        if self.components is None and self.projection_path is not None and os.path.exists(self.projection_path):
+            self.load(self.projection_path)
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.components is not None
+
+    def fit(self, input_dim: int) -> "GaussianRandomVectorProjection":
+        """Draws the projection matrix for vectors of the given dimensionality.
+
+        Args:
+            input_dim: Dimensionality of the vectors to project.
+
+        Raises:
+            TypeError: If input_dim is not an integer.
+            VectorProjectionError: If drawing the projection matrix fails.
+
+        Returns:
+            GaussianRandomVectorProjection: The fitted projection.
+        """
+        utils.validate_dtypes(
+            inputs=[input_dim],
+            input_names=['input_dim'],
+            required_dtypes=[int]
+            )
+        try:
+            logger.info("GaussianRandomVectorProjection fitting %s projection %s -> %s.", self.projection_type, input_dim, self.target_dim)
+            if self.projection_type == 'gaussian':
+                projection = random_projection.GaussianRandomProjection(n_components=self.target_dim,
+                                                                        random_state=self.random_state)
+            else:
+                projection = random_projection.SparseRandomProjection(n_components=self.target_dim,
+                                                                      density=1 / 3,
+                                                                      dense_output=True,
+                                                                      random_state=self.random_state)
+            projection.fit(np.zeros((1, input_dim), dtype=np.float32))
+            components = projection.components_
+            if not isinstance(components, np.ndarray):
+                components = components.toarray()
+            self.components = np.ascontiguousarray(components, dtype=np.float32)
+            logger.info("GaussianRandomVectorProjection successfully fitted.")
+            return self
+        except Exception as e:
+            msg = "GaussianRandomVectorProjection failed fitting."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorProjectionError(msg) from e
 
-    @staticmethod
     @override
-    def project(vector: np.ndarray, target_dim: np.ndarray):
-        """Project input vector to taget dimention.
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Project input vectors to target dimention with a single matrix multiplication.
+
+        The projection is fitted on the first call if it is not fitted yet.
 
         Args:
-            vector: Input vector for dimentionality reduction.
-            target_dim: Target dimentionality.
+            vectors: 2D array of vectors (or a single 1D vector) for dimentionality reduction.
 
         Raises:
             TypeError: If argument type does not match exptected data type.
             VectorProjectionError: If vector projection fails.
 
         Returns:
-            np.ndarray: Vector with target dimentionality.
+            np.ndarray: float32 vectors with target dimentionality.
         """
         utils.validate_dtypes(
-            inputs=[
-                vector, 
-                target_dim
-                ], 
-            input_names=[
-                'vector', 
-                'target_dim'
-                ], 
-            required_dtypes=[
-                np.ndarray, 
-                int
-                ]
+            inputs=[vectors],
+            input_names=['vectors'],
+            required_dtypes=[np.ndarray]
             )
+        if not self.is_fitted:
+            self.fit(int(vectors.shape[-1]))
         try:
-            logger.info("GaussianRandomVectorProjection projecting vector.")
-            projection = random_projection.GaussianRandomProjection(n_components=target_dim).fit_transform(vector)
-            logger.info('GaussianRandomVectorProjection successfully projected vector.')
+            logger.info("GaussianRandomVectorProjection projecting vectors.")
+            projection = np.asarray(vectors, dtype=np.float32) @ self.components.T
+            logger.info('GaussianRandomVectorProjection successfully projected vectors.')
             return projection
         except Exception as e:
             msg = "GaussianrandomVectorProjection failed vector projection."
             logger.exception(msg)
             raise embedding_exceptions.VectorProjectionError(msg) from e
-        
\ No newline at end of file
+
+    def save(self, projection_path: Optional[str] = None) -> None:
+        """Saves the projection matrix to a .npy file.
+
+        The matrix is written to exactly projection_path, without appending a .npy extension, so
+        model_post_init finds it again. It is written to a temporary file first and then renamed,
+        so an interrupted save leaves the previous file intact.
+
+        Args:
+            projection_path: Destination path. Defaults to self.projection_path.
+
+        Raises:
+            VectorProjectionError: If the projection is not fitted or saving fails.
+        """
+        projection_path = projection_path or self.projection_path
+        if not self.is_fitted or projection_path is None:
+            msg = "GaussianRandomVectorProjection cannot be saved: projection is not fitted or projection_path is not set."
+            logger.error(msg)
+            raise embedding_exceptions.VectorProjectionError(msg)
+        try:
+            logger.info("Saving GaussianRandomVectorProjection to %s", projection_path)
+            with open(projection_path + '.tmp', 'wb') as f:
+                np.save(f, self.components)
+            os.replace(projection_path + '.tmp', projection_path)
+            self.projection_path = projection_path
+            logger.info("GaussianRandomVectorProjection successfully saved to %s", projection_path)
+        except Exception as e:
+            msg = f"GaussianRandomVectorProjection failed to save to {projection_path}."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorProjectionError(msg) from e
+
+    def load(self, projection_path: str) -> None:
+        """Loads the projection matrix from a .npy file.
+
+        Args:
+            projection_path: Path of the saved projection matrix.
+
+        Raises:
+            TypeError: If projection_path is not a string.
+            VectorProjectionError: If loading fails or the matrix does not match target_dim.
+        """
+        utils.validate_dtypes(
+            inputs=[projection_path],
+            input_names=['projection_path'],
+            required_dtypes=[str]
+            )
+        try:
+            logger.info("Loading GaussianRandomVectorProjection from %s", projection_path)
+            components = np.load(projection_path)
+        except Exception as e:
+            msg = f"GaussianRandomVectorProjection failed to load from {projection_path}."
+            logger.exception(msg)
+            raise embedding_exceptions.VectorProjectionError(msg) from e
+        if components.ndim != 2 or components.shape[0] != self.target_dim:
+            msg = f"GaussianRandomVectorProjection loaded matrix with shape {components.shape}, expected ({self.target_dim}, input_dim)."
+            logger.error(msg)
+            raise embedding_exceptions.VectorProjectionError(msg)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.projection_path = projection_path
+        logger.info("GaussianRandomVectorProjection successfully loaded from %s", projection_path)
+
+
+class ProjectedTextEmbedding(pydantic.BaseModel, TextEmbeddingI):
+    """Text embedding followed by a fitted vector projection.
+
+    Lets reduced-dimension vectors be stored in and searched from a vector store, with
+    documents and queries going through the same projection.
+
+    Attributes:
+        embedding_function: TextEmbeddingI object producing full-dimension embeddings.
+        projection: Fitted (or lazily fitted) projection applied to every embedding.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    embedding_function: TextEmbeddingI
+    projection: VectorProjectionI
+
+    @override
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        """Computes sentence embeddings and projects them to the target dimension.
+
+        Args:
+            sentences: The sentences to embed.
+
+        Returns:
+            np.ndarray: 2d array with shape [num_inputs, target_dim].
+        """
+        return self.projection.project(self.embedding_function.encode(sentences))
@@ -33,4 +33,23 @@ class ChromaTextEmbeddingAdapter(pydantic.BaseModel):
             input_names=['text'], 
             required_dtypes=[str]
             )
-        return self.embedding_function.encode([text])[0]
\ No newline at end of file
+        return self.embedding_function.encode([text])[0]
+
+    def embed_documents(self, texts: list[str]) -> np.ndarray:
+        """Embed input texts with a single encoder call.
+
+        Args:
+            texts: Texts to embed.
+
+        Raises:
+            TypeError: If texts is not a list.
+
+        Returns:
+            np.ndarray: 2D array of embedding vectors, one row per text.
+        """
+        utils.validate_dtypes(
+            inputs=[texts], 
+            input_names=['texts'], 
+            required_dtypes=[list]
+            )
+        return self.embedding_function.encode(texts)
@@ -0,0 +1,62 @@
+"""Provides a process-wide registry that lazily loads and shares model weights."""
+
+from typing import Any, Callable, Dict, Hashable, List
+import threading
+
+from Internals.logger import logger
+
+
+class ModelRegistry:
+    """Thread-safe, load-once cache of models keyed by (model class name, model name or path).
+
+    Components ask the registry for their model the first time they need it, so weights are
+    never loaded in processes that do not use them and are loaded only once when several
+    components (e.g. CLIP image and text embeddings) use the same checkpoint.
+    """
+
+    def __init__(self):
+        self._models: Dict[Hashable, Any] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Returns the model registered under key, calling loader exactly once to create it.
+
+        Concurrent callers asking for the same key wait for the first load instead of
+        loading the model again; different keys load in parallel.
+
+        Args:
+            key: Hashable model identifier, e.g. ('CLIPModel', 'openai/clip-vit-base-patch32').
+            loader: Zero-argument callable that loads the model.
+
+        Raises:
+            Exception: Whatever loader raises. Nothing is cached in that case.
+
+        Returns:
+            Any: The loaded model.
+        """
+        if key in self._models:
+            return self._models[key]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            if key not in self._models:
+                logger.info("ModelRegistry loading %s", key)
+                self._models[key] = loader()
+                logger.info("ModelRegistry successfully loaded %s", key)
+            return self._models[key]
+
+    def is_loaded(self, key: Hashable) -> bool:
+        return key in self._models
+
+    def loaded_keys(self) -> List[Hashable]:
+        return list(self._models)
+
+    def clear(self) -> None:
+        """Drops every registered model so its memory can be reclaimed once no component references it."""
+        with self._lock:
+            self._models.clear()
+            self._key_locks.clear()
+
+
+model_registry = ModelRegistry()
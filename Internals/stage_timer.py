@@ -0,0 +1,42 @@
+"""Provides a thread-safe recorder of per-stage wall-clock timings of a request pipeline."""
+
+from typing import Any, Callable, Dict, Iterator
+from contextlib import contextmanager
+import threading
+import time
+
+
+class StageTimer:
+    """Records how long the named stages of one request take, in milliseconds.
+
+    Stages may run concurrently on worker threads, so the timings of parallel stages can add up
+    to more than the request's total time. A stage recorded twice keeps the summed duration.
+    """
+
+    def __init__(self):
+        self._timings: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self._timings[name] = self._timings.get(name, 0.0) + elapsed_ms
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as stage name, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def timed(self, name: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """Calls function(*args, **kwargs) as stage name, e.g. when submitting it to an executor."""
+        with self.stage(name):
+            return function(*args, **kwargs)
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Snapshot of the stage timings recorded so far."""
+        with self._lock:
+            return dict(self._timings)
@@ -1,12 +1,14 @@
 """Utility functions."""  
 
-from typing import Dict
+from typing import Dict, Optional, Tuple
+import datetime
 import hashlib
 import uuid
 import traceback
 import base64
 import io
 import json
+import numpy as np
 from PIL import Image
 
 from Schema.schema import ImageDocument
@@ -27,6 +29,18 @@ def validate_dtypes(inputs, input_names, required_dtypes):
             raise TypeError(f"{input_name} must be of type {required_dtype}. Got instead: {type(input)}")
         
 
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns per-row top-k (indices, scores) of a 2D score matrix, best first, using argpartition."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+    indices = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, indices, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    return np.take_along_axis(indices, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
 def generate_unique_doc_id(content: str, metadata: dict = None) -> str:
     """Generate a unique document identifier based on content, metadata, and a random salt.
 
@@ -43,6 +57,34 @@ def generate_unique_doc_id(content: str, metadata: dict = None) -> str:
     return f"{base_hash}-{salt}"
 
 
+def parse_publication_date(value: str) -> Optional[int]:
+    """ Parses a publication date into a YYYYMMDD integer.
+
+    Accepts ISO 8601 dates and datetimes (e.g. the `datetime` attribute of a <time> tag) and
+    human-readable dates such as 'Mar 15, 2024' or 'March 15, 2024' (the text of a <time> tag).
+
+    Args:
+        value: The date string to parse.
+
+    Returns:
+        Optional[int]: The date as a YYYYMMDD integer, or None if the value cannot be parsed.
+    """
+    value = value.strip()
+    try:
+        date = datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+    except ValueError:
+        date = None
+        for date_format in ('%b %d, %Y', '%B %d, %Y', '%d %b %Y', '%d %B %Y'):
+            try:
+                date = datetime.datetime.strptime(value, date_format).date()
+                break
+            except ValueError:
+                continue
+    if date is None:
+        return None
+    return date.year * 10000 + date.month * 100 + date.day
+
+
 def ImageDocument_to_serializable_dict(image_document: ImageDocument) -> Dict:
     """ Converts an ImageDocument instance into a serializable dictionary.
 
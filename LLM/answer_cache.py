@@ -0,0 +1,198 @@
+"""Semantic cache of LLM answers for repeated and near-duplicate user queries."""
+
+from typing import Optional, List, Tuple, Dict
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import threading
+import time
+import re
+
+import numpy as np
+import pydantic
+
+from Embedding.text_embedding import TextEmbeddingI
+from Internals.logger import logger
+
+CacheKey = Tuple[str, Tuple[str, ...]]
+
+
+@dataclass
+class AnswerCacheStats:
+    """ Lookup counters of a SemanticAnswerCache.
+
+    Attributes:
+        exact_hits: Lookups answered by an entry with the same normalized query.
+        semantic_hits: Lookups answered by an entry with a similar query embedding.
+        misses: Lookups without a usable entry.
+        evictions: Entries dropped because the cache was full.
+        expirations: Entries dropped because they outlived the TTL.
+    """
+    exact_hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.exact_hits + self.semantic_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return (self.exact_hits + self.semantic_hits) / self.lookups if self.lookups else 0.0
+
+
+@dataclass
+class _CacheEntry:
+    answer: str
+    created_at: float
+    embedding: Optional[np.ndarray] = None
+
+
+class SemanticAnswerCache(pydantic.BaseModel):
+    """Thread-safe LRU cache of answers keyed on the normalized query and the retrieved document ids.
+
+    Keying on the ids of the retrieved documents means an answer is only reused when the LLM
+    would see the same context, so entries are implicitly invalidated when the vector store
+    changes (document ids are content hashes). Among the entries retrieved with the same
+    documents, a query that misses the exact lookup is embedded and matched against their query
+    embeddings, and the most similar one above `similarity_threshold` is returned. Callers can
+    embed the query once with `embed` and pass the embedding to both lookup and store.
+
+    Attributes:
+        embedding_function: Text embedding for semantic matching. If None, only exact matches hit.
+        similarity_threshold: Minimum cosine similarity between query embeddings for a semantic hit.
+        max_entries: Maximum number of cached answers, the least recently used is evicted first.
+        ttl_seconds: Lifetime of a cached answer in seconds. None keeps answers until evicted.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    embedding_function: Optional[TextEmbeddingI] = pydantic.Field(default=None, repr=False)
+    similarity_threshold: float = pydantic.Field(default=0.95, gt=0.0, le=1.0)
+    max_entries: int = pydantic.Field(default=1024, gt=0)
+    ttl_seconds: Optional[float] = pydantic.Field(default=3600.0, gt=0.0)
+    _entries: "OrderedDict[CacheKey, _CacheEntry]" = pydantic.PrivateAttr(default_factory=OrderedDict)
+    _keys_by_docs: Dict[Tuple[str, ...], Dict[str, None]] = pydantic.PrivateAttr(default_factory=dict)
+    _stats: AnswerCacheStats = pydantic.PrivateAttr(default_factory=AnswerCacheStats)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    @staticmethod
+    def normalize(user_query: str) -> str:
+        """Lowercases the query, collapses whitespace and strips surrounding punctuation."""
+        return re.sub(r'\s+', ' ', user_query.lower()).strip(' ?!.,;:')
+
+    def embed(self, user_query: str) -> Optional[np.ndarray]:
+        """Returns the normalized embedding used for semantic matching of user_query, None without embedding function."""
+        if self.embedding_function is None:
+            return None
+        embedding = np.asarray(self.embedding_function.encode([user_query])[0], dtype=np.float32)
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+    def _is_expired(self, entry: _CacheEntry, now: float) -> bool:
+        return self.ttl_seconds is not None and now - entry.created_at > self.ttl_seconds
+
+    def _remove(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+        query_keys = self._keys_by_docs.get(key[1])
+        if query_keys is not None:
+            query_keys.pop(key[0], None)
+            if not query_keys:
+                del self._keys_by_docs[key[1]]
+
+    def _live_entry(self, key: CacheKey, now: float) -> Optional[_CacheEntry]:
+        """Returns the entry under key, dropping it if it expired. Must be called under the lock."""
+        entry = self._entries.get(key)
+        if entry is not None and self._is_expired(entry, now):
+            self._remove(key)
+            self._stats.expirations += 1
+            return None
+        return entry
+
+    def lookup(self,
+               user_query: str,
+               doc_ids: List[str],
+               query_embedding: Optional[np.ndarray] = None
+               ) -> Optional[str]:
+        """ Returns the cached answer for a query whose retrieval returned doc_ids, if any.
+
+        Args:
+            user_query: The user's query.
+            doc_ids: Ids of the retrieved documents, in retrieval order.
+            query_embedding: Embedding of user_query returned by embed. Computed if needed when None.
+
+        Returns:
+            Optional[str]: The cached answer, or None on a miss.
+        """
+        query_key, docs_key = self.normalize(user_query), tuple(doc_ids)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live_entry((query_key, docs_key), now)
+            if entry is not None:
+                self._entries.move_to_end((query_key, docs_key))
+                self._stats.exact_hits += 1
+                return entry.answer
+            candidate_keys = list(self._keys_by_docs.get(docs_key, ()))
+            if self.embedding_function is None or not candidate_keys:
+                self._stats.misses += 1
+                return None
+        if query_embedding is None:
+            # Embedding runs outside the lock so concurrent lookups are not serialized on the model
+            query_embedding = self.embed(user_query)
+        with self._lock:
+            best_key, best_similarity = None, self.similarity_threshold
+            for candidate_key in candidate_keys:
+                entry = self._live_entry((candidate_key, docs_key), now)
+                if entry is None or entry.embedding is None:
+                    continue
+                similarity = float(entry.embedding @ query_embedding)
+                if similarity >= best_similarity:
+                    best_key, best_similarity = candidate_key, similarity
+            if best_key is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end((best_key, docs_key))
+            self._stats.semantic_hits += 1
+            logger.info("SemanticAnswerCache semantic hit for query: %s (similarity %.3f)", user_query, best_similarity)
+            return self._entries[(best_key, docs_key)].answer
+
+    def store(self,
+              user_query: str,
+              doc_ids: List[str],
+              answer: str,
+              query_embedding: Optional[np.ndarray] = None
+              ) -> None:
+        """ Caches the answer generated for a query whose retrieval returned doc_ids.
+
+        Args:
+            user_query: The user's query.
+            doc_ids: Ids of the retrieved documents, in retrieval order.
+            answer: The generated answer.
+            query_embedding: Embedding of user_query returned by embed. Computed when None.
+        """
+        key = (self.normalize(user_query), tuple(doc_ids))
+        embedding = query_embedding if query_embedding is not None else self.embed(user_query)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _CacheEntry(answer=answer, created_at=time.monotonic(), embedding=embedding)
+            self._keys_by_docs.setdefault(key[1], {})[key[0]] = None
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    @property
+    def stats(self) -> AnswerCacheStats:
+        """Snapshot of the lookup counters."""
+        with self._lock:
+            return replace(self._stats)
+
+    def clear(self) -> None:
+        """Drops every cached answer and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_docs.clear()
+            self._stats = AnswerCacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
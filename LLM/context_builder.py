@@ -0,0 +1,203 @@
+"""Token-aware construction of the LLM context from retrieved documents."""
+
+from typing import List, Tuple, Optional, Set
+from typing_extensions import override
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import math
+import re
+
+import pydantic
+from transformers import AutoTokenizer, PreTrainedTokenizerBase
+
+from Schema.schema import BaseDocument
+from Internals.logger import logger
+from Internals.model_registry import model_registry
+from CustomExceptions import llm_exceptions
+
+
+class TokenCounterI(ABC):
+    """Interface class for counting the tokens of texts as the LLM tokenizes them."""
+    @abstractmethod
+    def count(self, texts: List[str]) -> List[int]:
+        ...
+
+
+class ApproximateTokenCounter(pydantic.BaseModel, TokenCounterI):
+    """Estimates token counts from the number of characters, for when the LLM tokenizer is not available.
+
+    Attributes:
+        chars_per_token: Average number of characters per token (about 4 for English BPE vocabularies).
+    """
+    chars_per_token: float = pydantic.Field(default=4.0, gt=0.0)
+
+    @override
+    def count(self, texts: List[str]) -> List[int]:
+        return [math.ceil(len(text) / self.chars_per_token) for text in texts]
+
+
+class HFTokenCounter(pydantic.BaseModel, TokenCounterI):
+    """Counts tokens with a Hugging Face tokenizer matching the LLM.
+
+    The tokenizer is loaded through the process-wide model registry, on first use or up front
+    with load_tokenizer. If it cannot be loaded (e.g. offline without a cached copy), a warning
+    is logged once and tokens are counted with the fallback counter from then on.
+
+    Attributes:
+        tokenizer_name_or_path: Hugging Face tokenizer name or local path.
+        tokenizer: Hugging Face tokenizer, loaded from tokenizer_name_or_path if None.
+        fallback: Counter used when the tokenizer cannot be loaded. None raises instead.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    tokenizer_name_or_path: str
+    tokenizer: Optional[PreTrainedTokenizerBase] = pydantic.Field(default=None, repr=False)
+    fallback: Optional[TokenCounterI] = pydantic.Field(default_factory=ApproximateTokenCounter)
+    _use_fallback: bool = pydantic.PrivateAttr(default=False)
+
+    def load_tokenizer(self) -> None:
+        """Loads the tokenizer from the model registry if it is not set yet, switching to the fallback counter if that fails.
+
+        Raises:
+            TokenizerLoadingError: If tokenizer loading fails and there is no fallback counter.
+        """
+        if self.tokenizer is not None or self._use_fallback:
+            return
+        try:
+            self.tokenizer = model_registry.get(('AutoTokenizer', self.tokenizer_name_or_path),
+                                                lambda: AutoTokenizer.from_pretrained(self.tokenizer_name_or_path))
+        except Exception as e:
+            msg = f"HFTokenCounter failed to load tokenizer {self.tokenizer_name_or_path}."
+            if self.fallback is None:
+                logger.exception(msg)
+                raise llm_exceptions.TokenizerLoadingError(msg) from e
+            logger.warning(f"{msg} Counting tokens with {self.fallback!r} instead: {e}")
+            self._use_fallback = True
+
+    @override
+    def count(self, texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        self.load_tokenizer()
+        if self._use_fallback:
+            return self.fallback.count(texts)
+        return [len(input_ids) for input_ids in self.tokenizer(texts, add_special_tokens=False)['input_ids']]
+
+
+@dataclass
+class PackedContext:
+    """ Context packed by a ContextBuilder.
+
+    Attributes:
+        text: Context string given to the prompt template.
+        documents: Documents included in the context, in context order.
+        num_tokens: Token count of text, separators included.
+        num_duplicates: Retrieved documents dropped because they overlap already packed ones.
+        num_truncated: Documents cut to fit the budget (at most one, when nothing else fits).
+    """
+    text: str
+    documents: List[BaseDocument] = field(default_factory=list, repr=False)
+    num_tokens: int = 0
+    num_duplicates: int = 0
+    num_truncated: int = 0
+
+
+class ContextBuilder(pydantic.BaseModel):
+    """Packs retrieved documents into a context that fits a token budget.
+
+    1. Documents whose word shingles are mostly covered by a more relevant document (duplicate
+       or overlapping chunks) are dropped.
+    2. The remaining documents are selected greedily by relevance score per token until the
+       budget is spent, so short relevant chunks are not crowded out by one long chunk.
+    3. Selected documents are joined with a separator, most relevant first.
+
+    If not even one document fits, the most relevant one is truncated to the budget.
+
+    Attributes:
+        token_counter: Counts tokens as the LLM tokenizes them.
+        max_tokens: Token budget of the context.
+        separator: String placed between documents.
+        duplicate_threshold: Fraction of a document's shingles already packed above which it is dropped.
+        shingle_size: Number of words per shingle used for overlap detection.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    token_counter: TokenCounterI = pydantic.Field(default_factory=ApproximateTokenCounter)
+    max_tokens: int = pydantic.Field(default=1500, gt=0)
+    separator: str = pydantic.Field(default="\n\n")
+    duplicate_threshold: float = pydantic.Field(default=0.8, gt=0.0, le=1.0)
+    shingle_size: int = pydantic.Field(default=5, gt=0)
+
+    def _shingles(self, text: str) -> Set[Tuple[str, ...]]:
+        words = re.findall(r'\w+', text.lower())
+        if len(words) <= self.shingle_size:
+            return {tuple(words)} if words else set()
+        return {tuple(words[start: start + self.shingle_size]) for start in range(len(words) - self.shingle_size + 1)}
+
+    def _deduplicate(self,
+                     scored_docs: List[Tuple[BaseDocument, float]]
+                     ) -> List[Tuple[BaseDocument, float]]:
+        """Drops documents mostly covered by more relevant documents, keeping score order."""
+        packed_shingles: Set[Tuple[str, ...]] = set()
+        unique_docs = []
+        for doc, score in sorted(scored_docs, key=lambda scored_doc: scored_doc[1], reverse=True):
+            shingles = self._shingles(doc.content)
+            if shingles and len(shingles & packed_shingles) / len(shingles) >= self.duplicate_threshold:
+                continue
+            packed_shingles |= shingles
+            unique_docs.append((doc, score))
+        return unique_docs
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Returns the longest word prefix of text within max_tokens, by binary search over word counts."""
+        words = text.split(' ')
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.token_counter.count([' '.join(words[:middle])])[0] <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return ' '.join(words[:low])
+
+    def build(self, scored_docs: List[Tuple[BaseDocument, float]]) -> PackedContext:
+        """ Packs (document, relevance score) pairs into a context within the token budget.
+
+        Args:
+            scored_docs: Retrieved documents with their relevance scores (higher is more relevant).
+
+        Returns:
+            PackedContext: The context string and the documents it contains.
+        """
+        if not scored_docs:
+            return PackedContext(text='')
+        unique_docs = self._deduplicate(scored_docs)
+        num_duplicates = len(scored_docs) - len(unique_docs)
+        separator_tokens = self.token_counter.count([self.separator])[0] if self.separator else 0
+        doc_tokens = self.token_counter.count([doc.content for doc, _ in unique_docs])
+        # Scores are shifted to be positive so that relevance per token also ranks negative similarities
+        min_score = min(score for _, score in unique_docs)
+        by_density = sorted(range(len(unique_docs)),
+                            key=lambda index: (unique_docs[index][1] - min_score + 1e-6) / max(doc_tokens[index], 1),
+                            reverse=True)
+        selected, used_tokens = [], 0
+        for index in by_density:
+            cost = doc_tokens[index] + (separator_tokens if selected else 0)
+            if used_tokens + cost <= self.max_tokens:
+                selected.append(index)
+                used_tokens += cost
+        if not selected:
+            doc, _ = unique_docs[0]
+            text = self._truncate(doc.content, self.max_tokens)
+            return PackedContext(text=text,
+                                 documents=[doc],
+                                 num_tokens=self.token_counter.count([text])[0],
+                                 num_duplicates=num_duplicates,
+                                 num_truncated=1)
+        selected.sort()
+        documents = [unique_docs[index][0] for index in selected]
+        return PackedContext(text=self.separator.join(doc.content for doc in documents),
+                             documents=documents,
+                             num_tokens=used_tokens,
+                             num_duplicates=num_duplicates)
@@ -0,0 +1,111 @@
+"""LLM backend running a GGUF model in process with llama-cpp-python, without an Ollama server."""
+
+from typing import Iterator, Optional, Any
+from typing_extensions import override
+import threading
+import asyncio
+import queue
+
+import pydantic
+from llama_cpp import Llama
+
+from LLM.llm_backends import LLMBackendI
+from Internals.logger import logger
+from Internals.model_registry import model_registry
+from CustomExceptions import llm_exceptions
+
+# Marks the end of a streamed generation in the chunk queue
+_END_OF_STREAM = object()
+
+class LlamaCppBackend(pydantic.BaseModel, LLMBackendI):
+    """Generation with llama.cpp in the calling process, skipping the HTTP round trips to Ollama.
+
+    The model is loaded lazily on first use through the process-wide model registry. A llama.cpp
+    context serves one generation at a time, so generations are serialized with a lock and async
+    calls run on a worker thread. Streamed generations also run on a worker thread holding the
+    lock, so the lock is released when generation ends even if the caller abandons the stream. llama.cpp reuses the KV cache of the longest prefix shared
+    with the previous prompt, so a static prompt prefix is only processed once.
+
+    Attributes:
+        model_path: Path of the GGUF model file.
+        n_ctx: Context window size in tokens.
+        n_threads: Number of CPU threads. None lets llama.cpp decide.
+        n_gpu_layers: Number of layers offloaded to the GPU.
+        max_tokens: Maximum number of generated tokens.
+        temperature: Sampling temperature.
+        model: llama.cpp model, loaded from model_path if None.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    model_path: str
+    n_ctx: int = pydantic.Field(default=4096, gt=0)
+    n_threads: Optional[int] = pydantic.Field(default=None)
+    n_gpu_layers: int = pydantic.Field(default=0)
+    max_tokens: int = pydantic.Field(default=1024, gt=0)
+    temperature: float = pydantic.Field(default=0.8, ge=0.0)
+    model: Optional[Llama] = pydantic.Field(default=None, repr=False)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def load_model(self) -> None:
+        """Loads the llama.cpp model from the model registry if it is not set yet.
+
+        Raises:
+            LLMBackendError: If model loading fails.
+        """
+        if self.model is not None:
+            return
+        try:
+            self.model = model_registry.get(('Llama', self.model_path, self.n_ctx, self.n_gpu_layers),
+                                            lambda: Llama(model_path=self.model_path,
+                                                          n_ctx=self.n_ctx,
+                                                          n_threads=self.n_threads,
+                                                          n_gpu_layers=self.n_gpu_layers,
+                                                          verbose=False))
+        except Exception as e:
+            msg = f"LlamaCppBackend model loading failed with {self.model_path} model_path."
+            logger.exception(msg)
+            raise llm_exceptions.LLMBackendError(msg) from e
+
+    def _completion(self, prompt: str, stream: bool) -> Any:
+        return self.model(prompt, max_tokens=self.max_tokens, temperature=self.temperature, stream=stream)
+
+    @override
+    def invoke(self, prompt: str) -> str:
+        self.load_model()
+        with self._lock:
+            return self._completion(prompt, stream=False)['choices'][0]['text']
+
+    def _stream_into(self, prompt: str, chunks: queue.Queue, stop: threading.Event) -> None:
+        """Runs a streamed completion under the lock, putting its text chunks (or its error) into chunks until it ends or stop is set."""
+        try:
+            with self._lock:
+                completion = self._completion(prompt, stream=True)
+                try:
+                    for chunk in completion:
+                        if stop.is_set():
+                            break
+                        chunks.put(chunk['choices'][0]['text'])
+                finally:
+                    completion.close()
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_END_OF_STREAM)
+
+    @override
+    def stream(self, prompt: str) -> Iterator[str]:
+        self.load_model()
+        chunks: queue.Queue = queue.Queue()
+        stop = threading.Event()
+        threading.Thread(target=self._stream_into, args=(prompt, chunks, stop), name='llama-cpp-stream', daemon=True).start()
+        try:
+            while (chunk := chunks.get()) is not _END_OF_STREAM:
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            # Closing the stream early stops the generation at its next token
+            stop.set()
+
+    @override
+    async def ainvoke(self, prompt: str) -> str:
+        return await asyncio.to_thread(self.invoke, prompt)
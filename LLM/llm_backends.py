@@ -0,0 +1,138 @@
+"""Defines the LLM backend interface used by the RAG LLMs and its Ollama and fake implementations."""
+
+from typing import Iterator, AsyncIterator, Optional, Union
+from typing_extensions import override
+from abc import ABC, abstractmethod
+import hashlib
+import asyncio
+import time
+
+import pydantic
+from langchain.llms import Ollama
+
+
+class LLMBackendI(ABC):
+    """Interface class for text generation backends."""
+    @abstractmethod
+    def invoke(self, prompt: str) -> str:
+        ...
+
+    @abstractmethod
+    def stream(self, prompt: str) -> Iterator[str]:
+        ...
+
+    @abstractmethod
+    async def ainvoke(self, prompt: str) -> str:
+        ...
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Streams the generated text chunks without blocking the event loop. Defaults to one chunk from ainvoke."""
+        yield await self.ainvoke(prompt)
+
+
+class OllamaBackend(pydantic.BaseModel, LLMBackendI):
+    """Generation through an Ollama server, with the langchain Ollama client.
+
+    The client is created with the backend instead of at import time, so importing the RAG LLMs
+    does not build any model client.
+
+    Attributes:
+        model: Ollama model name.
+        base_url: URL of the Ollama server.
+        keep_alive: How long Ollama keeps the model loaded after a request (e.g. '30m', -1 for ever).
+        num_ctx: Context window size in tokens. None keeps the model default.
+        num_thread: Number of CPU threads used by Ollama. None lets Ollama decide.
+        num_predict: Maximum number of generated tokens. None keeps the model default.
+        temperature: Sampling temperature. None keeps the model default.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    model: str = pydantic.Field(default="llama3.2")
+    base_url: str = pydantic.Field(default="http://localhost:11434")
+    keep_alive: Optional[Union[int, str]] = pydantic.Field(default=None)
+    num_ctx: Optional[int] = pydantic.Field(default=None)
+    num_thread: Optional[int] = pydantic.Field(default=None)
+    num_predict: Optional[int] = pydantic.Field(default=None)
+    temperature: Optional[float] = pydantic.Field(default=None)
+    _client: Optional[Ollama] = pydantic.PrivateAttr(default=None)
+
+    def model_post_init(self, context):
+        self._client = Ollama(model=self.model,
+                              base_url=self.base_url,
+                              keep_alive=self.keep_alive,
+                              num_ctx=self.num_ctx,
+                              num_thread=self.num_thread,
+                              num_predict=self.num_predict,
+                              temperature=self.temperature)
+
+    @property
+    def client(self) -> Ollama:
+        """The langchain Ollama client, e.g. for Ollama specific generation info."""
+        return self._client
+
+    @override
+    def invoke(self, prompt: str) -> str:
+        return self._client.invoke(prompt)
+
+    @override
+    def stream(self, prompt: str) -> Iterator[str]:
+        return self._client.stream(prompt)
+
+    @override
+    async def ainvoke(self, prompt: str) -> str:
+        return await self._client.ainvoke(prompt)
+
+    @override
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        async for chunk in self._client.astream(prompt):
+            yield chunk
+
+
+class FakeLLMBackend(pydantic.BaseModel, LLMBackendI):
+    """Deterministic in-process backend with configurable latency, to benchmark and exercise the RAG path offline.
+
+    The answer is `answer` followed by a digest of the prompt, so equal prompts get equal answers
+    and different prompts get different ones. Generation sleeps `prefill_latency` before the first
+    word and `token_latency` between words, like a model streaming one word per token.
+
+    Attributes:
+        answer: Fixed part of every answer.
+        prefill_latency: Seconds before the first word.
+        token_latency: Seconds between words.
+        num_calls: Number of generations so far.
+    """
+    answer: str = pydantic.Field(default="This is a deterministic answer from the fake LLM backend.")
+    prefill_latency: float = pydantic.Field(default=0.0, ge=0.0)
+    token_latency: float = pydantic.Field(default=0.0, ge=0.0)
+    num_calls: int = pydantic.Field(default=0)
+
+    def _words(self, prompt: str) -> list:
+        self.num_calls += 1
+        digest = hashlib.md5(prompt.encode('utf-8')).hexdigest()[:8]
+        words = f"{self.answer} [{digest}]".split(' ')
+        return [word if index == 0 else ' ' + word for index, word in enumerate(words)]
+
+    @override
+    def invoke(self, prompt: str) -> str:
+        return ''.join(self.stream(prompt))
+
+    @override
+    def stream(self, prompt: str) -> Iterator[str]:
+        words = self._words(prompt)
+        time.sleep(self.prefill_latency)
+        for index, word in enumerate(words):
+            if index:
+                time.sleep(self.token_latency)
+            yield word
+
+    @override
+    async def ainvoke(self, prompt: str) -> str:
+        return ''.join([word async for word in self.astream(prompt)])
+
+    @override
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        words = self._words(prompt)
+        await asyncio.sleep(self.prefill_latency)
+        for index, word in enumerate(words):
+            if index:
+                await asyncio.sleep(self.token_latency)
+            yield word
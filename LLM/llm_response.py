@@ -1,6 +1,6 @@
 """Defines the data structure for RAG LLM model responses."""
 
-from typing import List
+from typing import List, Dict
 from dataclasses import dataclass, field
 
 from Schema.schema import BaseDocument
@@ -14,7 +14,27 @@ class RAGLLMResponse:
         llm_resopnse: Response generated by the language model.
         relevant_docs : The list of documents retrieved from the vector store 
             that were used as context for generating the response.
+        relevance_scores: Similarity scores of relevant_docs, in the same order.
+        stage_timings: Milliseconds spent in each stage of the query (retrieval, context, generation, ...).
     """
     user_query: str
     llm_resopnse: str = field(repr=False)
-    relevant_docs: List[BaseDocument]=  field(repr=False)
\ No newline at end of file
+    relevant_docs: List[BaseDocument]=  field(repr=False)
+    relevance_scores: List[float] = field(default_factory=list, repr=False)
+    stage_timings: Dict[str, float] = field(default_factory=dict, repr=False)
+
+
+@dataclass
+class RAGLLMRetrieval:
+    """ First event of a streamed RAG LLM response, emitted before any generated token.
+
+    Attributes:
+        user_query: The original user query string that was input to the model.
+        relevant_docs: The documents retrieved from the vector store and used as context.
+        relevance_scores: Similarity scores of relevant_docs, in the same order.
+        stage_timings: Milliseconds spent in each stage before the first token (retrieval, context).
+    """
+    user_query: str
+    relevant_docs: List[BaseDocument] = field(repr=False)
+    relevance_scores: List[float] = field(default_factory=list, repr=False)
+    stage_timings: Dict[str, float] = field(default_factory=dict, repr=False)
@@ -0,0 +1,38 @@
+"""Assembles RAG prompt templates whose static instructions form a byte-identical prefix.
+
+Ollama (like llama.cpp) keeps the KV cache of the previous prompt and only processes the tokens
+after the longest common prefix with it. A template interleaving instructions with the variable
+context shares almost nothing between queries; putting every static instruction first lets
+consecutive queries reuse the whole instruction block and only prefill the context and question.
+"""
+
+from langchain_core.prompts.prompt import PromptTemplate
+
+
+def static_prefix_template(instructions: str,
+                           context_header: str = "Context:",
+                           question_header: str = "Question:"
+                           ) -> PromptTemplate:
+    """ Builds a (context, user_query) prompt template starting with the static instructions.
+
+    Args:
+        instructions: Every static instruction of the prompt. Braces are escaped, so the text
+                      is kept verbatim.
+        context_header: Line introducing the retrieved context.
+        question_header: Line introducing the user query.
+
+    Returns:
+        PromptTemplate: Template formatting to instructions, then context, then user query.
+    """
+    escaped_instructions = instructions.strip().replace('{', '{{').replace('}', '}}')
+    return PromptTemplate(
+        input_variables=["context", "user_query"],
+        template=f"{escaped_instructions}\n\n{context_header}\n{{context}}\n\n{question_header}\n{{user_query}}\n"
+    )
+
+
+def static_prefix(prompt_template: PromptTemplate) -> str:
+    """Returns the part of the formatted prompt shared by every query, i.e. the text before the first variable."""
+    sentinel = '\x00'
+    formatted = prompt_template.format(**{variable: sentinel for variable in prompt_template.input_variables})
+    return formatted.split(sentinel, 1)[0]
@@ -0,0 +1,109 @@
+"""Rewriting of user queries into variants for multi-query retrieval."""
+
+from typing import List, Dict
+from typing_extensions import override
+from abc import ABC, abstractmethod
+import re
+
+import pydantic
+
+STOPWORDS = frozenset("""
+a about an and any anything are as at be been being can could did do does for from give has have how
+i in is it its latest me most my new news of on or please recent should show some tell that the their
+there these this those to was were what whats when where which who why will with would you your
+""".split())
+
+ABBREVIATIONS: Dict[str, str] = {
+    'ai': 'artificial intelligence',
+    'agi': 'artificial general intelligence',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'llm': 'large language model',
+    'llms': 'large language models',
+    'nlp': 'natural language processing',
+    'cv': 'computer vision',
+    'rl': 'reinforcement learning',
+    'rlhf': 'reinforcement learning from human feedback',
+    'rag': 'retrieval augmented generation',
+    'gan': 'generative adversarial network',
+    'gpu': 'graphics processing unit',
+    'gpus': 'graphics processing units',
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+class QueryRewriterI(ABC):
+    """Interface class for rewriting a user query into search queries."""
+    @abstractmethod
+    def rewrite(self, query: str) -> List[str]:
+        """Returns the search queries for query, starting with query itself."""
+        ...
+
+
+class RuleBasedQueryRewriter(pydantic.BaseModel, QueryRewriterI):
+    """Rewrites a query into up to `max_variants` search queries with cheap deterministic rules.
+
+    Short or vague chat questions ("what about LLMs?") embed poorly and share few terms with the
+    chunks that answer them. Besides the original query, the rules produce, in this order:
+        - The query with its abbreviations expanded ("llms" -> "large language models") or its
+          expansions abbreviated, so both spellings of a term are searched.
+        - The keywords of the query, without question words, stopwords and punctuation.
+        - The keywords with singular and plural forms swapped ("robots" -> "robot").
+    Duplicate variants are dropped, so a query the rules cannot improve is searched alone.
+
+    Attributes:
+        max_variants: Maximum number of search queries, the original query included.
+        abbreviations: Mapping of lowercase abbreviations to their expansions.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    max_variants: int = pydantic.Field(default=3, gt=0)
+    abbreviations: Dict[str, str] = pydantic.Field(default_factory=lambda: dict(ABBREVIATIONS), repr=False)
+
+    def _swap_abbreviations(self, text: str) -> str:
+        tokens = text.split(' ')
+        if any(token in self.abbreviations for token in tokens):
+            return ' '.join(self.abbreviations.get(token, token) for token in tokens)
+        for abbreviation, expansion in self.abbreviations.items():
+            text = re.sub(rf"\b{re.escape(expansion)}\b", abbreviation, text)
+        return text
+
+    @staticmethod
+    def _swap_number(token: str) -> str:
+        if len(token) <= 3 or not token.isalpha():
+            return token
+        if token.endswith('ies'):
+            return token[:-3] + 'y'
+        if token.endswith('s') and not token.endswith('ss'):
+            return token[:-1]
+        return token + 's'
+
+    @override
+    def rewrite(self, query: str) -> List[str]:
+        """ Returns the original query followed by its rule-based variants.
+
+        Args:
+            query: The user's query.
+
+        Returns:
+            List[str]: At most max_variants distinct search queries, the original query first.
+        """
+        query = query.strip()
+        # Apostrophes are dropped so contractions and possessives match the stopwords ("what's" -> "whats")
+        tokens = _TOKEN_PATTERN.findall(query.lower().replace("'", ""))
+        keywords = [token for token in tokens if token not in STOPWORDS]
+        candidates = [query]
+        if keywords:
+            keyword_query = ' '.join(keywords)
+            candidates += [self._swap_abbreviations(keyword_query),
+                           keyword_query,
+                           ' '.join(self._swap_number(keyword) for keyword in keywords)]
+        variants, seen = [], set()
+        for candidate in candidates:
+            normalized = ' '.join(_TOKEN_PATTERN.findall(candidate.lower().replace("'", "")))
+            if normalized not in seen:
+                seen.add(normalized)
+                variants.append(candidate)
+        return variants[:self.max_variants]
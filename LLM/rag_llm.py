@@ -1,16 +1,25 @@
 """"Defines the RAG LLM interface and concrete implementatinos."""
 
-from typing import Protocol, runtime_checkable, List
+from typing import Optional, Protocol, runtime_checkable, List, Tuple, Iterator, Union
+import asyncio
+import time
 
 import numpy as np
 import pydantic
-from langchain.llms import Ollama
 from langchain_core.prompts.prompt import PromptTemplate
 
 from VectorStore import base_vector_store
-from LLM.llm_response import RAGLLMResponse
+from VectorStore.search_filter import SearchFilter
+from VectorStore.fusion import reciprocal_rank_fusion
+from LLM.llm_response import RAGLLMResponse, RAGLLMRetrieval
+from LLM.llm_backends import LLMBackendI, OllamaBackend
+from LLM.answer_cache import SemanticAnswerCache
+from LLM.context_builder import ContextBuilder
+from LLM.reranker import RerankerI
+from LLM.query_rewriter import QueryRewriterI
 from Schema.schema import BaseDocument
 from Internals.logger import logger
+from Internals.stage_timer import StageTimer
 from CustomExceptions import llm_exceptions
 
 
@@ -47,23 +56,34 @@ class OllamaRAGLLM(pydantic.BaseModel):
     """OllamaRAGLLM is a Retrieval-Augmented Generation (RAG) model wrapper that integrates:
         - A vector store for document retrieval.
         - A prompt template to inject context into queries.
-        - An Ollama LLM to generate responses.
+        - An LLM backend (Ollama by default) to generate responses.
 
     The model retrieves relevant documents from a vector store based on user queries, 
     constructs a context, and invokes the LLM with a dynamically formatted prompt.
 
     Attributes:
-        model: language model (default is 'llama3.2').
+        model: LLM backend generating the answers (default is Ollama 'llama3.2', created with the instance).
         prompt_template: Template with input variables ('context', 'user_query').
         vectorstore: Vectorstore that follows VectorStoreI inteface.
+        reranker: Optional second-stage reranker. Retrieval then fetches its wider candidate set
+                  and keeps the top-k after rescoring.
+        context_builder: Packs the retrieved documents into a context within a token budget.
+        answer_cache: Optional semantic answer cache. Queries whose retrieval returns the same
+                      documents as an exact or near-duplicate cached query skip generation.
+        query_rewriter: Optional query rewriter enabling multi-query retrieval. The query variants
+                        are searched in one batched search and fused with reciprocal rank fusion.
 
     Raises:
         RAGLLMInitalizationError: If OllamaRagLLM initialization fails.
     """
     model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
-    model: Ollama = pydantic.Field(default=Ollama(model='llama3.2'))
+    model: LLMBackendI = pydantic.Field(default_factory=OllamaBackend)
     prompt_template: PromptTemplate
     vectorstore: base_vector_store.VectorStoreI
+    reranker: Optional[RerankerI] = pydantic.Field(default=None)
+    context_builder: ContextBuilder = pydantic.Field(default_factory=ContextBuilder)
+    answer_cache: Optional[SemanticAnswerCache] = pydantic.Field(default=None)
+    query_rewriter: Optional[QueryRewriterI] = pydantic.Field(default=None)
 
     @pydantic.model_validator(mode='after')
     def validate_prompt_template(cls, values):
@@ -81,17 +101,23 @@ class OllamaRAGLLM(pydantic.BaseModel):
         logger.info("OllamaRAGLLM initialization done successfully.")
         return values
 
-    def _get_context(self, relevant_docs: List[BaseDocument]) -> str:
+    def _get_context(self, scored_docs: List[Tuple[BaseDocument, float]]) -> str:
         """
-        Constructs the context string by concatenating content from the retrieved documents.
+        Constructs the context string from the retrieved documents with the context builder:
+        overlapping chunks are dropped and the most relevant chunks per token are packed
+        within the token budget.
 
         Args:
-            relevant_docs: Retrieved documents.
+            scored_docs: Retrieved (document, relevance score) pairs.
 
         Returns:
-            str: Concatenated text content of relevant documents.
+            str: Packed text content of relevant documents.
         """
-        return ''.join(doc.content for doc in relevant_docs)
+        packed_context = self.context_builder.build(scored_docs)
+        logger.info("OllamaRAGLLM packed %s of %s documents in %s context tokens (%s duplicates, %s truncated).",
+                    len(packed_context.documents), len(scored_docs), packed_context.num_tokens,
+                    packed_context.num_duplicates, packed_context.num_truncated)
+        return packed_context.text
     
     def update_vectorestore(self, 
                             documents: List[BaseDocument], 
@@ -122,35 +148,255 @@ class OllamaRAGLLM(pydantic.BaseModel):
         Returns:
             List[BaseDocument]: The top-k relevant documents.
         """
+        if self.reranker is not None or self.query_rewriter is not None:
+            return [doc for doc, _ in self.get_relevant_docs_with_scores(user_query=user_query, k=k)]
         return self.vectorstore.similarity_search(user_query, k)
 
+    def _search(self,
+                user_query: str,
+                k: int,
+                search_filter: Optional[SearchFilter]
+                ) -> List[Tuple[BaseDocument, float]]:
+        """First-stage search of the top-k (document, score) pairs.
+
+        With a query rewriter, the query variants are embedded and searched in one batched search,
+        so multi-query retrieval costs one batched embed and search whatever the number of
+        variants, and the ranked lists are fused with reciprocal rank fusion (scores are RRF scores).
+        """
+        queries = [user_query] if self.query_rewriter is None else self.query_rewriter.rewrite(user_query)
+        if len(queries) <= 1:
+            return self.vectorstore.similarity_search_with_scores(user_query, k, search_filter=search_filter)
+        logger.info("OllamaRAGLLM searching %s query variants: %s", len(queries), queries)
+        results = self.vectorstore.similarity_search_batch_with_scores(queries, k, search_filter=search_filter)
+        return reciprocal_rank_fusion(results, k=k)
+
+    def get_relevant_docs_with_scores(self, 
+                                      user_query: str, 
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> List[Tuple[BaseDocument, float]]:
+        """ Retrieves the top-k relevant documents together with their similarity scores.
+
+        With a query rewriter, the query variants are searched together and their results fused
+        with reciprocal rank fusion. With a reranker, the top reranker.num_candidates documents
+        are retrieved and rescored against the original query, and the scores are the reranker
+        scores (or the first-stage scores on reranker fallback).
+
+        Args:
+            user_query: The user's query.
+            k: Number of top documents to retrieve. Defaults to 5.
+            search_filter: Optional metadata filter applied inside the vector store index.
+
+        Returns:
+            List[Tuple[BaseDocument, float]]: The top-k (document, similarity score) pairs.
+        """
+        if self.reranker is None:
+            return self._search(user_query, k, search_filter)
+        candidates = self._search(user_query, max(k, self.reranker.num_candidates), search_filter)
+        return self.reranker.rerank(user_query, candidates, k)
+
+    def retrieve_and_prompt(self,
+                            user_query: str,
+                            k: int = 5,
+                            search_filter: Optional[SearchFilter] = None,
+                            timer: Optional[StageTimer] = None
+                            ) -> Tuple[List[Tuple[BaseDocument, float]], str]:
+        """ Retrieval stage of a query: retrieves the top-k documents and formats the prompt from their context.
+
+        Args:
+            user_query: The user's query.
+            k: Number of relevant documents to retrieve. Defaults to 5.
+            search_filter: Optional metadata filter restricting the retrieved documents.
+            timer: Optional stage timer recording the 'retrieval' and 'context' stages.
+
+        Returns:
+            Tuple[List[Tuple[BaseDocument, float]], str]: The (document, relevance score) pairs and the prompt.
+        """
+        timer = timer or StageTimer()
+        with timer.stage('retrieval'):
+            scored_docs = self.get_relevant_docs_with_scores(user_query=user_query, 
+                                                             k=k,
+                                                             search_filter=search_filter)
+        with timer.stage('context'):
+            context = self._get_context(scored_docs=scored_docs)
+            prompt = self.prompt_template.format(context=context, user_query=user_query)
+        return scored_docs, prompt
+
+    def _cached_answer(self,
+                       user_query: str,
+                       scored_docs: List[Tuple[BaseDocument, float]]
+                       ) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """Returns the cached answer for the query and its retrieved documents (None without cache or
+        on a miss), and the query embedding of the cache, computed once for the lookup and the store."""
+        if self.answer_cache is None:
+            return None, None
+        query_embedding = self.answer_cache.embed(user_query)
+        return self.answer_cache.lookup(user_query, [doc.id for doc, _ in scored_docs], query_embedding), query_embedding
+
+    def _cache_answer(self,
+                      user_query: str,
+                      scored_docs: List[Tuple[BaseDocument, float]],
+                      llm_response: str,
+                      query_embedding: Optional[np.ndarray]
+                      ) -> None:
+        if self.answer_cache is not None:
+            self.answer_cache.store(user_query, [doc.id for doc, _ in scored_docs], llm_response, query_embedding)
+
+    def generate(self,
+                 user_query: str,
+                 scored_docs: List[Tuple[BaseDocument, float]],
+                 prompt: str,
+                 timer: Optional[StageTimer] = None
+                 ) -> str:
+        """ Generation stage of a query: answers the prompt of `retrieve_and_prompt`, unless the
+        answer cache has an answer for this query and these documents.
+
+        Args:
+            user_query: The user's query.
+            scored_docs: The (document, relevance score) pairs returned with the prompt.
+            prompt: The formatted prompt.
+            timer: Optional stage timer recording the 'generation' stage.
+
+        Returns:
+            str: The generated (or cached) answer.
+        """
+        timer = timer or StageTimer()
+        with timer.stage('generation'):
+            llm_response, query_embedding = self._cached_answer(user_query, scored_docs)
+            if llm_response is None:
+                llm_response = self.model.invoke(prompt)
+                self._cache_answer(user_query, scored_docs, llm_response, query_embedding)
+        return llm_response
+
+    async def agenerate(self,
+                        user_query: str,
+                        scored_docs: List[Tuple[BaseDocument, float]],
+                        prompt: str,
+                        timer: Optional[StageTimer] = None
+                        ) -> str:
+        """Asynchronous version of `generate`, answering through the async API of the LLM backend."""
+        timer = timer or StageTimer()
+        with timer.stage('generation'):
+            llm_response, query_embedding = await asyncio.to_thread(self._cached_answer, user_query, scored_docs)
+            if llm_response is None:
+                llm_response = await self.model.ainvoke(prompt)
+                await asyncio.to_thread(self._cache_answer, user_query, scored_docs, llm_response, query_embedding)
+        return llm_response
+
     def query(self, 
               user_query: str, 
-              k: int = 5
+              k: int = 5,
+              search_filter: Optional[SearchFilter] = None
               ) -> RAGLLMResponse:
         """
         Executes a retrieval-augmented query:
         1. Retrieves top-k relevant documents.
-        2. Constructs the context from the documents.
+        2. Packs the context from the documents within the token budget.
         3. Formats the prompt with context and user query.
-        4. Invokes the Ollama LLM to generate a response.
+        4. Invokes the LLM backend to generate a response, unless the answer cache has one for
+           this query and these documents.
+
+        The time spent in each stage is returned in the response stage_timings.
 
         Args:
             user_query : The user's query.
             k: Number of relevant documents to retrieve. Defaults to 5.
+            search_filter: Optional metadata filter (e.g. source_url prefix, publication date range)
+                           restricting the retrieved documents.
 
         Returns:
             RAGLLMResponse: Response object containing the user query, LLM output, and relevant documents.
         """
         logger.info(f"OllamaRAGLLM processing user query: {user_query}")
-        relevant_docs = self.get_relevant_docs(user_query=user_query, 
-                                               k=k)
-        context = self._get_context(relevant_docs=relevant_docs)
-        prompt = self.prompt_template.invoke({'context': context, 'user_query': user_query})
-        llm_response = self.model.invoke(prompt)
+        timer = StageTimer()
+        with timer.stage('total'):
+            scored_docs, prompt = self.retrieve_and_prompt(user_query=user_query, k=k, search_filter=search_filter, timer=timer)
+            llm_response = self.generate(user_query, scored_docs, prompt, timer=timer)
+        model_response = RAGLLMResponse(user_query=user_query, 
+                                         llm_resopnse=llm_response, 
+                                         relevant_docs=[doc for doc, _ in scored_docs],
+                                         relevance_scores=[score for _, score in scored_docs],
+                                         stage_timings=timer.timings
+                                         )
+        logger.info(f"OllamaRAGLLM successfully processed user query: {user_query} with stage timings {timer.timings}")
+        return model_response
+
+    def query_stream(self, 
+                     user_query: str, 
+                     k: int = 5,
+                     search_filter: Optional[SearchFilter] = None
+                     ) -> Iterator[Union[RAGLLMRetrieval, str]]:
+        """
+        Executes a retrieval-augmented query and streams the answer as the LLM generates it.
+
+        The first item is a RAGLLMRetrieval with the retrieved documents, available as soon as
+        retrieval is done, with the retrieval and context stage timings. The following items are
+        the text chunks produced by the LLM backend. Time to first token and total generation
+        time are logged.
+
+        Args:
+            user_query : The user's query.
+            k: Number of relevant documents to retrieve. Defaults to 5.
+            search_filter: Optional metadata filter (e.g. source_url prefix, publication date range)
+                           restricting the retrieved documents.
+
+        Yields:
+            RAGLLMRetrieval, then str: The retrieved documents, then the generated text chunks.
+        """
+        logger.info(f"OllamaRAGLLM streaming answer to user query: {user_query}")
+        start = time.perf_counter()
+        timer = StageTimer()
+        scored_docs, prompt = self.retrieve_and_prompt(user_query=user_query, k=k, search_filter=search_filter, timer=timer)
+        yield RAGLLMRetrieval(user_query=user_query,
+                              relevant_docs=[doc for doc, _ in scored_docs],
+                              relevance_scores=[score for _, score in scored_docs],
+                              stage_timings=timer.timings)
+        cached_answer, query_embedding = self._cached_answer(user_query, scored_docs)
+        if cached_answer is not None:
+            yield cached_answer
+            return
+        time_to_first_token = None
+        tokens = []
+        for token in self.model.stream(prompt):
+            if time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - start
+                logger.info("OllamaRAGLLM time to first token: %.3fs", time_to_first_token)
+            tokens.append(token)
+            yield token
+        self._cache_answer(user_query, scored_docs, ''.join(tokens), query_embedding)
+        logger.info("OllamaRAGLLM successfully streamed answer to user query: %s in %.3fs", user_query, time.perf_counter() - start)
+
+    async def aquery(self, 
+                     user_query: str, 
+                     k: int = 5,
+                     search_filter: Optional[SearchFilter] = None
+                     ) -> RAGLLMResponse:
+        """
+        Asynchronous version of `query`.
+
+        Retrieval is offloaded to a worker thread and generation goes through the async API of
+        the LLM backend (the async Ollama client by default), so the event loop keeps serving other queries while this one waits on the
+        vector store or the LLM server.
+
+        Args:
+            user_query : The user's query.
+            k: Number of relevant documents to retrieve. Defaults to 5.
+            search_filter: Optional metadata filter (e.g. source_url prefix, publication date range)
+                           restricting the retrieved documents.
+
+        Returns:
+            RAGLLMResponse: Response object containing the user query, LLM output, and relevant documents.
+        """
+        logger.info(f"OllamaRAGLLM asynchronously processing user query: {user_query}")
+        timer = StageTimer()
+        with timer.stage('total'):
+            scored_docs, prompt = await asyncio.to_thread(self.retrieve_and_prompt, user_query, k, search_filter, timer)
+            llm_response = await self.agenerate(user_query, scored_docs, prompt, timer=timer)
         model_response = RAGLLMResponse(user_query=user_query, 
                                          llm_resopnse=llm_response, 
-                                         relevant_docs=relevant_docs
+                                         relevant_docs=[doc for doc, _ in scored_docs],
+                                         relevance_scores=[score for _, score in scored_docs],
+                                         stage_timings=timer.timings
                                          )
         logger.info(f"OllamaRAGLLM successfully processed user query: {user_query}")
-        return model_response
\ No newline at end of file
+        return model_response
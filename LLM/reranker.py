@@ -0,0 +1,170 @@
+"""Reranking of retrieved documents with a cross-encoder under a hard latency budget."""
+
+from typing import List, Tuple, Optional
+from typing_extensions import override
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, replace
+import threading
+import time
+
+import pydantic
+from sentence_transformers import CrossEncoder
+
+from Schema.schema import BaseDocument
+from Internals.logger import logger
+from Internals.model_registry import model_registry
+from CustomExceptions import llm_exceptions
+
+
+class RerankerI(ABC):
+    """Interface class for rescoring the candidates of a first-stage retrieval."""
+    num_candidates: int
+
+    @abstractmethod
+    def rerank(self,
+               query: str,
+               scored_docs: List[Tuple[BaseDocument, float]],
+               k: int
+               ) -> List[Tuple[BaseDocument, float]]:
+        ...
+
+
+@dataclass
+class RerankerStats:
+    """ Outcome counters of a reranker.
+
+    Attributes:
+        reranked: Queries answered in reranked order.
+        fallbacks: Queries answered in first-stage order because the latency budget was exceeded
+                   or the cross-encoder failed.
+        total_latency_ms: Summed latency of the reranked queries.
+        dropped: Fallbacks whose forward pass never ran, because it was cancelled while queued
+                 or skipped by the worker once its budget had expired.
+    """
+    reranked: int = 0
+    fallbacks: int = 0
+    total_latency_ms: float = 0.0
+    dropped: int = 0
+
+    @property
+    def mean_latency_ms(self) -> float:
+        return self.total_latency_ms / self.reranked if self.reranked else 0.0
+
+
+class CrossEncoderReranker(pydantic.BaseModel, RerankerI):
+    """Reranks the top `num_candidates` documents with a cross-encoder in one batched forward pass.
+
+    The forward pass runs on a worker thread and the caller waits at most `latency_budget_ms`,
+    queueing included. When the budget is exceeded or the cross-encoder fails, the first-stage
+    (bi-encoder) order is returned, so reranking never adds more than the budget to a query.
+    A request whose budget expires is cancelled if still queued, and skipped if a worker picks it
+    up afterwards, so late requests do not delay the ones behind them.
+    The model is loaded lazily on first use through the process-wide model registry; call
+    `load_model` at startup so the first queries do not spend their budget on loading.
+
+    Attributes:
+        model_name_or_path: Hugging Face cross-encoder name or local path.
+        model: CrossEncoder model, loaded from model_name_or_path if None.
+        num_candidates: Number of first-stage candidates to rescore.
+        latency_budget_ms: Maximum time to wait for the cross-encoder scores.
+        max_workers: Number of concurrent forward passes.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    model_name_or_path: str = pydantic.Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2")
+    model: Optional[CrossEncoder] = pydantic.Field(default=None, repr=False)
+    num_candidates: int = pydantic.Field(default=20, gt=0)
+    latency_budget_ms: float = pydantic.Field(default=250.0, gt=0.0)
+    max_workers: int = pydantic.Field(default=2, gt=0)
+    _executor: Optional[ThreadPoolExecutor] = pydantic.PrivateAttr(default=None)
+    _stats: RerankerStats = pydantic.PrivateAttr(default_factory=RerankerStats)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context):
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cross-encoder')
+
+    def load_model(self) -> None:
+        """Loads the CrossEncoder model from the model registry if it is not set yet.
+
+        Raises:
+            RerankerError: If model loading fails.
+        """
+        if self.model is not None:
+            return
+        try:
+            self.model = model_registry.get(('CrossEncoder', self.model_name_or_path),
+                                            lambda: CrossEncoder(self.model_name_or_path))
+        except Exception as e:
+            msg = f"CrossEncoderReranker model loading failed with {self.model_name_or_path} model_name_or_path."
+            logger.exception(msg)
+            raise llm_exceptions.RerankerError(msg) from e
+
+    def _predict(self, query: str, documents: List[BaseDocument], deadline: float) -> Optional[List[float]]:
+        """Returns the cross-encoder scores of documents, or None without scoring if the caller's deadline has passed."""
+        if time.perf_counter() >= deadline:
+            with self._lock:
+                self._stats.dropped += 1
+            return None
+        self.load_model()
+        scores = self.model.predict([(query, document.content) for document in documents],
+                                    batch_size=len(documents),
+                                    show_progress_bar=False)
+        return [float(score) for score in scores]
+
+    @override
+    def rerank(self,
+               query: str,
+               scored_docs: List[Tuple[BaseDocument, float]],
+               k: int
+               ) -> List[Tuple[BaseDocument, float]]:
+        """ Rescores the first-stage candidates and returns the top-k by cross-encoder score.
+
+        Args:
+            query: The user's query.
+            scored_docs: First-stage (document, score) pairs, best first.
+            k: Number of documents to return.
+
+        Returns:
+            List[Tuple[BaseDocument, float]]: Top-k (document, cross-encoder score) pairs, or the
+                                              first-stage top-k if the latency budget is exceeded.
+        """
+        if len(scored_docs) <= 1:
+            return scored_docs[:k]
+        start = time.perf_counter()
+        deadline = start + self.latency_budget_ms / 1000
+        prediction = self._executor.submit(self._predict, query, [document for document, _ in scored_docs], deadline)
+        try:
+            scores = prediction.result(timeout=self.latency_budget_ms / 1000)
+        except FutureTimeoutError:
+            logger.warning("CrossEncoderReranker exceeded its %.0fms budget, keeping first-stage order for query: %s",
+                           self.latency_budget_ms, query)
+            cancelled = prediction.cancel()
+            with self._lock:
+                self._stats.fallbacks += 1
+                self._stats.dropped += int(cancelled)
+            return scored_docs[:k]
+        except Exception:
+            logger.exception("CrossEncoderReranker failed, keeping first-stage order for query: %s", query)
+            with self._lock:
+                self._stats.fallbacks += 1
+            return scored_docs[:k]
+        if scores is None:
+            # Skipped by the worker at the deadline, just before the wait timed out
+            with self._lock:
+                self._stats.fallbacks += 1
+            return scored_docs[:k]
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats.reranked += 1
+            self._stats.total_latency_ms += latency_ms
+        reranked = sorted(zip((document for document, _ in scored_docs), scores), key=lambda pair: pair[1], reverse=True)
+        return reranked[:k]
+
+    @property
+    def stats(self) -> RerankerStats:
+        """Snapshot of the outcome counters."""
+        with self._lock:
+            return replace(self._stats)
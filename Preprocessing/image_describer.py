@@ -12,6 +12,7 @@ from Preprocessing import image_loaders
 from Schema.schema import ImageDocument
 from Internals import utils
 from Internals.logger import logger
+from Internals.model_registry import model_registry
 from CustomExceptions import preprocessing_exceptions
 
 
@@ -25,6 +26,8 @@ class ImageDescriberI(ABC):
 class BLIPImageDescriber(pydantic.BaseModel, ImageDescriberI):
     """Generate image descriptions using  Hugging Face BLIP model.
 
+    The processor and model are loaded lazily on first use through the process-wide model registry.
+
     Attributes:
         pretrained_model_name_or_path: Name or path to the pretrained BLIP model to load.
         processor: Optional pre-initialized BLIP processor. If None, it is loaded from pretrained.
@@ -39,19 +42,26 @@ class BLIPImageDescriber(pydantic.BaseModel, ImageDescriberI):
     processor: Optional[BlipProcessor] = pydantic.Field(default=None, repr=False)
     model: Optional[BlipForConditionalGeneration] = pydantic.Field(default=None, repr=False)
 
-    def model_post_init(self, context):
+    def load_model(self) -> None:
+        """Loads the BLIP processor and model from the model registry if they are not set yet.
+
+        Raises:
+            ImageDescriptionError: If processor or model loading fails.
+        """
         if self.processor is None:
             try:
-                self.processor =  BlipProcessor.from_pretrained(self.pretrained_model_name_or_path)
+                self.processor = model_registry.get(('BlipProcessor', self.pretrained_model_name_or_path),
+                                                    lambda: BlipProcessor.from_pretrained(self.pretrained_model_name_or_path))
             except Exception as e:
-                msg = f"BLIPImageDescriber initialization failed due to error in BlipProcessor.from_pretrained with {self.pretrained_model_name_or_path} model_name_or_path"
+                msg = f"BLIPImageDescriber model loading failed due to error in BlipProcessor.from_pretrained with {self.pretrained_model_name_or_path} model_name_or_path"
                 logger.exception(msg)
                 raise preprocessing_exceptions.ImageDescriptionError(msg) from e
+        if self.model is None:
             try:
-                if self.model is None:
-                    self.model = BlipForConditionalGeneration.from_pretrained(self.pretrained_model_name_or_path)
+                self.model = model_registry.get(('BlipForConditionalGeneration', self.pretrained_model_name_or_path),
+                                                lambda: BlipForConditionalGeneration.from_pretrained(self.pretrained_model_name_or_path))
             except Exception as e:
-                msg = f"BLIPImageDescriber initialization failed due to error in BlipForConditionalGeneration.from_pretrained with {self.pretrained_model_name_or_path} model_name_or_path."
+                msg = f"BLIPImageDescriber model loading failed due to error in BlipForConditionalGeneration.from_pretrained with {self.pretrained_model_name_or_path} model_name_or_path."
                 logger.exception(msg)
                 raise preprocessing_exceptions.ImageDescriptionError(msg) from e
 
@@ -74,6 +84,7 @@ class BLIPImageDescriber(pydantic.BaseModel, ImageDescriberI):
             input_names=['image'], 
             required_dtypes=[image_loaders.LoadedImage]
             )
+        self.load_model()
         try:
             logger.info(f"BLIPImageDescriber describing {image}")
             inputs = self.processor(images=image.image, return_tensors='pt')
@@ -83,6 +94,7 @@ class BLIPImageDescriber(pydantic.BaseModel, ImageDescriberI):
             image_document = ImageDocument(id=utils.generate_unique_doc_id(content=description),
                                            content=description,
                                            image=image.image,
+                                           image_bytes=image.content,
                                            source_url=image.url,
                                            image_url=image.url
                                            )
@@ -1,5 +1,6 @@
 """Defines interfaces and concrete implementations for loading images from URLs"""
 
+from typing import Optional
 from  typing_extensions import override
 from abc import ABC, abstractmethod
 from PIL import Image
@@ -20,11 +21,13 @@ class LoadedImage:
     Attributes:
         url: The URL from which the image was loaded.
         image: The loaded image object.
+        content: The original compressed image bytes, if available.
     """
     
-    def __init__(self, url: str, image: Image.Image):
+    def __init__(self, url: str, image: Image.Image, content: Optional[bytes] = None):
         self.url = url
         self.image = image
+        self.content = content
 
     def __repr__(self) -> str:
         return f'LoadedImage(url={self.url})'
@@ -108,7 +111,8 @@ class RequestsImageLoader(pydantic.BaseModel, ImageLoaderI):
             raise fetch_exceptions.FatchingError(msg) from e
         try:
             loaded_image = LoadedImage(url=img_url, 
-                                       image=Image.open(BytesIO(image_responce.response.content))
+                                       image=Image.open(BytesIO(image_responce.response.content)),
+                                       content=image_responce.response.content
                                        )
             logger.info(f"RequestsImageLoader successfully loaded image from {img_url}")
             return loaded_image
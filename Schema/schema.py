@@ -26,20 +26,26 @@ class TextDocument(pydantic.BaseModel):
         type: The type of the document, fixed to the string 'text'.
         content: Text content of the document.
         source_url: The original source URL from which the text was extracted.
+        publication_date: Publication date of the source as a YYYYMMDD integer (e.g. 20240315),
+                          so date ranges are numeric comparisons inside vector store indexes.
     """
 
     id: str
     type: ClassVar = 'text'
     content: str
     source_url: str = None
+    publication_date: Optional[int] = None
 
     @property
     def metadata(self) -> Dict[str, str]:
-        return {'id': self.id,
-                'type': self.type,
-                'content': self.content,
-                'source_url': self.source_url
-                }
+        metadata = {'id': self.id,
+                    'type': self.type,
+                    'content': self.content,
+                    'source_url': self.source_url
+                    }
+        if self.publication_date is not None:
+            metadata['publication_date'] = self.publication_date
+        return metadata
 
 class ImageDocument(pydantic.BaseModel):
     """ Structured image document.
@@ -50,6 +56,8 @@ class ImageDocument(pydantic.BaseModel):
         content: The loaded image object.
         source_url: The original source URL from which the image was extracted.
         image_url: The direct URL to the image content (can differ from source_url).
+        publication_date: Publication date of the source as a YYYYMMDD integer (e.g. 20240315).
+        image_bytes: Original compressed bytes of the image as downloaded, if available.
     """
     
     model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
@@ -57,13 +65,18 @@ class ImageDocument(pydantic.BaseModel):
     type: ClassVar = 'image'
     content: str
     image: Optional[Union[Image.Image]] =  pydantic.Field(default=None)
+    image_bytes: Optional[bytes] = pydantic.Field(default=None, repr=False)
     source_url: str
     image_url: str
+    publication_date: Optional[int] = None
 
     @property
     def metadata(self) -> Dict[str, Union[Image.Image, str]]:
-        return {'id': self.id,
-                'type': self.type,
-                'content': self.content,
-                'source_url': self.source_url,
-                'image_url': self.image_url}
\ No newline at end of file
+        metadata = {'id': self.id,
+                    'type': self.type,
+                    'content': self.content,
+                    'source_url': self.source_url,
+                    'image_url': self.image_url}
+        if self.publication_date is not None:
+            metadata['publication_date'] = self.publication_date
+        return metadata
\ No newline at end of file
@@ -1,17 +1,28 @@
 """Module providing TheBatchLLM multimodal RAG model wrapper for text and image retrieval."""
 
-from typing import List
+from typing import List, Dict, Optional, Iterator, Union, Tuple
 from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future
+import asyncio
 
 import pydantic
 from langchain.prompts import PromptTemplate
-from langchain.llms import Ollama
 
 from TheBatch import the_batch_exceptions
 from VectorStore.base_vector_store import VectorStoreI
+from VectorStore.fusion import score_fusion
+from VectorStore.search_filter import SearchFilter
+from VectorStore.image_document_store import ImageDocumentStore
 from LLM.rag_llm import OllamaRAGLLM
-from Schema.schema import ImageDocument
+from LLM.llm_backends import LLMBackendI, OllamaBackend
+from LLM.llm_response import RAGLLMRetrieval
+from LLM.answer_cache import SemanticAnswerCache
+from LLM.context_builder import ContextBuilder
+from LLM.reranker import RerankerI
+from LLM.query_rewriter import QueryRewriterI
+from Schema.schema import BaseDocument, ImageDocument
 from Internals.logger import logger
+from Internals.stage_timer import StageTimer
 
 
 @dataclass
@@ -23,35 +34,81 @@ class TheBatchLLMResponse:
         text_response (str): The textual answer generated by the model.
         image_response (List[ImageDocument]): A list of ImageDocument instances
             relevant to the query.
+        stage_timings (Dict[str, float]): Milliseconds spent in each stage of the query.
     """
     question: str
     text_response: str = field(repr=False)
     image_response: List[ImageDocument] = field(repr=False)
+    stage_timings: Dict[str, float] = field(default_factory=dict, repr=False)
+
+
+@dataclass
+class TheBatchLLMRetrieval:
+    """ First event of a streamed TheBatchLLM response, emitted before any generated token.
+
+    Attributes:
+        question (str): The original user query.
+        relevant_docs (List[BaseDocument]): Text documents used as context for the answer.
+        image_response (List[ImageDocument]): A list of ImageDocument instances
+            relevant to the query. Their images are loaded while the answer streams, and are
+            available once the stream is exhausted.
+        stage_timings (Dict[str, float]): Milliseconds spent in each stage before the first token.
+    """
+    question: str
+    relevant_docs: List[BaseDocument] = field(repr=False)
+    image_response: List[ImageDocument] = field(repr=False)
+    stage_timings: Dict[str, float] = field(default_factory=dict, repr=False)
 
 
 class TheBatchLLM(pydantic.BaseModel):
     """
-    Wrapper for a multimodal retrieval-augmented generation language model using Ollama.
+    Wrapper for a multimodal retrieval-augmented generation language model.
 
     This class integrates:
-        - An underlying Ollama LLM model.
+        - An LLM backend (Ollama by default).
         - A prompt template to format user queries.
         - A vector store for document retrieval.
+        - An optional image vector store of CLIP image embeddings for text-to-image search.
+        - An optional image document store from which the retrieved images are loaded.
         - A retrieval-augmented generation LLM (RAGLLM) instance for enhanced querying.
 
     Attributes:
-        model (Ollama): The underlying language model instance (default: llama3.2).
+        model (LLMBackendI): The LLM backend generating answers (default: Ollama llama3.2, created with the instance).
         prompt_template (PromptTemplate): Template to format prompts for the model.
         vectorstore (VectorStoreI): Vector store interface for retrieving relevant documents.
+        image_vectorstore (Optional[VectorStoreI]): Vector store of CLIP image embeddings whose
+            embedding function encodes queries with the CLIP text tower. If None, images are only
+            retrieved through their captions in `vectorstore`.
+        image_fusion_weights (List[float]): Weights of (caption hits, visual hits) in score fusion.
+        min_image_similarity (float): Visual hits with a lower CLIP similarity are discarded.
+        image_document_store (Optional[ImageDocumentStore]): Store the images of the retrieved
+            image documents are loaded from while the answer is generated. If None, image
+            documents are returned as found in the vector stores.
+        reranker (Optional[RerankerI]): Second-stage reranker of the text documents given to the
+            RAG LLM when it is initialized here.
+        context_builder (ContextBuilder): Token-aware context builder given to the RAG LLM when
+            it is initialized here.
+        answer_cache (Optional[SemanticAnswerCache]): Semantic answer cache given to the RAG LLM
+            when it is initialized here.
+        query_rewriter (Optional[QueryRewriterI]): Query rewriter enabling multi-query text
+            retrieval, given to the RAG LLM when it is initialized here.
         rag_llm (OllamaRAGLLM): RAG LLM instance, automatically initialized if None.
 
     Raises:
         THEBatchLLMInitializationError: If TheBatchLLM initialization fails.
     """
     model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
-    model: Ollama = pydantic.Field(default=Ollama(model="llama3.2"), repr=False)
+    model: LLMBackendI = pydantic.Field(default_factory=OllamaBackend, repr=False)
     prompt_template: PromptTemplate = pydantic.Field(repr=False)
     vectorstore: VectorStoreI
+    image_vectorstore: Optional[VectorStoreI] = pydantic.Field(default=None)
+    image_fusion_weights: List[float] = pydantic.Field(default=[1.0, 1.0])
+    min_image_similarity: float = pydantic.Field(default=0.0)
+    image_document_store: Optional[ImageDocumentStore] = pydantic.Field(default=None, repr=False)
+    reranker: Optional[RerankerI] = pydantic.Field(default=None, repr=False)
+    context_builder: ContextBuilder = pydantic.Field(default_factory=ContextBuilder, repr=False)
+    answer_cache: Optional[SemanticAnswerCache] = pydantic.Field(default=None, repr=False)
+    query_rewriter: Optional[QueryRewriterI] = pydantic.Field(default=None, repr=False)
     rag_llm: OllamaRAGLLM = pydantic.Field(default=None)
 
     def model_post_init(self, context):
@@ -60,29 +117,113 @@ class TheBatchLLM(pydantic.BaseModel):
             if self.rag_llm is None:
                 self.rag_llm = OllamaRAGLLM(model=self.model,
                                             prompt_template=self.prompt_template,
-                                            vectorstore=self.vectorstore)
+                                            vectorstore=self.vectorstore,
+                                            reranker=self.reranker,
+                                            context_builder=self.context_builder,
+                                            answer_cache=self.answer_cache,
+                                            query_rewriter=self.query_rewriter)
             logger.info("TheBatchLLM initialization done successfuly.")
         except Exception as e:
             msg = "TheBatchLLM initialization failed."
             logger.exception(msg)
             raise the_batch_exceptions.THEBatchLLMInitializationError(msg) from e
 
+    def _fuse_image_results(self, 
+                            caption_hits: list, 
+                            visual_hits: list, 
+                            k: int
+                            ) -> List[ImageDocument]:
+        """Merges caption-matched and visually-matched image documents with score fusion.
+
+        Args:
+            caption_hits: (ImageDocument, similarity score) pairs from the image-filtered caption search.
+            visual_hits: (ImageDocument, similarity score) pairs from the image vector store.
+            k: Maximum number of image documents to return.
+
+        Returns:
+            List[ImageDocument]: Image documents ordered by fused score.
+        """
+        visual_hits = [(document, score) for document, score in visual_hits if score >= self.min_image_similarity]
+        fused_hits = score_fusion([caption_hits, visual_hits], weights=self.image_fusion_weights, k=k)
+        return [document for document, _ in fused_hits]
+
+    @staticmethod
+    def _image_filter(search_filter: Optional[SearchFilter]) -> SearchFilter:
+        """Restricts search_filter (if any) to image documents, for the caption search of the text vector store."""
+        return (SearchFilter(type=ImageDocument.type) if search_filter is None 
+                else search_filter.model_copy(update={'type': ImageDocument.type}))
+
+    def _submit_image_searches(self,
+                               executor: ThreadPoolExecutor,
+                               user_query: str,
+                               image_k: int,
+                               search_filter: Optional[SearchFilter],
+                               timer: StageTimer
+                               ) -> Tuple[Future, Optional[Future]]:
+        """Submits the image-filtered caption search and the visual search (if any), returning their futures."""
+        caption_search = executor.submit(timer.timed, 'caption_search', self.vectorstore.similarity_search_with_scores, 
+                                         user_query, image_k, search_filter=self._image_filter(search_filter))
+        visual_search = None
+        if self.image_vectorstore is not None:
+            visual_search = executor.submit(timer.timed, 'visual_search', self.image_vectorstore.similarity_search_with_scores, 
+                                            user_query, image_k, search_filter=search_filter)
+        return caption_search, visual_search
+
+    def _collect_image_results(self,
+                               caption_search: Future,
+                               visual_search: Optional[Future],
+                               image_k: int
+                               ) -> List[ImageDocument]:
+        """Waits for the image searches and fuses their hits."""
+        caption_hits = caption_search.result()
+        visual_hits = visual_search.result() if visual_search is not None else []
+        return self._fuse_image_results(caption_hits=caption_hits, visual_hits=visual_hits, k=image_k)
+
+    def _load_image_payloads(self, image_documents: List[ImageDocument]) -> None:
+        """Loads and decodes the images of image_documents in place from the image document store (if any).
+
+        Documents missing from the store are left as they are.
+        """
+        if self.image_document_store is None:
+            return
+        for document in image_documents:
+            if document.id not in self.image_document_store:
+                logger.warning("TheBatchLLM image document %s is missing from the image document store.", document.id)
+                continue
+            stored_document = self.image_document_store.get(document.id)
+            if stored_document.image is not None:
+                # PIL decodes lazily, force it here rather than when the image is displayed
+                stored_document.image.load()
+            document.image = stored_document.image
+            document.image_bytes = stored_document.image_bytes
+
     def query(self,
               user_query: str, 
-              k: int = 5
+              k: int = 5,
+              image_k: Optional[int] = None,
+              search_filter: Optional[SearchFilter] = None
               ) -> TheBatchLLMResponse:
         """
         Process a user query using retrieval augmented generation.
 
-        This method:
-            - Queries the RAG LLM to get the text response and relevant documents.
-            - Extracts image documents from the retrieved relevant documents.
-            - Returns a structured TheBatchLLMResponse containing the question,
-              textual answer, and any image documents.
+        The query runs as a staged pipeline:
+            - Retrieval: the RAG LLM retrieves the text documents and packs the prompt while image
+              captions are searched in the text vector store with an image type filter, and the
+              image vector store (if any) is searched with the CLIP-encoded query. Each modality
+              costs exactly one search and the stage takes as long as the slowest search.
+            - Generation: the caption hits are fused with the visual hits, and the images of the
+              fused image documents are loaded from the image document store on a worker thread
+              while the RAG LLM generates the answer.
+            - Returns a structured TheBatchLLMResponse containing the question, textual answer,
+              image documents and the time spent in each stage.
 
         Args:
             user_query (str): The input question from the user.
             k (int, optional): Number of relevant documents to retrieve (default is 5).
+            image_k (int, optional): Number of images to retrieve per modality and to return
+                after fusion (default is k).
+            search_filter (SearchFilter, optional): Metadata filter (e.g. source_url prefix,
+                publication date range) applied to every search.
 
         Raises:
             TheBatchLLMAnswerGenerationError: If TheBatchLLM fails to answer user query.
@@ -93,12 +234,83 @@ class TheBatchLLM(pydantic.BaseModel):
         """
         try:
             logger.info("TheBatchLLM processing user query: %s", user_query)
-            rag_llm_response = self.rag_llm.query(user_query=user_query, k=k)
-            text_response = rag_llm_response.llm_resopnse
-            image_response = [document for document in rag_llm_response.relevant_docs if isinstance(document, ImageDocument)]
+            image_k = k if image_k is None else image_k
+            timer = StageTimer()
+            with timer.stage('total'), ThreadPoolExecutor(max_workers=2) as executor:
+                caption_search, visual_search = self._submit_image_searches(executor, user_query, image_k, search_filter, timer)
+                scored_docs, prompt = self.rag_llm.retrieve_and_prompt(user_query=user_query, 
+                                                                       k=k, 
+                                                                       search_filter=search_filter, 
+                                                                       timer=timer)
+                image_response = self._collect_image_results(caption_search, visual_search, image_k)
+                image_loading = executor.submit(timer.timed, 'image_loading', self._load_image_payloads, image_response)
+                text_response = self.rag_llm.generate(user_query, scored_docs, prompt, timer=timer)
+                image_loading.result()
+            the_batch_response = TheBatchLLMResponse(question=user_query,
+                                                    text_response=text_response,
+                                                    image_response=image_response,
+                                                    stage_timings=timer.timings)
+            logger.info("TheBatchLLM successfully processed user query: %s with stage timings %s", user_query, timer.timings)
+            return the_batch_response
+        except Exception as e:
+            msg = f"THEBatchLLM failed to answer user query: {user_query}."
+            logger.exception(msg)
+            raise the_batch_exceptions.THEBatchLLMAnswerGenerationError(msg) from e
+
+    async def aquery(self,
+                     user_query: str, 
+                     k: int = 5,
+                     image_k: Optional[int] = None,
+                     search_filter: Optional[SearchFilter] = None
+                     ) -> TheBatchLLMResponse:
+        """
+        Asynchronous version of `query`.
+
+        Text retrieval and the image searches run concurrently on worker threads, then the image
+        loading runs on a worker thread while the RAG LLM answers through `agenerate`, so one
+        event loop can serve many user queries without any of them blocking the others.
+
+        Args:
+            user_query (str): The input question from the user.
+            k (int, optional): Number of relevant documents to retrieve (default is 5).
+            image_k (int, optional): Number of images to retrieve per modality and to return
+                after fusion (default is k).
+            search_filter (SearchFilter, optional): Metadata filter (e.g. source_url prefix,
+                publication date range) applied to every search.
+
+        Raises:
+            TheBatchLLMAnswerGenerationError: If TheBatchLLM fails to answer user query.
+
+        Returns:
+            TheBatchLLMResponse: The complete response containing the question,
+                                 generated text answer, and list of image documents.
+        """
+        try:
+            logger.info("TheBatchLLM asynchronously processing user query: %s", user_query)
+            image_k = k if image_k is None else image_k
+            timer = StageTimer()
+            with timer.stage('total'):
+                caption_search = asyncio.to_thread(timer.timed, 'caption_search', self.vectorstore.similarity_search_with_scores, 
+                                                   user_query, image_k, search_filter=self._image_filter(search_filter))
+                visual_search = (asyncio.to_thread(timer.timed, 'visual_search', self.image_vectorstore.similarity_search_with_scores, 
+                                                   user_query, image_k, search_filter=search_filter)
+                                 if self.image_vectorstore is not None else asyncio.sleep(0, result=[]))
+                (scored_docs, prompt), caption_hits, visual_hits = await asyncio.gather(
+                    asyncio.to_thread(self.rag_llm.retrieve_and_prompt, user_query, k, search_filter, timer),
+                    caption_search,
+                    visual_search
+                    )
+                image_response = self._fuse_image_results(caption_hits=caption_hits, 
+                                                          visual_hits=visual_hits, 
+                                                          k=image_k)
+                text_response, _ = await asyncio.gather(
+                    self.rag_llm.agenerate(user_query, scored_docs, prompt, timer=timer),
+                    asyncio.to_thread(timer.timed, 'image_loading', self._load_image_payloads, image_response)
+                    )
             the_batch_response = TheBatchLLMResponse(question=user_query,
                                                     text_response=text_response,
-                                                    image_response=image_response)
+                                                    image_response=image_response,
+                                                    stage_timings=timer.timings)
             logger.info("TheBatchLLM successfully processed user query: %s", user_query)
             return the_batch_response
         except Exception as e:
@@ -106,4 +318,54 @@ class TheBatchLLM(pydantic.BaseModel):
             logger.exception(msg)
             raise the_batch_exceptions.THEBatchLLMAnswerGenerationError(msg) from e
 
+    def query_stream(self,
+                     user_query: str, 
+                     k: int = 5,
+                     image_k: Optional[int] = None,
+                     search_filter: Optional[SearchFilter] = None
+                     ) -> Iterator[Union[TheBatchLLMRetrieval, str]]:
+        """
+        Process a user query using retrieval augmented generation, streaming the answer.
+
+        Retrieval runs as in `query`, with image searches concurrent with text retrieval. The
+        first item is a TheBatchLLMRetrieval holding the text documents and fused image
+        documents; the following items are text chunks as the RAG LLM generates them, so the
+        caller can render the answer incrementally. The images of the image documents are
+        loaded on a worker thread while the answer streams, and are loaded once the stream
+        is exhausted.
+
+        Args:
+            user_query (str): The input question from the user.
+            k (int, optional): Number of relevant documents to retrieve (default is 5).
+            image_k (int, optional): Number of images to retrieve per modality and to return
+                after fusion (default is k).
+            search_filter (SearchFilter, optional): Metadata filter (e.g. source_url prefix,
+                publication date range) applied to every search.
 
+        Raises:
+            TheBatchLLMAnswerGenerationError: If TheBatchLLM fails to answer user query.
+
+        Yields:
+            TheBatchLLMRetrieval, then str: The retrieved documents, then the generated text chunks.
+        """
+        try:
+            logger.info("TheBatchLLM streaming answer to user query: %s", user_query)
+            image_k = k if image_k is None else image_k
+            timer = StageTimer()
+            rag_llm_stream = self.rag_llm.query_stream(user_query=user_query, k=k, search_filter=search_filter)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                caption_search, visual_search = self._submit_image_searches(executor, user_query, image_k, search_filter, timer)
+                rag_llm_retrieval: RAGLLMRetrieval = next(rag_llm_stream)
+                image_response = self._collect_image_results(caption_search, visual_search, image_k)
+                image_loading = executor.submit(timer.timed, 'image_loading', self._load_image_payloads, image_response)
+                yield TheBatchLLMRetrieval(question=user_query,
+                                           relevant_docs=rag_llm_retrieval.relevant_docs,
+                                           image_response=image_response,
+                                           stage_timings={**rag_llm_retrieval.stage_timings, **timer.timings})
+                yield from rag_llm_stream
+                image_loading.result()
+            logger.info("TheBatchLLM successfully streamed answer to user query: %s", user_query)
+        except Exception as e:
+            msg = f"THEBatchLLM failed to answer user query: {user_query}."
+            logger.exception(msg)
+            raise the_batch_exceptions.THEBatchLLMAnswerGenerationError(msg) from e
@@ -1,9 +1,86 @@
-"""Module to configure and instantiate TheBatchLLM with pre-defined prompt and vector store."""
+"""Module to configure and instantiate TheBatchLLM with pre-defined prompt and vector stores."""
 
+import os
+
+from Embedding.text_embedding import SentenceTransformerTextEmbedding
+from LLM.llm_backends import LLMBackendI, OllamaBackend, FakeLLMBackend
+from LLM.answer_cache import SemanticAnswerCache
+from LLM.context_builder import ContextBuilder, HFTokenCounter
+from LLM.reranker import CrossEncoderReranker
+from LLM.query_rewriter import RuleBasedQueryRewriter
+from VectorStore.coalescing_vector_store import CoalescingVectorStore
+from VectorStore.image_document_store import ImageDocumentStore
 from TheBatch.LLM.the_batch_llms import TheBatchLLM
-from TheBatch.the_batch_configs import the_batch_prompt_template
-from TheBatch.the_batch_vectorestore_pipeline import the_batch_vectorestore
+from TheBatch.the_batch_configs import the_batch_prompt_template, the_batch_static_prefix_prompt_template, STATIC_PROMPT_PREFIX
+from TheBatch.the_batch_configs import LLM_BACKEND, LLAMA_CPP_MODEL_PATH
+from TheBatch.the_batch_configs import OLLAMA_MODEL, OLLAMA_KEEP_ALIVE, OLLAMA_NUM_CTX, OLLAMA_NUM_THREAD
+from TheBatch.the_batch_configs import RERANK, RERANKER_MODEL, RERANK_CANDIDATES, RERANK_LATENCY_BUDGET_MS
+from TheBatch.the_batch_configs import COALESCE_SEARCHES, COALESCE_WINDOW_MS, COALESCE_MAX_BATCH_SIZE, COALESCE_MAX_WAIT_MS
+from TheBatch.the_batch_configs import CONTEXT_TOKENIZER, CONTEXT_MAX_TOKENS
+from TheBatch.the_batch_configs import MULTI_QUERY, MULTI_QUERY_MAX_VARIANTS
+from TheBatch.the_batch_configs import THE_BATCH_IMAGE_DOCUMENTS_STORE, THE_BATCH_IMAGE_BLOB_STORE_DIR
+from TheBatch.the_batch_configs import (ANSWER_CACHE, ANSWER_CACHE_SIMILARITY_THRESHOLD, 
+                                        ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL_SECONDS)
+from TheBatch.the_batch_vectorestore_pipeline import the_batch_vectorestore, the_batch_image_vectorestore
+
+
+def get_the_batch_llm_backend() -> LLMBackendI:
+    if LLM_BACKEND == "llama_cpp":
+        # Imported here so llama-cpp-python is only needed when it is the configured backend
+        from LLM.llama_cpp_backend import LlamaCppBackend
+        return LlamaCppBackend(model_path=LLAMA_CPP_MODEL_PATH, n_ctx=OLLAMA_NUM_CTX, n_threads=OLLAMA_NUM_THREAD)
+    if LLM_BACKEND == "fake":
+        return FakeLLMBackend()
+    return OllamaBackend(model=OLLAMA_MODEL,
+                         keep_alive=OLLAMA_KEEP_ALIVE,
+                         num_ctx=OLLAMA_NUM_CTX,
+                         num_thread=OLLAMA_NUM_THREAD)
+
+
+the_batch_llm_backend = get_the_batch_llm_backend()
+
+the_batch_text_vectorestore = (CoalescingVectorStore(vectorstore=the_batch_vectorestore,
+                                                     batch_window_ms=COALESCE_WINDOW_MS,
+                                                     max_batch_size=COALESCE_MAX_BATCH_SIZE,
+                                                     max_wait_ms=COALESCE_MAX_WAIT_MS)
+                               if COALESCE_SEARCHES else the_batch_vectorestore)
+
+# Full-dimension MiniLM query embeddings, sharing weights with the text vector store through the model registry
+the_batch_answer_cache = (SemanticAnswerCache(embedding_function=SentenceTransformerTextEmbedding(),
+                                              similarity_threshold=ANSWER_CACHE_SIMILARITY_THRESHOLD,
+                                              max_entries=ANSWER_CACHE_MAX_ENTRIES,
+                                              ttl_seconds=ANSWER_CACHE_TTL_SECONDS)
+                          if ANSWER_CACHE else None)
+
+the_batch_reranker = (CrossEncoderReranker(model_name_or_path=RERANKER_MODEL,
+                                           num_candidates=RERANK_CANDIDATES,
+                                           latency_budget_ms=RERANK_LATENCY_BUDGET_MS)
+                      if RERANK else None)
+if the_batch_reranker is not None:
+    # Loaded up front so the first queries do not exceed the latency budget while loading
+    the_batch_reranker.load_model()
+
+the_batch_token_counter = HFTokenCounter(tokenizer_name_or_path=CONTEXT_TOKENIZER)
+# Loaded up front like the reranker, falling back to approximate counts if the tokenizer is unavailable
+the_batch_token_counter.load_tokenizer()
+the_batch_context_builder = ContextBuilder(token_counter=the_batch_token_counter, max_tokens=CONTEXT_MAX_TOKENS)
+
+the_batch_query_rewriter = RuleBasedQueryRewriter(max_variants=MULTI_QUERY_MAX_VARIANTS) if MULTI_QUERY else None
+
+# Only the index is read here, images are decoded from the memory-mapped blob file when retrieved
+the_batch_image_document_store = ImageDocumentStore(store_directory=THE_BATCH_IMAGE_BLOB_STORE_DIR)
+if len(the_batch_image_document_store) == 0 and os.path.exists(THE_BATCH_IMAGE_DOCUMENTS_STORE):
+    # One-time conversion of a JSON store written before the blob store existed
+    the_batch_image_document_store.add_documents_from_json(THE_BATCH_IMAGE_DOCUMENTS_STORE)
 
-the_batch_llm = TheBatchLLM(prompt_template=the_batch_prompt_template,
-                            vectorstore=the_batch_vectorestore
-                            )
\ No newline at end of file
+the_batch_llm = TheBatchLLM(model=the_batch_llm_backend,
+                            prompt_template=(the_batch_static_prefix_prompt_template if STATIC_PROMPT_PREFIX 
+                                             else the_batch_prompt_template),
+                            vectorstore=the_batch_text_vectorestore,
+                            image_vectorstore=the_batch_image_vectorestore,
+                            image_document_store=the_batch_image_document_store,
+                            reranker=the_batch_reranker,
+                            context_builder=the_batch_context_builder,
+                            answer_cache=the_batch_answer_cache,
+                            query_rewriter=the_batch_query_rewriter
+                            )
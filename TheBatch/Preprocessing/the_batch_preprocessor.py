@@ -1,6 +1,6 @@
 """Module for preprocessing text and images from The Batch website using extraction, splitting, and description components."""
 
-from typing import List, Any, Union
+from typing import List, Any, Optional, Union
 
 import pydantic
 
@@ -45,15 +45,16 @@ class TheBatchPreprocessor(pydantic.BaseModel):
 
     """
     model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
-    text_extractor: TextExtractorI = pydantic.Field(default=SimpleBS4TextExtractor())
-    text_splitter: TextSplitterI = pydantic.Field(default=RecursiveTextSplitter())
-    image_loader: ImageLoaderI = pydantic.Field(default=RequestsImageLoader())
-    image_describer: ImageDescriberI = pydantic.Field(default=BLIPImageDescriber())
+    text_extractor: TextExtractorI = pydantic.Field(default_factory=SimpleBS4TextExtractor)
+    text_splitter: TextSplitterI = pydantic.Field(default_factory=RecursiveTextSplitter)
+    image_loader: ImageLoaderI = pydantic.Field(default_factory=RequestsImageLoader)
+    image_describer: ImageDescriberI = pydantic.Field(default_factory=BLIPImageDescriber)
 
     def preprocess(self, 
                    source_url: str, 
                    elements: List[Any], 
-                   images_urls: List[str]
+                   images_urls: List[str],
+                   publication_date: Optional[int] = None
                    ) -> List[Union[TextDocument, ImageDocument]]:
         """ Executes the preprocessing steps for multimodal data.
 
@@ -61,6 +62,8 @@ class TheBatchPreprocessor(pydantic.BaseModel):
             source_url: The source URL of the fetched content (for context during text splitting).
             elements: Parsed HTML elements containing text to be extracted.
             images_urls: List of image URLs to download and describe.
+            publication_date: Publication date of the source as a YYYYMMDD integer, set on every
+                              returned document so searches can filter on date ranges.
 
         Returns:
             List[Unition[TextDocument, ImageDocument]]: A list containing TextDocuments and ImageDocuments.
@@ -93,4 +96,6 @@ class TheBatchPreprocessor(pydantic.BaseModel):
             self.image_describer
             )
         preprocessed_docs = splitted_text + image_descriptions
+        for doc in preprocessed_docs:
+            doc.publication_date = publication_date
         return preprocessed_docs
\ No newline at end of file
@@ -3,10 +3,6 @@
 import streamlit as st
 
 from TheBatch.LLM.the_batch_trained_llms import the_batch_llm
-from Internals.utils import load_image_documents_from_json
-from TheBatch.the_batch_configs import THE_BATCH_IMAGE_DOCUMENTS_STORE
-
-image_documents = load_image_documents_from_json(THE_BATCH_IMAGE_DOCUMENTS_STORE)
 
 def main():
     st.set_page_config(page_title="The Batch Multimodal News Assistant",
@@ -23,9 +19,10 @@ def main():
             st.markdown(message["content"])
             if message["images"]:
                 st.caption("**Note**: The retrieved images are potentially relevant to your question, but may not exactly match your intended request.")
-                retrieved_images = [image_documents[retrieved_image.id] for retrieved_image in message["images"]]
-                for retrieved_image in retrieved_images:
-                    st.image(retrieved_image.image)
+                # Images were loaded by TheBatchLLM while the answer was generated
+                for retrieved_image in message["images"]:
+                    if retrieved_image.image is not None:
+                        st.image(retrieved_image.image)
     
     if user_query := st.chat_input("Ask you question"):
         st.session_state.messages.append({
@@ -33,18 +30,25 @@ def main():
             "content": user_query,
             "images": None,
         })
-        with st.spinner("Generating response..."):
+        with st.chat_message("user"):
+            st.markdown(user_query)
+        with st.chat_message("assistant"):
             try:
-                the_batch_llm_response = the_batch_llm.query(user_query=user_query)
+                # Retrieval result comes first, then the answer is rendered token by token as it is generated
+                with st.spinner("Searching TheBatch..."):
+                    the_batch_llm_stream = the_batch_llm.query_stream(user_query=user_query)
+                    the_batch_llm_retrieval = next(the_batch_llm_stream)
+                text_response = st.write_stream(the_batch_llm_stream)
                 st.session_state.messages.append({
                     "role": "assistant",
-                    "content": the_batch_llm_response.text_response,
-                    "images": the_batch_llm_response.image_response
+                    "content": text_response,
+                    "images": the_batch_llm_retrieval.image_response
                 })
             except Exception as e:
                 st.session_state.messages.append({
                     "role": "assistant",
-                    "content": "Something went wrong while generating answer. Please try again."
+                    "content": "Something went wrong while generating answer. Please try again.",
+                    "images": None
                 })
         st.rerun()
     
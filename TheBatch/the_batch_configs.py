@@ -8,6 +8,7 @@ from DataIngestion import fetch
 from DataIngestion import parsers
 from DataIngestion import parsing_tags
 from DataIngestion import parsing_configs
+from LLM.prompt_assembly import static_prefix_template
 
 # Cross-platform base directory
 BASE_DIR = Path(__file__).resolve().parent
@@ -18,8 +19,73 @@ THE_BATCH_URLS_PATH = (BASE_DIR / "Store" / "the_batch_urls.txt").as_posix()
 COLLECTION_NAME = "TheBatch"
 THE_BATCH_VECTORESTORE_PERSIST_DIR = (BASE_DIR  / "Store" / "the_batch_vectorestore_persist_dir").as_posix()
 THE_BATCH_IMAGE_DOCUMENTS_STORE = (BASE_DIR  / "Store" / "the_batch_image_documents_store.json").as_posix()
+THE_BATCH_IMAGE_BLOB_STORE_DIR = (BASE_DIR  / "Store" / "the_batch_image_blob_store").as_posix()
 CREATE_VECTORESTORE = False
 
+# CLIP image index, persisted next to the text collection
+IMAGE_COLLECTION_NAME = "TheBatchImages"
+IMAGE_COLLECTION_METADATA = {"hnsw:space": "cosine"}
+IMAGE_EMBEDDING_BATCH_SIZE = 32
+
+# Documents embedded and inserted per batch when building the text collection
+TEXT_EMBEDDING_BATCH_SIZE = 256
+
+# Optional random projection of text embeddings (None keeps full-dimension vectors)
+TEXT_PROJECTION_DIM = None
+THE_BATCH_TEXT_PROJECTION_PATH = (BASE_DIR / "Store" / "the_batch_text_projection.npy").as_posix()
+
+# Text vector store: "chroma" (persisted Chroma collection) or "numpy" (in-process exact search over a memory-mapped matrix)
+TEXT_VECTOR_STORE = "chroma"
+THE_BATCH_NUMPY_VECTORESTORE_PERSIST_DIR = (BASE_DIR / "Store" / "the_batch_numpy_vectorestore").as_posix()
+# Optional compression of the "numpy" text store searches, e.g. {"n_components": 192, "dtype": "int8"} (None searches float32 vectors)
+TEXT_VECTOR_COMPRESSION = None
+
+# Hybrid text retrieval: dense Chroma search fused with a BM25 index over the same text chunks
+HYBRID_RETRIEVAL = True
+THE_BATCH_BM25_PERSIST_DIR = (BASE_DIR / "Store" / "the_batch_bm25_index").as_posix()
+HYBRID_CANDIDATES = 20
+
+# Optional cross-encoder reranking of the text candidates, falling back to bi-encoder order past the latency budget.
+# Off by default: enabling it loads the cross-encoder at startup and adds up to the latency budget to every query
+RERANK = False
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+RERANK_CANDIDATES = 20
+RERANK_LATENCY_BUDGET_MS = 250
+
+# LLM backend: "ollama" (local Ollama server), "llama_cpp" (GGUF model in process) or "fake" (offline benchmarks)
+LLM_BACKEND = "ollama"
+LLAMA_CPP_MODEL_PATH = (BASE_DIR / "Store" / "models" / "llama-3.2-3b-instruct-q4_k_m.gguf").as_posix()
+
+# Ollama model options: keep the model loaded between queries and size its context window
+OLLAMA_MODEL = "llama3.2"
+OLLAMA_KEEP_ALIVE = "30m"
+OLLAMA_NUM_CTX = 4096
+OLLAMA_NUM_THREAD = None
+
+# Static prompt prefix: every instruction precedes the context so Ollama reuses the cached instruction tokens
+STATIC_PROMPT_PREFIX = True
+
+# Token-aware context packing, counting tokens with the llama3.2 tokenizer
+CONTEXT_TOKENIZER = "unsloth/Llama-3.2-1B-Instruct"
+CONTEXT_MAX_TOKENS = 1500
+
+# Request coalescing: concurrent text searches arriving within the window share one batched embed and search
+COALESCE_SEARCHES = True
+COALESCE_WINDOW_MS = 5
+COALESCE_MAX_BATCH_SIZE = 32
+COALESCE_MAX_WAIT_MS = 20
+
+# Semantic answer cache: reuse answers of exact or near-duplicate queries that retrieve the same chunks
+ANSWER_CACHE = True
+ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+ANSWER_CACHE_MAX_ENTRIES = 1024
+ANSWER_CACHE_TTL_SECONDS = 3600
+
+# Optional multi-query retrieval: rule-based query variants searched in one batched search and fused with RRF.
+# Off by default: enabling it multiplies the search fan-out of every query by up to MULTI_QUERY_MAX_VARIANTS
+MULTI_QUERY = False
+MULTI_QUERY_MAX_VARIANTS = 3
+
 fetcher = fetch.RequestsFetcher()
 parser = parsers.BS4Parser()
 
@@ -70,4 +136,17 @@ Instructions:
 """
 )
 
+the_batch_static_prefix_prompt_template = static_prefix_template(
+    instructions="""
+You are an advanced AI assistant. 
+Your task is to provide a **detailed and explicit** response to the question **based strictly on the information provided in the context below**.
+You must not incorporate any information beyond what is given in the context. You must not reference or mention the context explicitly or state that the information is from a source.
+Your answer must be **as detailed, comprehensive, and explicit as possible** based solely on the provided context, covering all relevant details.
 
+Instructions:
+- Provide a detailed, explicit, and comprehensive answer strictly using the information from the context.
+- Do not reference or mention the context or its presence.
+- If the context does not contain enough information to answer the question, respond with:
+"The information provided from TheBatch is insufficient to fully answer this question."
+"""
+)
@@ -1,4 +1,6 @@
-"""Module to create and manage TheBatch Chroma vectorstore with preprocessed text and image documents."""
+"""Module to create and manage TheBatch vectorstores with preprocessed text and image documents."""
+
+from typing import List, Optional, Union
 
 import numpy as np
 from pathlib import Path
@@ -6,18 +8,39 @@ from pathlib import Path
 from TheBatch.Preprocessing.the_batch_data_loader import TheBatchDataLoader
 from TheBatch.Preprocessing.the_batch_preprocessor import TheBatchPreprocessor
 from Embedding.text_embedding import SentenceTransformerTextEmbedding
+from Embedding.text_embedding import CLIPTextEmbedding
+from Embedding.image_embedding import CLIPImageEmbedding
+from Embedding.vector_projection import GaussianRandomVectorProjection, ProjectedTextEmbedding
+from Embedding.vector_compression import PCAVectorCompression
 from VectorStore.chroma_vector_store import ChromaVectorStore
+from VectorStore.numpy_vector_store import NumpyVectorStore
+from VectorStore.bm25_index import BM25Index
+from VectorStore.hybrid_retriever import HybridRetriever
+from VectorStore.search_filter import SearchFilter
+from VectorStore.image_document_store import ImageDocumentStore
 from Internals.adapters import ChromaTextEmbeddingAdapter
 from Internals.logger import logger
-from Schema.schema import ImageDocument
-from Internals.utils import save_image_documents_to_json
-from TheBatch.the_batch_configs import (THE_BATCH_IMAGE_DOCUMENTS_STORE, 
+from Schema.schema import ImageDocument, TextDocument
+from Internals.utils import parse_publication_date
+from TheBatch.the_batch_configs import (THE_BATCH_IMAGE_BLOB_STORE_DIR, 
                                         THE_BATCH_URLS_PATH, 
                                         THE_BATCH_VECTORESTORE_PERSIST_DIR, 
                                         CREATE_VECTORESTORE, 
-                                        COLLECTION_NAME)
+                                        COLLECTION_NAME,
+                                        IMAGE_COLLECTION_NAME,
+                                        IMAGE_COLLECTION_METADATA,
+                                        IMAGE_EMBEDDING_BATCH_SIZE,
+                                        TEXT_EMBEDDING_BATCH_SIZE,
+                                        TEXT_PROJECTION_DIM,
+                                        THE_BATCH_TEXT_PROJECTION_PATH,
+                                        TEXT_VECTOR_STORE,
+                                        THE_BATCH_NUMPY_VECTORESTORE_PERSIST_DIR,
+                                        TEXT_VECTOR_COMPRESSION,
+                                        HYBRID_RETRIEVAL,
+                                        THE_BATCH_BM25_PERSIST_DIR,
+                                        HYBRID_CANDIDATES)
 
-def create_the_batch_vectorestore():
+def create_the_batch_documents() -> List[Union[TextDocument, ImageDocument]]:
     # Load The Batch urls
     with open(THE_BATCH_URLS_PATH) as f:
         the_batch_urls = f.readlines()
@@ -32,55 +55,146 @@ def create_the_batch_vectorestore():
     documents = []
     for data in loaded_data:
         images_urls = [img['src'] for img in data.images]
+        # Publication date from the first <time> tag, preferring its machine-readable datetime attribute
+        publication_date = None
+        if data.publication_date:
+            time_tag = data.publication_date[0]
+            publication_date = parse_publication_date(time_tag.get('datetime') or time_tag.get_text())
         processed_docs = preprocessor.preprocess(
             source_url=data.url,
             elements=data.get_all(),
-            images_urls=images_urls
+            images_urls=images_urls,
+            publication_date=publication_date
         )
         documents.extend(processed_docs)
 
-    # Save ImageDocuments
-    image_documents = {doc.id: doc for doc in documents if isinstance(doc, ImageDocument)}
-    save_image_documents_to_json(image_documents, THE_BATCH_IMAGE_DOCUMENTS_STORE)
+    # Save ImageDocuments with their original compressed bytes
+    image_store = ImageDocumentStore(store_directory=THE_BATCH_IMAGE_BLOB_STORE_DIR)
+    image_store.add_documents(doc for doc in documents if isinstance(doc, ImageDocument))
+    image_store.close()
+    return documents
 
-    # Embedding
+
+def get_the_batch_text_embedding():
+    # Full-dimension MiniLM embeddings, optionally reduced with the persisted projection
     embedding_function = SentenceTransformerTextEmbedding()
-    embeddings = np.vstack([embedding_function.encode([doc.content]) for doc in documents])
+    if TEXT_PROJECTION_DIM is None:
+        return embedding_function
+    projection = GaussianRandomVectorProjection(target_dim=TEXT_PROJECTION_DIM,
+                                                projection_path=THE_BATCH_TEXT_PROJECTION_PATH)
+    return ProjectedTextEmbedding(embedding_function=embedding_function, projection=projection)
 
-    # Create vectorstore with persistence
-    adapted_embedding = ChromaTextEmbeddingAdapter(embedding_function=embedding_function)
-    vectorstore = ChromaVectorStore(
-        embedding_function=adapted_embedding,
+
+def get_the_batch_text_vectorestore(embedding_function):
+    # In-process NumPy store, optionally searching compressed codes, or the persisted Chroma collection
+    if TEXT_VECTOR_STORE == "numpy":
+        compression = None if TEXT_VECTOR_COMPRESSION is None else PCAVectorCompression(**TEXT_VECTOR_COMPRESSION)
+        return NumpyVectorStore(embedding_function=embedding_function,
+                                persist_directory=THE_BATCH_NUMPY_VECTORESTORE_PERSIST_DIR,
+                                compression=compression)
+    return ChromaVectorStore(
+        embedding_function=ChromaTextEmbeddingAdapter(embedding_function=embedding_function),
         collection_name=COLLECTION_NAME,
         persist_directory=THE_BATCH_VECTORESTORE_PERSIST_DIR
     )
 
-    # Add documents and embeddings
-    vectorstore.add_documents(documents=documents, embeddings=embeddings)
+
+def with_the_batch_bm25_index(vectorstore: Union[ChromaVectorStore, NumpyVectorStore], documents: Optional[List[TextDocument]] = None):
+    # Dense store alone, or fused with a BM25 index over its text chunks
+    if HYBRID_RETRIEVAL is not True:
+        return vectorstore
+    bm25_index = BM25Index(persist_directory=THE_BATCH_BM25_PERSIST_DIR)
+    if documents is not None or len(bm25_index) == 0:
+        # Without ingested chunks, index the ones already in the collection (e.g. collections built before hybrid retrieval)
+        if documents is None:
+            documents = vectorstore.get_documents(SearchFilter(type=TextDocument.type))
+        bm25_index.clean()
+        bm25_index.add_documents(documents)
+        bm25_index.save()
+    return HybridRetriever(vectorstore=vectorstore, bm25_index=bm25_index, candidates=HYBRID_CANDIDATES)
+
+
+def create_the_batch_vectorestore(documents: List[Union[TextDocument, ImageDocument]]):
+    # Embedding
+    embedding_function = get_the_batch_text_embedding()
+
+    # Create vectorstore with persistence
+    vectorstore = get_the_batch_text_vectorestore(embedding_function)
+
+    # Embed and add documents batch by batch, inserting one batch while the next is embedded
+    batches = (
+        (documents[start: start + TEXT_EMBEDDING_BATCH_SIZE],
+         embedding_function.encode([doc.content for doc in documents[start: start + TEXT_EMBEDDING_BATCH_SIZE]]))
+        for start in range(0, len(documents), TEXT_EMBEDDING_BATCH_SIZE)
+    )
+    vectorstore.add_documents_stream(batches)
     vectorstore.save()
-    return vectorstore
+    if isinstance(embedding_function, ProjectedTextEmbedding):
+        embedding_function.projection.save()
+    return with_the_batch_bm25_index(vectorstore, [doc for doc in documents if isinstance(doc, TextDocument)])
+
+
+def create_the_batch_image_vectorestore(image_documents: List[ImageDocument]):
+    # CLIP image encoder, images without a loaded image cannot be embedded
+    image_embedding = CLIPImageEmbedding()
+    image_documents = [doc for doc in image_documents if doc.image is not None]
+
+    # Queries are encoded with the CLIP text tower, sharing the image model weights through the model registry
+    embedding_function = CLIPTextEmbedding(model_name_or_path=image_embedding.model_name_or_path)
+    adapted_embedding = ChromaTextEmbeddingAdapter(embedding_function=embedding_function)
+    image_vectorstore = ChromaVectorStore(
+        embedding_function=adapted_embedding,
+        collection_name=IMAGE_COLLECTION_NAME,
+        persist_directory=THE_BATCH_VECTORESTORE_PERSIST_DIR,
+        collection_metadata=IMAGE_COLLECTION_METADATA
+    )
+
+    # Embed and add images batch by batch
+    batches = (
+        (image_documents[start: start + IMAGE_EMBEDDING_BATCH_SIZE],
+         image_embedding.encode([doc.image.convert("RGB") for doc in image_documents[start: start + IMAGE_EMBEDDING_BATCH_SIZE]]))
+        for start in range(0, len(image_documents), IMAGE_EMBEDDING_BATCH_SIZE)
+    )
+    image_vectorstore.add_documents_stream(batches)
+    image_vectorstore.save()
+    return image_vectorstore
 
 
 def load_the_batch_vectorestore():
-    # Recreate embedding function for adapter
-    embedding_function = SentenceTransformerTextEmbedding()
+    # Recreate embedding function for queries
+    embedding_function = get_the_batch_text_embedding()
+
+    # Load from persisted directory
+    vectorstore = get_the_batch_text_vectorestore(embedding_function)
+    return with_the_batch_bm25_index(vectorstore)
+
+
+def load_the_batch_image_vectorestore():
+    # Queries against the image index are encoded with the CLIP text tower
+    embedding_function = CLIPTextEmbedding()
     adapted_embedding = ChromaTextEmbeddingAdapter(embedding_function=embedding_function)
 
     # Load from persisted directory
-    vectorstore = ChromaVectorStore(
+    image_vectorstore = ChromaVectorStore(
         embedding_function=adapted_embedding,
-        collection_name=COLLECTION_NAME,
-        persist_directory=THE_BATCH_VECTORESTORE_PERSIST_DIR
+        collection_name=IMAGE_COLLECTION_NAME,
+        persist_directory=THE_BATCH_VECTORESTORE_PERSIST_DIR,
+        collection_metadata=IMAGE_COLLECTION_METADATA
     )
-    return vectorstore
+    return image_vectorstore
 
 
 # Main logic
 if CREATE_VECTORESTORE is True:
-    logger.info("Creating TheBatch vectore store.")
-    the_batch_vectorestore = create_the_batch_vectorestore()
-    logger.info("TheBatch vectorestore successfully created and saved.")
+    logger.info("Creating TheBatch vectore stores.")
+    the_batch_documents = create_the_batch_documents()
+    the_batch_vectorestore = create_the_batch_vectorestore(the_batch_documents)
+    the_batch_image_vectorestore = create_the_batch_image_vectorestore(
+        [doc for doc in the_batch_documents if isinstance(doc, ImageDocument)]
+        )
+    logger.info("TheBatch vectorestores successfully created and saved.")
 else:
-    logger.info("Loading TheBatch vectorestore.")
+    logger.info("Loading TheBatch vectorestores.")
     the_batch_vectorestore = load_the_batch_vectorestore()
-    logger.info("TheBatch vectorestore loaded successfully.")
+    the_batch_image_vectorestore = load_the_batch_image_vectorestore()
+    logger.info("TheBatch vectorestores loaded successfully.")
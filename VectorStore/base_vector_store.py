@@ -1,34 +1,136 @@
-"""Defines an interface protocol for custom vector stores supporting document addition, similarity search, and persistence."""
+"""Defines an interface class for custom vector stores supporting document addition, similarity search, and persistence."""
 
-from typing import Protocol, runtime_checkable
+from typing import Callable, Iterable, Optional, Tuple
+from abc import ABC, abstractmethod
 
 import numpy as np
- 
+
 from Schema.schema import BaseDocument
+from VectorStore import bulk_insert
+from VectorStore.search_filter import SearchFilter
+from VectorStore.compaction import CompactionReport
 
-@runtime_checkable
-class VectorStoreI(Protocol):
-    """Interface class for custom VectorStore."""
 
-    def __init__(self, persist_directory: str):
-        ...
+class VectorStoreI(ABC):
+    """Interface class for custom VectorStore.
 
-    def add_documents(self, 
-                      documents: list[BaseDocument], 
+    Implementations are initialized with a persist directory. similarity_search_batch,
+    add_documents_stream and delete_where have default implementations built on the abstract
+    methods, so implementations only override them to do better than the default.
+    """
+
+    @abstractmethod
+    def add_documents(self,
+                      documents: list[BaseDocument],
                       embeddings: np.ndarray
                       ) -> None:
             ...
-    
-    def similarity_search(self, 
-                          qeury: str, 
-                          k: int, 
-                          *args, 
+
+    def add_documents_stream(self,
+                             batches: Iterable[bulk_insert.DocumentBatch],
+                             pipelined: bool = True,
+                             progress_callback: Optional[Callable[[bulk_insert.BulkInsertReport], None]] = None
+                             ) -> bulk_insert.BulkInsertReport:
+        """ Streams (documents, embeddings) batches into the store with add_documents, see bulk_insert.stream_documents.
+
+        Args:
+            batches: Iterable of (documents, embeddings) batches, typically a lazy generator
+                     that embeds documents batch by batch.
+            pipelined: Whether to insert batch i while batch i + 1 is being produced.
+            progress_callback: Optional callable invoked with a BulkInsertReport after every batch.
+
+        Returns:
+            BulkInsertReport: Number of inserted documents and batches, elapsed time and throughput.
+        """
+        return bulk_insert.stream_documents(add_documents=self.add_documents,
+                                            batches=batches,
+                                            pipelined=pipelined,
+                                            progress_callback=progress_callback)
+
+    @abstractmethod
+    def similarity_search(self,
+                          qeury: str,
+                          k: int,
+                          *args,
                           **kwargs
                           ) -> list[BaseDocument]:
         ...
 
+    @abstractmethod
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> list[Tuple[BaseDocument, float]]:
+        ...
+
+    @abstractmethod
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> list[Tuple[BaseDocument, float]]:
+        ...
+
+    @abstractmethod
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> list[list[Tuple[BaseDocument, float]]]:
+        ...
+
+    def similarity_search_batch(self,
+                                queries: list[str],
+                                k: int = 5,
+                                search_filter: Optional[SearchFilter] = None
+                                ) -> list[list[BaseDocument]]:
+        """Performs a similarity search for many queries, see similarity_search_batch_with_scores."""
+        return [[document for document, _ in scored_docs]
+                for scored_docs in self.similarity_search_batch_with_scores(queries, k, search_filter=search_filter)]
+
+    @abstractmethod
+    def similarity_search_batch_with_scores(self,
+                                            queries: list[str],
+                                            k: int,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> list[list[Tuple[BaseDocument, float]]]:
+        ...
+
+    @abstractmethod
+    def delete_by_ids(self, ids: list[str]) -> int:
+        ...
+
+    def delete_where(self, search_filter: SearchFilter) -> int:
+        """ Deletes the documents matching a metadata filter, e.g. every chunk of a dropped source URL
+        or every document published before a date.
+
+        Args:
+            search_filter: Non-empty metadata filter selecting the documents to delete.
+
+        Raises:
+            ValueError: If the filter is empty, use clean to delete everything.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        if search_filter.is_empty:
+            raise ValueError("delete_where requires a non-empty search_filter. Use clean to delete all documents.")
+        return self._delete_where(search_filter)
+
+    @abstractmethod
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        """Deletes the documents matching a non-empty metadata filter and returns their number."""
+        ...
+
+    @abstractmethod
+    def compact(self, num_probe_queries: int = 20) -> CompactionReport:
+        ...
+
+    @abstractmethod
     def save(self) -> None:
      ...
-     
+
+    @abstractmethod
     def load(self, vectorestore_path: str) ->  None:
-        ...
\ No newline at end of file
+        ...
@@ -0,0 +1,431 @@
+"""Sparse lexical BM25 index over an inverted index with compact, CSR-encoded posting lists."""
+
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple, Callable
+from collections import Counter
+from dataclasses import dataclass
+import itertools
+import threading
+import json
+import os
+import re
+
+import pydantic
+import numpy as np
+
+import Schema.schema as schema
+from VectorStore import bulk_insert
+from VectorStore import compaction
+from VectorStore.document_columns import DocumentColumns
+from VectorStore.search_filter import SearchFilter
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import vectore_store_exceptions
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """ Lowercases and splits text into BM25 terms.
+
+    Compound tokens such as model names ('gpt-4o', 'llama3.2') are kept whole so they match
+    exactly, and are also split into their parts ('gpt', '4o') so partial mentions still match.
+    """
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = re.split(r"[._-]", token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+@dataclass(frozen=True)
+class _PostingsSnapshot:
+    """Consistent view of the posting lists and row statistics a search reads, taken under the index lock."""
+    vocabulary: Dict[str, int]
+    offsets: np.ndarray
+    rows: np.ndarray
+    frequencies: np.ndarray
+    length_norm: Optional[np.ndarray]
+    num_documents: int
+    deleted_rows: List[int]
+    filter_rows: Optional[np.ndarray]
+
+
+class BM25Index(pydantic.BaseModel):
+    """Okapi BM25 index over document contents, for exact matches on names, acronyms and rare terms.
+
+    Each term maps to a posting list of (row, term frequency) pairs. New documents go to small
+    per-term buffers that are merged on the next search into compact posting lists: all postings
+    are stored in CSR layout, one int32 row array and one uint16 frequency array, sliced per term
+    with an offsets array. Query scoring accumulates the BM25 contribution of each query term
+    into a dense score vector and keeps the top-k with argpartition.
+
+    Attributes:
+        persist_directory: Directory holding postings.npz and documents.json. Loaded on
+                           initialization if the files exist.
+        k1: Term frequency saturation parameter.
+        b: Document length normalization parameter.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+        VectoreStoreLoadingError: If the persisted index exists but cannot be loaded.
+    """
+    _postings_file: ClassVar = 'postings.npz'
+    _documents_file: ClassVar = 'documents.json'
+
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    persist_directory: str
+    k1: float = pydantic.Field(default=1.5, ge=0)
+    b: float = pydantic.Field(default=0.75, ge=0, le=1)
+    _columns: DocumentColumns = pydantic.PrivateAttr(default_factory=DocumentColumns)
+    _vocabulary: Dict[str, int] = pydantic.PrivateAttr(default_factory=dict)
+    _offsets: np.ndarray = pydantic.PrivateAttr(default_factory=lambda: np.zeros(1, dtype=np.int64))
+    _rows: np.ndarray = pydantic.PrivateAttr(default_factory=lambda: np.empty(0, dtype=np.int32))
+    _frequencies: np.ndarray = pydantic.PrivateAttr(default_factory=lambda: np.empty(0, dtype=np.uint16))
+    _document_lengths: List[int] = pydantic.PrivateAttr(default_factory=list)
+    _pending: Dict[str, Tuple[List[int], List[int]]] = pydantic.PrivateAttr(default_factory=dict)
+    _length_norm: Optional[np.ndarray] = pydantic.PrivateAttr(default=None)
+    _deleted_rows: List[int] = pydantic.PrivateAttr(default_factory=list)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context):
+        if os.path.exists(os.path.join(self.persist_directory, self._postings_file)):
+            self.load(self.persist_directory)
+
+    def __len__(self) -> int:
+        return len(self._columns) - len(self._deleted_rows)
+
+    def clean(self) -> None:
+        """Removes all indexed documents from memory."""
+        logger.info("BM25Index cleaning.")
+        self._columns = DocumentColumns()
+        self._vocabulary = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._rows = np.empty(0, dtype=np.int32)
+        self._frequencies = np.empty(0, dtype=np.uint16)
+        self._document_lengths = []
+        self._pending = {}
+        self._length_norm = None
+        self._deleted_rows = []
+        logger.info("BM25Index successfully clean.")
+
+    def add_documents(self,
+                      documents: list[schema.BaseDocument],
+                      embeddings: Optional[np.ndarray] = None
+                      ) -> None:
+        """ Tokenizes and indexes documents. Documents whose id is already indexed are skipped.
+
+        Args:
+            documents: List of BaseDocument instances to index.
+            embeddings: Ignored, accepted so the index can be fed from the same batches as a vector store.
+
+        Raises:
+            TypeError: If a document type is not supported.
+            DocumentAdditionError: If documents cannot be indexed.
+        """
+        for document in documents:
+            if not DocumentColumns.is_supported(document):
+                raise TypeError(
+                    f'Only {list(DocumentColumns.document_types.values())} are currently supported with BM25Index. Got instead: {type(document)}'
+                    )
+        try:
+            logger.info("Adding new documents to BM25Index.")
+            tokenized = [(document, Counter(tokenize(document.content))) for document in documents]
+            with self._lock:
+                for document, term_frequencies in tokenized:
+                    if document.id in self._columns:
+                        continue
+                    row = self._columns.append(document)
+                    self._length_norm = None
+                    self._document_lengths.append(sum(term_frequencies.values()))
+                    for term, frequency in term_frequencies.items():
+                        rows, frequencies = self._pending.setdefault(term, ([], []))
+                        rows.append(row)
+                        frequencies.append(min(frequency, np.iinfo(np.uint16).max))
+            logger.info("New documents successfully added to BM25Index.")
+        except Exception as e:
+            msg = "BM25Index failed document addition."
+            logger.exception(msg)
+            raise vectore_store_exceptions.DocumentAdditionError(msg) from e
+
+    def add_documents_stream(self,
+                             batches: Iterable[bulk_insert.DocumentBatch],
+                             pipelined: bool = True,
+                             progress_callback: Optional[Callable[[bulk_insert.BulkInsertReport], None]] = None
+                             ) -> bulk_insert.BulkInsertReport:
+        """Streams (documents, embeddings) batches into the index, see bulk_insert.stream_documents."""
+        return bulk_insert.stream_documents(add_documents=self.add_documents,
+                                            batches=batches,
+                                            pipelined=pipelined,
+                                            progress_callback=progress_callback)
+
+    def _compact(self) -> None:
+        """Merges the pending postings into the CSR posting lists."""
+        with self._lock:
+            if not self._pending:
+                return
+            terms = list(self._vocabulary) + [term for term in self._pending if term not in self._vocabulary]
+            rows, frequencies, offsets = [], [], [0]
+            for term in terms:
+                term_rows, term_frequencies = [], []
+                if term in self._vocabulary:
+                    start, end = self._offsets[self._vocabulary[term]], self._offsets[self._vocabulary[term] + 1]
+                    term_rows.append(self._rows[start:end])
+                    term_frequencies.append(self._frequencies[start:end])
+                if term in self._pending:
+                    term_rows.append(np.asarray(self._pending[term][0], dtype=np.int32))
+                    term_frequencies.append(np.asarray(self._pending[term][1], dtype=np.uint16))
+                rows.extend(term_rows)
+                frequencies.extend(term_frequencies)
+                offsets.append(offsets[-1] + sum(len(term_row) for term_row in term_rows))
+            self._vocabulary = {term: index for index, term in enumerate(terms)}
+            self._rows = np.concatenate(rows).astype(np.int32, copy=False)
+            self._frequencies = np.concatenate(frequencies).astype(np.uint16, copy=False)
+            self._offsets = np.asarray(offsets, dtype=np.int64)
+            self._pending = {}
+
+    def _snapshot(self, search_filter: Optional[SearchFilter]) -> _PostingsSnapshot:
+        """Merges the pending postings and captures the arrays a search reads, all under one lock.
+
+        Merges and loads replace these arrays instead of mutating them, so the search can score
+        against the snapshot without the lock while documents are added concurrently.
+        """
+        self._compact()
+        with self._lock:
+            num_documents = len(self._document_lengths)
+            if self._length_norm is None and num_documents:
+                document_lengths = np.asarray(self._document_lengths, dtype=np.float32)
+                self._length_norm = self.k1 * (1.0 - self.b + self.b * document_lengths / max(document_lengths.mean(), 1e-12))
+            filter_rows = None if search_filter is None else search_filter.rows(self._columns)
+            return _PostingsSnapshot(vocabulary=self._vocabulary,
+                                     offsets=self._offsets,
+                                     rows=self._rows,
+                                     frequencies=self._frequencies,
+                                     length_norm=self._length_norm,
+                                     num_documents=num_documents,
+                                     deleted_rows=list(self._deleted_rows),
+                                     filter_rows=filter_rows)
+
+    def _scores(self, snapshot: _PostingsSnapshot, terms: List[str]) -> np.ndarray:
+        """Returns the BM25 score of every row of the snapshot for the given query terms."""
+        scores = np.zeros(snapshot.num_documents, dtype=np.float32)
+        for term, query_frequency in Counter(terms).items():
+            term_index = snapshot.vocabulary.get(term)
+            if term_index is None:
+                continue
+            start, end = snapshot.offsets[term_index], snapshot.offsets[term_index + 1]
+            rows, frequencies = snapshot.rows[start:end], snapshot.frequencies[start:end].astype(np.float32)
+            idf = np.log(1.0 + (snapshot.num_documents - len(rows) + 0.5) / (len(rows) + 0.5))
+            scores[rows] += query_frequency * idf * frequencies * (self.k1 + 1.0) / (frequencies + snapshot.length_norm[rows])
+        return scores
+
+    def search(self,
+               query: str,
+               k: int = 5,
+               search_filter: Optional[SearchFilter] = None
+               ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Returns the top-k documents by BM25 score. Documents sharing no term with the query are never returned.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If the search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, BM25 score) pairs, best first.
+        """
+        return self.search_batch([query], k, search_filter)[0]
+
+    def search_batch(self,
+                     queries: List[str],
+                     k: int = 5,
+                     search_filter: Optional[SearchFilter] = None
+                     ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Returns the top-k documents by BM25 score of every query, see search.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If the search fails.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        try:
+            snapshot = self._snapshot(search_filter)
+            if snapshot.num_documents == 0:
+                return [[] for _ in queries]
+            rows = snapshot.filter_rows
+            scores = np.vstack([self._scores(snapshot, tokenize(query)) for query in queries])
+            scores[:, snapshot.deleted_rows] = 0.0
+            if rows is not None:
+                scores = scores[:, rows]
+            indices, top_scores = utils.top_k(scores, k)
+            if rows is not None:
+                indices = rows[indices]
+            return [[(self._columns.document(int(index)), float(score)) for index, score in zip(row_indices, row_scores) if score > 0]
+                    for row_indices, row_scores in zip(indices, top_scores)]
+        except Exception as e:
+            msg = f"BM25Index failed search for {len(queries)} queries."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """ Removes documents by id from search results. Unknown ids are ignored.
+
+        Deleted documents are masked out of every search and their postings are dropped on the
+        next compact. Until then they still count in term statistics (idf, average length).
+
+        Args:
+            ids: Ids of the documents to delete.
+
+        Raises:
+            TypeError: If `ids` is not a list.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        utils.validate_dtypes(
+            inputs=[ids],
+            input_names=['ids'],
+            required_dtypes=[list]
+            )
+        with self._lock:
+            rows = [self._columns.id_to_index.pop(doc_id) for doc_id in ids if doc_id in self._columns]
+            self._deleted_rows.extend(rows)
+        logger.info(f"{len(rows)} documents deleted from BM25Index.")
+        return len(rows)
+
+    def delete_where(self, search_filter: SearchFilter) -> int:
+        """ Removes the documents matching a non-empty metadata filter from search results, see delete_by_ids.
+
+        Raises:
+            ValueError: If the filter is empty, use clean to delete everything.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        if search_filter.is_empty:
+            raise ValueError("delete_where requires a non-empty search_filter. Use clean to delete all documents.")
+        deleted_rows = set(self._deleted_rows)
+        ids = [self._columns.columns['id'][row] for row in search_filter.rows(self._columns) if row not in deleted_rows]
+        return self.delete_by_ids(ids)
+
+    def sample_queries(self, num_queries: int, num_words: int = 8) -> List[str]:
+        """Returns the first words of the first num_queries live documents, used as realistic probe queries."""
+        deleted_rows = set(self._deleted_rows)
+        contents = (content for row, content in enumerate(self._columns.columns.get('content', [])) if row not in deleted_rows)
+        return [' '.join(content.split()[:num_words]) for content in itertools.islice(contents, num_queries)]
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        """ Rebuilds the index from its live documents, dropping the postings of deleted documents, and saves it.
+
+        Args:
+            num_probe_queries: Number of probe queries (see sample_queries) used to measure
+                               search latency before and after compaction.
+
+        Raises:
+            VectoreStoreSavingError: If the rebuild or the save fails.
+
+        Returns:
+            compaction.CompactionReport: Document count, persist directory size and probe query
+                                         latency before and after compaction.
+        """
+        probes = [lambda query=query: self.search(query, 10) for query in self.sample_queries(num_probe_queries)]
+        deleted_rows = set(self._deleted_rows)
+        live_rows = [row for row in range(len(self._columns)) if row not in deleted_rows]
+
+        def rewrite() -> None:
+            documents = [self._columns.document(row) for row in live_rows]
+            self.clean()
+            self.add_documents(documents)
+            self.save()
+
+        try:
+            logger.info("Compacting BM25Index.")
+            return compaction.run_compaction(rewrite=rewrite,
+                                             count=lambda: len(self),
+                                             persist_directories=[self.persist_directory],
+                                             probes=probes)
+        except Exception as e:
+            msg = f"BM25Index failed to compact to {self.persist_directory}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreSavingError(msg) from e
+
+    def save(self) -> None:
+        """ Saves the posting lists as .npz and the vocabulary and metadata columns as JSON to persist_directory.
+
+        Both files are written to temporary files first and then renamed, so an interrupted save
+        leaves the previous files intact.
+
+        Raises:
+            VectoreStoreSavingError: If saving the index fails.
+        """
+        try:
+            logger.info(f"Saving BM25Index to path: {self.persist_directory}")
+            self._compact()
+            os.makedirs(self.persist_directory, exist_ok=True)
+            postings_path = os.path.join(self.persist_directory, self._postings_file)
+            documents_path = os.path.join(self.persist_directory, self._documents_file)
+            with open(postings_path + '.tmp', 'wb') as f:
+                np.savez(f,
+                         offsets=self._offsets,
+                         rows=self._rows,
+                         frequencies=self._frequencies,
+                         document_lengths=np.asarray(self._document_lengths, dtype=np.int32),
+                         deleted_rows=np.asarray(self._deleted_rows, dtype=np.int64))
+            with open(documents_path + '.tmp', 'w') as f:
+                json.dump({'vocabulary': list(self._vocabulary), 'columns': self._columns.columns}, f)
+            os.replace(postings_path + '.tmp', postings_path)
+            os.replace(documents_path + '.tmp', documents_path)
+            logger.info(f"BM25Index successfully saved to {self.persist_directory}")
+        except Exception as e:
+            msg = f"BM25Index failed to save to {self.persist_directory}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreSavingError(msg) from e
+
+    def load(self, vectorestore_path: str) -> None:
+        """ Loads the index saved in vectorestore_path.
+
+        Args:
+            vectorestore_path: Directory holding postings.npz and documents.json.
+
+        Raises:
+            TypeError: If `vectorestore_path` is not a string.
+            VectoreStoreLoadingError: If loading the index fails.
+        """
+        utils.validate_dtypes(
+            inputs=[vectorestore_path],
+            input_names=['vectorestore_path'],
+            required_dtypes=[str]
+        )
+        try:
+            logger.info(f"Loading BM25Index from path: {vectorestore_path}")
+            postings = np.load(os.path.join(vectorestore_path, self._postings_file))
+            with open(os.path.join(vectorestore_path, self._documents_file)) as f:
+                persisted = json.load(f)
+            self._offsets = postings['offsets']
+            self._rows = postings['rows']
+            self._frequencies = postings['frequencies']
+            self._document_lengths = postings['document_lengths'].tolist()
+            self._deleted_rows = postings['deleted_rows'].tolist() if 'deleted_rows' in postings else []
+            self._vocabulary = {term: index for index, term in enumerate(persisted['vocabulary'])}
+            self._columns = DocumentColumns(persisted['columns'])
+            for row in self._deleted_rows:
+                doc_id = self._columns.columns['id'][row]
+                if self._columns.id_to_index.get(doc_id) == row:
+                    del self._columns.id_to_index[doc_id]
+            self._pending = {}
+            self._length_norm = None
+            self.persist_directory = vectorestore_path
+            logger.info(f"BM25Index successfully loaded from {vectorestore_path}")
+        except Exception as e:
+            msg = f"BM25Index failed to load from {vectorestore_path}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreLoadingError(msg) from e
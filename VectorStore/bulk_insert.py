@@ -0,0 +1,90 @@
+"""Provides streaming bulk insertion of (documents, embeddings) batches into vector stores."""
+
+from typing import Callable, Iterable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+import time
+
+import numpy as np
+
+from Schema.schema import BaseDocument
+from Internals.logger import logger
+
+DocumentBatch = Tuple[List[BaseDocument], np.ndarray]
+
+
+@dataclass
+class BulkInsertReport:
+    """ Progress and throughput of a bulk insertion.
+
+    Attributes:
+        num_documents: Number of documents inserted so far.
+        num_batches: Number of batches inserted so far.
+        elapsed_seconds: Wall time since the insertion started, including batch production.
+    """
+    num_documents: int = 0
+    num_batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.num_documents / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+def chunk_documents(documents: List[BaseDocument],
+                    embeddings: np.ndarray,
+                    batch_size: int
+                    ) -> Iterable[DocumentBatch]:
+    """Splits documents and their embeddings into aligned batches of at most batch_size."""
+    for start in range(0, len(documents), batch_size):
+        yield documents[start: start + batch_size], embeddings[start: start + batch_size]
+
+
+def stream_documents(add_documents: Callable[[List[BaseDocument], np.ndarray], None],
+                     batches: Iterable[DocumentBatch],
+                     pipelined: bool = True,
+                     progress_callback: Optional[Callable[[BulkInsertReport], None]] = None
+                     ) -> BulkInsertReport:
+    """Streams (documents, embeddings) batches into a vector store with a bounded memory footprint.
+
+    Batches are pulled from the iterator one at a time. When pipelined, the insert of batch i
+    runs on a background thread while batch i + 1 is produced (e.g. embedded), so at most two
+    batches are held in memory at once.
+
+    Args:
+        add_documents: The vector store's add_documents method.
+        batches: Iterable of (documents, embeddings) batches, typically a lazy generator.
+        pipelined: Whether to overlap batch production with insertion.
+        progress_callback: Optional callable invoked with the report after every inserted batch.
+
+    Returns:
+        BulkInsertReport: Final counts and throughput.
+    """
+    report = BulkInsertReport()
+    start = time.perf_counter()
+
+    def record(num_documents: int) -> None:
+        report.num_documents += num_documents
+        report.num_batches += 1
+        report.elapsed_seconds = time.perf_counter() - start
+        logger.info("Bulk insert progress: %s documents in %s batches (%.1f docs/sec).",
+                    report.num_documents, report.num_batches, report.docs_per_sec)
+        if progress_callback is not None:
+            progress_callback(report)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending: Optional[Tuple[Future, int]] = None
+        for documents, embeddings in batches:
+            if not pipelined:
+                add_documents(documents, embeddings)
+                record(len(documents))
+                continue
+            if pending is not None:
+                pending[0].result()
+                record(pending[1])
+            pending = (executor.submit(add_documents, documents, embeddings), len(documents))
+        if pending is not None:
+            pending[0].result()
+            record(pending[1])
+    report.elapsed_seconds = time.perf_counter() - start
+    return report
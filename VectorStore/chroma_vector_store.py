@@ -1,7 +1,9 @@
 """Chroma-based VectorStore supporting multiple document types with embeddings, retrieval, and persistence."""
 
-from typing import ClassVar, Optional, List,  Callable, Union, Literal
+from typing import ClassVar, Optional, List,  Callable, Union, Literal, Tuple, Dict, Any
 from typing_extensions import override
+import sqlite3
+import os
 
 import pydantic
 import numpy as np
@@ -12,6 +14,9 @@ from langchain.embeddings.base import Embeddings
 
 import Schema.schema as schema
 from VectorStore import base_vector_store
+from VectorStore import bulk_insert
+from VectorStore import compaction
+from VectorStore.search_filter import SearchFilter, prefix_matches
 from Internals import adapters
 from Internals import utils
 from Internals.logger import logger
@@ -19,7 +24,7 @@ from CustomExceptions import vectore_store_exceptions
 
 ToBaseDocument =  Callable[[Document], schema.BaseDocument]
 
-class ChromaVectorStore(pydantic.BaseModel):
+class ChromaVectorStore(pydantic.BaseModel, base_vector_store.VectorStoreI):
     """Vector Store implementation using Chroma, supporting multiple document types with embeddings.
 
     Attributes:
@@ -29,6 +34,10 @@ class ChromaVectorStore(pydantic.BaseModel):
         vectorstore: Internal Chroma vector store instance, initialized post model init.
         retriver: Retriever for similarity search and MMR search.
         search_type: Type of retrieval search to use.
+        collection_metadata: Optional Chroma collection metadata (e.g. {'hnsw:space': 'cosine'}),
+                             applied when the collection is created.
+        batch_size: Maximum number of documents sent to Chroma in one add call. Capped by the
+                    client's maximum batch size when the client reports one.
 
     Raises:
         ValidationError: If attribute does not match expected data type.
@@ -41,13 +50,15 @@ class ChromaVectorStore(pydantic.BaseModel):
             type=langchain_document.metadata['type'],
             content=langchain_document.page_content,
             source_url=langchain_document.metadata['source_url'],
-            image_url=langchain_document.metadata['image_url']
+            image_url=langchain_document.metadata['image_url'],
+            publication_date=langchain_document.metadata.get('publication_date')
             ),
         schema.TextDocument.type: lambda langchain_document: schema.TextDocument(
             id=langchain_document.metadata['id'],
             type=langchain_document.metadata['type'],
             content=langchain_document.page_content,
-            source_url=langchain_document.metadata['source_url']
+            source_url=langchain_document.metadata['source_url'],
+            publication_date=langchain_document.metadata.get('publication_date')
             )
             }
     
@@ -58,12 +69,17 @@ class ChromaVectorStore(pydantic.BaseModel):
     persist_directory: str
     retriver: Optional[VectorStoreRetriever] =  pydantic.Field(default=None)
     search_type: Literal['similarity', 'mmr'] = pydantic.Field(default='similarity')
+    collection_metadata: Optional[Dict[str, Any]] = pydantic.Field(default=None)
+    batch_size: int = pydantic.Field(default=1000, gt=0)
+    _source_urls: Optional[List[str]] = pydantic.PrivateAttr(default=None)
 
     def model_post_init(self, context):
         try:
             self.vectorstore = Chroma(embedding_function=self.embedding_function,
                                       collection_name=self.collection_name,
-                                      persist_directory=self.persist_directory)
+                                      persist_directory=self.persist_directory,
+                                      collection_metadata=self.collection_metadata)
+            self._recover_interrupted_compaction()
         except Exception as e:
             msg = (f"ChromaVectorStore initialization failed due to error in Chroma initialization."
                    f"Embedding function: {self.embedding_function}"
@@ -131,18 +147,26 @@ class ChromaVectorStore(pydantic.BaseModel):
         try:
             logger.info("ChromaVectoreStore cleaning.")
             self.vectorstore._collection.delete()
+            self._source_urls = None
             logger.info("ChromaVectoreStore successfully clean.")
         except Exception as e:
             msg = f"ChoraVectoreStore cleaning failed."
             logger.exception(msg)
             raise vectore_store_exceptions.VectoreStoreCleaningError(msg) from e
 
+    def _max_batch_size(self) -> int:
+        """Returns batch_size capped by the Chroma client's maximum batch size, if available."""
+        get_max_batch_size = getattr(self.vectorstore._client, 'get_max_batch_size', None)
+        if get_max_batch_size is None:
+            return self.batch_size
+        return min(self.batch_size, get_max_batch_size())
+
     @override
     def add_documents(self, 
                       documents: list[schema.BaseDocument], 
                       embeddings: np.ndarray
                       ) -> None:
-        """ Adds documents and their embeddings to the Chroma vector store.
+        """ Adds documents and their embeddings to the Chroma vector store in chunks of at most batch_size.
 
         Args:
             documents (List[schema.BaseDocument]): List of BaseDocument instances to store.
@@ -165,18 +189,164 @@ class ChromaVectorStore(pydantic.BaseModel):
         
         try:
             logger.info("Adding new (documents, embeddings) to ChromaVectoreStore.")
-            self.vectorstore._collection.add(
-                    ids=[document.id  for document  in documents],
-                    embeddings=embeddings,
-                    documents=[f'{document.content}' for document in documents],
-                    metadatas=[document.metadata for document in documents]
-                )
+            for documents_batch, embeddings_batch in bulk_insert.chunk_documents(documents, embeddings, self._max_batch_size()):
+                self.vectorstore._collection.add(
+                        ids=[document.id  for document  in documents_batch],
+                        embeddings=embeddings_batch,
+                        documents=[f'{document.content}' for document in documents_batch],
+                        metadatas=[document.metadata for document in documents_batch]
+                    )
+            if self._source_urls is not None:
+                self._source_urls = sorted(set(self._source_urls).union(
+                    document.source_url for document in documents if document.source_url is not None))
             logger.info("New (documents, embeddings) successfully added to ChromaVectoreStore.")
         except Exception as e:
             msg = "ChromaVectoreStore failed document addition."
             logger.exception(msg)
             raise vectore_store_exceptions.DocumentAdditionError(msg) from e
-    
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """ Deletes documents by id. Unknown ids are ignored.
+
+        Args:
+            ids: Ids of the documents to delete.
+
+        Raises:
+            TypeError: If `ids` is not a list.
+            VectoreStoreCleaningError: If deletion fails.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        utils.validate_dtypes(
+            inputs=[ids],
+            input_names=['ids'],
+            required_dtypes=[list]
+            )
+        try:
+            logger.info(f"Deleting {len(ids)} documents by id from ChromaVectoreStore.")
+            num_deleted = 0
+            for start in range(0, len(ids), self._max_batch_size()):
+                existing_ids = self.vectorstore._collection.get(ids=ids[start: start + self._max_batch_size()], include=[])['ids']
+                if existing_ids:
+                    self.vectorstore._collection.delete(ids=existing_ids)
+                num_deleted += len(existing_ids)
+            self._source_urls = None
+            logger.info(f"{num_deleted} documents successfully deleted from ChromaVectoreStore.")
+            return num_deleted
+        except Exception as e:
+            msg = "ChromaVectoreStore failed to delete documents by id."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreCleaningError(msg) from e
+
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        """Deletes the documents matching a non-empty metadata filter, raising VectoreStoreCleaningError if deletion fails."""
+        if (search_filter.source_url_prefix is not None
+                and not prefix_matches(self._source_url_index(), search_filter.source_url_prefix)):
+            return 0
+        matching_ids = self.vectorstore._collection.get(where=self._where(search_filter), include=[])['ids']
+        return self.delete_by_ids(matching_ids)
+
+    def _vacuum(self) -> None:
+        """Rewrites the Chroma SQLite file so pages freed by deletions are returned to the file system."""
+        sqlite_path = os.path.join(self.persist_directory, 'chroma.sqlite3')
+        if not os.path.exists(sqlite_path):
+            return
+        connection = sqlite3.connect(sqlite_path)
+        try:
+            connection.execute('VACUUM')
+        finally:
+            connection.close()
+
+    @property
+    def _compacting_collection_name(self) -> str:
+        """Name of the collection compact() builds before swapping it in for collection_name."""
+        return f'{self.collection_name}-compacting'
+
+    def _get_collection(self, name: str) -> Optional[Any]:
+        """Returns the collection called name from the Chroma client, None if it does not exist."""
+        try:
+            return self.vectorstore._client.get_collection(name=name)
+        except Exception:
+            return None
+
+    def _recover_interrupted_compaction(self) -> None:
+        """ Finishes or discards a compaction interrupted before its swap completed.
+
+        The compacted collection is only complete once the old collection is deleted, so a
+        leftover compacting collection replaces an empty main collection and is dropped otherwise.
+        """
+        compacting = self._get_collection(self._compacting_collection_name)
+        if compacting is None:
+            return
+        client = self.vectorstore._client
+        if self.vectorstore._collection.count() == 0 and compacting.count() > 0:
+            logger.warning(f"Completing interrupted compaction of ChromaVectoreStore collection {self.collection_name}.")
+            client.delete_collection(self.collection_name)
+            compacting.modify(name=self.collection_name)
+            self.vectorstore = Chroma(embedding_function=self.embedding_function,
+                                      collection_name=self.collection_name,
+                                      persist_directory=self.persist_directory,
+                                      collection_metadata=self.collection_metadata)
+        else:
+            logger.warning(f"Dropping incomplete compaction of ChromaVectoreStore collection {self.collection_name}.")
+            client.delete_collection(self._compacting_collection_name)
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        """ Rewrites the collection to reclaim the space of deleted documents and rebuild the HNSW index.
+
+        Chroma only marks deleted vectors in its HNSW index, so after many deletions or
+        re-ingestions the index keeps dead entries. Compaction copies every live document with
+        its embedding, batch by batch, into a new collection. Only once the copy is complete is
+        the old collection deleted and the new one renamed in its place, then the SQLite file is
+        vacuumed. A compaction interrupted before the swap is finished or discarded on the next
+        load, so the documents are never only held in memory.
+
+        Args:
+            num_probe_queries: Number of stored embeddings used as probe queries to measure
+                               search latency before and after compaction.
+
+        Raises:
+            VectoreStoreSavingError: If the rewrite fails.
+
+        Returns:
+            compaction.CompactionReport: Document count, persist directory size and probe query
+                                         latency before and after compaction.
+        """
+        probe_embeddings = self.vectorstore._collection.get(limit=num_probe_queries, include=['embeddings'])['embeddings']
+        probes = [lambda embedding=embedding: self._query_collection(np.asarray([embedding]), 10)
+                  for embedding in probe_embeddings]
+
+        def rewrite() -> None:
+            client = self.vectorstore._client
+            collection = self.vectorstore._collection
+            if self._get_collection(self._compacting_collection_name) is not None:
+                client.delete_collection(self._compacting_collection_name)
+            compacting = client.create_collection(name=self._compacting_collection_name,
+                                                  metadata=collection.metadata or None)
+            batch_size = self._max_batch_size()
+            for start in range(0, collection.count(), batch_size):
+                stored = collection.get(offset=start, limit=batch_size, include=['embeddings', 'documents', 'metadatas'])
+                compacting.add(ids=stored['ids'],
+                               embeddings=stored['embeddings'],
+                               documents=stored['documents'],
+                               metadatas=stored['metadatas'])
+            client.delete_collection(self.collection_name)
+            compacting.modify(name=self.collection_name)
+            self.load(self.persist_directory)
+            self._vacuum()
+
+        try:
+            logger.info(f"Compacting ChromaVectoreStore collection {self.collection_name}.")
+            return compaction.run_compaction(rewrite=rewrite,
+                                             count=lambda: self.vectorstore._collection.count(),
+                                             persist_directories=[self.persist_directory],
+                                             probes=probes)
+        except Exception as e:
+            msg = f"ChromaVectoreStore failed to compact collection {self.collection_name}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreSavingError(msg) from e
+
     @override
     def similarity_search(self,
                            query: str,  
@@ -213,6 +383,236 @@ class ChromaVectorStore(pydantic.BaseModel):
             logger.exception(msg)
             raise vectore_store_exceptions.SimilaritySerachError(msg) from e
         
+    def _distances_to_similarities(self, distances: List[float]) -> List[float]:
+        """Converts Chroma distances into similarity scores where higher is more similar.
+
+        Args:
+            distances: Distances returned by the Chroma collection query.
+
+        Returns:
+            List[float]: Similarity scores in the collection's distance space
+                         ('cosine' and 'ip' -> 1 - d, 'l2' -> 1 - d / 2).
+        """
+        space = (self.collection_metadata or {}).get('hnsw:space', 'l2')
+        if space == 'l2':
+            return [1.0 - distance / 2.0 for distance in distances]
+        return [1.0 - distance for distance in distances]
+
+    def _source_url_index(self) -> List[str]:
+        """Returns the sorted distinct source URLs of the collection, read once and updated on add."""
+        if self._source_urls is None:
+            metadatas = self.vectorstore._collection.get(include=['metadatas'])['metadatas']
+            self._source_urls = sorted({metadata['source_url'] for metadata in metadatas
+                                        if metadata.get('source_url') is not None})
+        return self._source_urls
+
+    def get_documents(self, search_filter: Optional[SearchFilter] = None) -> List[schema.BaseDocument]:
+        """ Returns the stored documents matching an optional metadata filter, without their embeddings.
+
+        Used to rebuild derived indexes (e.g. BM25) from an existing collection.
+
+        Args:
+            search_filter: Optional metadata filter.
+
+        Raises:
+            VectoreStoreLoadingError: If reading the collection fails.
+
+        Returns:
+            List[schema.BaseDocument]: Documents in insertion order.
+        """
+        try:
+            if (search_filter is not None and search_filter.source_url_prefix is not None
+                    and not prefix_matches(self._source_url_index(), search_filter.source_url_prefix)):
+                return []
+            results = self.vectorstore._collection.get(where=self._where(search_filter), include=['documents', 'metadatas'])
+            return [
+                self._to_base_document[metadata['type']](Document(page_content=document, metadata=metadata))
+                for document, metadata in zip(results['documents'], results['metadatas'])
+                ]
+        except Exception as e:
+            msg = f"ChromaVectorStore failed to read documents of collection {self.collection_name}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreLoadingError(msg) from e
+
+    def _where(self, search_filter: Optional[SearchFilter]) -> Optional[Dict[str, Any]]:
+        """Translates a SearchFilter into a Chroma where clause, resolving source_url prefixes against the source URL index."""
+        if search_filter is None or search_filter.is_empty:
+            return None
+        source_urls = self._source_url_index() if search_filter.source_url_prefix is not None else []
+        return search_filter.to_chroma_where(source_urls)
+
+    def _query_collection(self, 
+                          query_embeddings: np.ndarray, 
+                          k: int,
+                          search_filter: Optional[SearchFilter] = None
+                          ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """Queries the underlying Chroma collection with precomputed embeddings.
+
+        Args:
+            query_embeddings: 2D numpy array of query embeddings.
+            k: The number of top results to return per query.
+            search_filter: Optional metadata filter, passed to Chroma as a where clause so it is
+                           applied inside the index rather than by over-fetching.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Per-query lists of (document, similarity score) pairs.
+        """
+        n_results = min(k, self.vectorstore._collection.count())
+        no_source_url_match = (search_filter is not None and search_filter.source_url_prefix is not None
+                               and not prefix_matches(self._source_url_index(), search_filter.source_url_prefix))
+        if n_results == 0 or no_source_url_match:
+            return [[] for _ in range(len(query_embeddings))]
+        where = self._where(search_filter)
+        results = self.vectorstore._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=['documents', 'metadatas', 'distances']
+            )
+        scored_docs = []
+        for documents, metadatas, distances in zip(results['documents'], results['metadatas'], results['distances']):
+            retrieved_docs = [
+                self._to_base_document[metadata['type']](Document(page_content=document, metadata=metadata))
+                for document, metadata in zip(documents, metadatas)
+                ]
+            scored_docs.append(list(zip(retrieved_docs, self._distances_to_similarities(distances))))
+        return scored_docs
+
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs a similarity search for a given query and returns similarity scores.
+
+        Args:
+            query (str): The query string to search for.
+            k (int, optional): The number of top results to return. Defaults to 5.
+            search_filter (SearchFilter, optional): Metadata filter applied inside the index.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[query, k], 
+            input_names=['query', 'k'], 
+            required_dtypes=[str, int]
+            )
+        try:
+            logger.info(f"Searching {k} scored similar documents for query: {query} in ChromaVectoreStore")
+            query_embedding = np.asarray(self.embedding_function.embed_query(query), dtype=np.float32)
+            scored_docs = self._query_collection(query_embeddings=query_embedding[np.newaxis, :], k=k, search_filter=search_filter)[0]
+            logger.info(f"{k} scored similar documents for query: {query} successfully retieved from ChromaVectoreStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"ChoromaVectorStore failed scored similarity search for query: {query}"
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int = 5,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs a similarity search for a precomputed query embedding, skipping query encoding.
+
+        Args:
+            embedding (np.ndarray): 1D numpy array query embedding.
+            k (int, optional): The number of top results to return. Defaults to 5.
+            search_filter (SearchFilter, optional): Metadata filter applied inside the index.
+
+        Raises:
+            TypeError: If `embedding` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[embedding, k],
+            input_names=['embedding', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        return self.similarity_search_by_vectors(np.atleast_2d(embedding), k, search_filter)[0]
+
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int = 5,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs one batched similarity search for precomputed query embeddings, skipping query encoding.
+
+        Args:
+            embeddings (np.ndarray): 2D numpy array of query embeddings, one row per query.
+            k (int, optional): The number of top results to return per query. Defaults to 5.
+            search_filter (SearchFilter, optional): Metadata filter applied inside the index.
+
+        Raises:
+            TypeError: If `embeddings` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Per-query top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings, k],
+            input_names=['embeddings', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        try:
+            logger.info(f"Searching {k} similar documents for {len(embeddings)} query embeddings in ChromaVectoreStore")
+            scored_docs = self._query_collection(query_embeddings=np.asarray(embeddings, dtype=np.float32), k=k, search_filter=search_filter)
+            logger.info(f"{k} similar documents for {len(embeddings)} query embeddings successfully retieved from ChromaVectoreStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"ChoromaVectorStore failed similarity search for {len(embeddings)} query embeddings."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_batch_with_scores(self,
+                                            queries: List[str],
+                                            k: int = 5,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs a similarity search for many queries at once.
+
+        All queries are embedded in one encoder call and searched in one collection query. Unlike
+        similarity_search, the shared retriever is not touched, so concurrent calls are safe.
+
+        Args:
+            queries (List[str]): The query strings to search for.
+            k (int, optional): The number of top results to return per query. Defaults to 5.
+            search_filter (SearchFilter, optional): Metadata filter applied inside the index.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Top-K (document, similarity score) pairs of every query, in query order.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        if not queries:
+            return []
+        try:
+            logger.info(f"Searching {k} similar documents for {len(queries)} queries in ChromaVectoreStore")
+            query_embeddings = np.asarray(self.embedding_function.embed_documents(queries), dtype=np.float32)
+            scored_docs = self._query_collection(query_embeddings=query_embeddings, k=k, search_filter=search_filter)
+            logger.info(f"{k} similar documents for {len(queries)} queries successfully retieved from ChromaVectoreStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"ChoromaVectorStore failed batch similarity search for {len(queries)} queries."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
     @override
     def save(self) -> None:
         """ Saves the current state of the Chroma vector store to disk at the specified path.
@@ -254,10 +654,13 @@ class ChromaVectorStore(pydantic.BaseModel):
             self.vectorstore = Chroma(
                 embedding_function=self.embedding_function,
                 collection_name=self.collection_name,
-                persist_directory=vectorestore_path
+                persist_directory=vectorestore_path,
+                collection_metadata=self.collection_metadata
             )
-            self.retriver = self.vectorstore.as_retriever(search_type=self.search_type)
             self.persist_directory = vectorestore_path
+            self._recover_interrupted_compaction()
+            self.retriver = self.vectorstore.as_retriever(search_type=self.search_type)
+            self._source_urls = None
             logger.info("ChromaVectore persist  directory changed to %s", vectorestore_path)
             logger.info(f"ChromaVectoreStore successfully loaded from {vectorestore_path}")
         except Exception as e:
@@ -0,0 +1,317 @@
+"""Request-coalescing scheduler that serves concurrent searches with shared batched calls, exposed through the VectorStoreI interface."""
+
+from typing import Optional, List, Tuple, Dict, Hashable
+from typing_extensions import override
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+import contextlib
+import threading
+import queue
+import time
+
+import pydantic
+import numpy as np
+
+import Schema.schema as schema
+from VectorStore.base_vector_store import VectorStoreI
+from VectorStore import compaction
+from VectorStore.search_filter import SearchFilter
+from Internals import utils
+from Internals.logger import logger
+
+
+@dataclass
+class CoalescingStats:
+    """ Batching counters of a CoalescingVectorStore.
+
+    Attributes:
+        num_queries: Searches served.
+        num_batches: Batched searches run on the wrapped store.
+        max_batch_size: Configured maximum batch size, the denominator of the fill rate.
+        total_wait_ms: Summed time searches spent queued before their batch started.
+    """
+    num_queries: int = 0
+    num_batches: int = 0
+    max_batch_size: int = 1
+    total_wait_ms: float = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.num_queries / self.num_batches if self.num_batches else 0.0
+
+    @property
+    def batch_fill_rate(self) -> float:
+        return self.mean_batch_size / self.max_batch_size
+
+    @property
+    def mean_wait_ms(self) -> float:
+        return self.total_wait_ms / self.num_queries if self.num_queries else 0.0
+
+
+@dataclass
+class _PendingSearch:
+    """Queries of one caller, always served together by the same batched search."""
+    queries: List[str]
+    k: int
+    search_filter: Optional[SearchFilter]
+    enqueued_at: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+    @property
+    def batch_key(self) -> Hashable:
+        return (self.k, None if self.search_filter is None else self.search_filter.model_dump_json())
+
+
+class CoalescingVectorStore(pydantic.BaseModel, VectorStoreI):
+    """Vector store wrapper coalescing concurrent scored searches into shared batched searches.
+
+    similarity_search_with_scores queues the query and blocks until a dispatcher thread has
+    served it. Batched searches by text queue their queries as one unit that is never split
+    across batches, so a multi-query retrieval costs one batched search shared with concurrent
+    single searches. The dispatcher gathers queries until none arrives for `batch_window_ms`, the
+    next unit would not fit in `max_batch_size` queries, or the first query has waited `max_wait_ms`. It then
+    runs one similarity_search_batch_with_scores per (k, search filter) group, so the queries of
+    a group are embedded in one encoder call and searched in one batched search. The groups of a
+    batch are searched concurrently on `max_concurrent_groups` threads, so searches that cannot
+    share a batched call (e.g. a text search and an image-filtered caption search) still run in
+    parallel. Queries that arrive while a batch runs form the next batch.
+
+    Searches by precomputed vectors and every other method are delegated to the wrapped store.
+
+    Attributes:
+        vectorstore: Wrapped vector store.
+        batch_window_ms: Idle time after the last arrival that closes a batch.
+        max_batch_size: Maximum number of queries per batch, unless a single unit holds more.
+        max_wait_ms: Maximum time the first query of a batch waits for the batch to close.
+        max_concurrent_groups: Maximum number of (k, search filter) groups of a batch searched at once.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    vectorstore: VectorStoreI
+    batch_window_ms: float = pydantic.Field(default=5.0, ge=0.0)
+    max_batch_size: int = pydantic.Field(default=32, gt=0)
+    max_wait_ms: float = pydantic.Field(default=20.0, ge=0.0)
+    max_concurrent_groups: int = pydantic.Field(default=4, gt=0)
+    _queue: "queue.Queue[Optional[_PendingSearch]]" = pydantic.PrivateAttr(default_factory=queue.Queue)
+    _dispatcher: Optional[threading.Thread] = pydantic.PrivateAttr(default=None)
+    # Unit that did not fit in the previous batch, opening the next one. Only used by the dispatcher thread
+    _carried: Optional[_PendingSearch] = pydantic.PrivateAttr(default=None)
+    _group_executor: Optional[ThreadPoolExecutor] = pydantic.PrivateAttr(default=None)
+    _stats: CoalescingStats = pydantic.PrivateAttr(default_factory=CoalescingStats)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+    # Serializes dispatcher start-up and enqueueing with close(), which holds it until the threads are stopped
+    _lifecycle_lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context):
+        self._stats.max_batch_size = self.max_batch_size
+
+    @property
+    def persist_directory(self) -> str:
+        return self.vectorstore.persist_directory
+
+    def _ensure_dispatcher(self) -> None:
+        """Starts the group threads and the dispatcher if needed. Must be called with _lifecycle_lock held."""
+        if self._group_executor is None:
+            self._group_executor = ThreadPoolExecutor(max_workers=self.max_concurrent_groups, thread_name_prefix='search-group')
+        if self._dispatcher is None or not self._dispatcher.is_alive():
+            self._dispatcher = threading.Thread(target=self._dispatch_forever,
+                                                args=(self._group_executor,),
+                                                name='search-coalescer',
+                                                daemon=True)
+            self._dispatcher.start()
+
+    def _next_batch(self, first: _PendingSearch) -> Tuple[List[_PendingSearch], bool]:
+        """Gathers units after first until the batch closes, returning them and whether close() was requested."""
+        batch, num_queries = [first], len(first.queries)
+        deadline = first.enqueued_at + self.max_wait_ms / 1000
+        while num_queries < self.max_batch_size:
+            timeout = min(self.batch_window_ms / 1000, deadline - time.perf_counter())
+            if timeout <= 0:
+                break
+            try:
+                pending = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if pending is None:
+                return batch, True
+            if num_queries + len(pending.queries) > self.max_batch_size:
+                self._carried = pending
+                break
+            batch.append(pending)
+            num_queries += len(pending.queries)
+        return batch, False
+
+    def _run_group(self, group: List[_PendingSearch]) -> None:
+        """Serves the queries of one (k, search filter) group with one batched search."""
+        try:
+            results = self.vectorstore.similarity_search_batch_with_scores([query for pending in group for query in pending.queries],
+                                                                           group[0].k,
+                                                                           search_filter=group[0].search_filter)
+        except Exception as e:
+            for pending in group:
+                pending.future.set_exception(e)
+            return
+        start = 0
+        for pending in group:
+            pending.future.set_result(results[start:start + len(pending.queries)])
+            start += len(pending.queries)
+
+    def _run_batch(self, batch: List[_PendingSearch], group_executor: ThreadPoolExecutor) -> None:
+        started_at = time.perf_counter()
+        groups: Dict[Hashable, List[_PendingSearch]] = {}
+        for pending in batch:
+            groups.setdefault(pending.batch_key, []).append(pending)
+        if len(groups) == 1:
+            self._run_group(batch)
+        else:
+            wait([group_executor.submit(self._run_group, group) for group in groups.values()])
+        with self._lock:
+            self._stats.num_queries += sum(len(pending.queries) for pending in batch)
+            self._stats.num_batches += len(groups)
+            self._stats.total_wait_ms += sum((started_at - pending.enqueued_at) * 1000 * len(pending.queries) for pending in batch)
+
+    def _dispatch_forever(self, group_executor: ThreadPoolExecutor) -> None:
+        while True:
+            first, self._carried = self._carried or self._queue.get(), None
+            if first is None:
+                return
+            batch, closing = self._next_batch(first)
+            try:
+                self._run_batch(batch, group_executor)
+            except Exception as e:
+                # A dead dispatcher would leave the callers blocked on their futures forever
+                logger.exception("CoalescingVectorStore failed to run a batch of %d searches", len(batch))
+                for pending in batch:
+                    with contextlib.suppress(InvalidStateError):
+                        pending.future.set_exception(e)
+            if closing:
+                return
+
+    def close(self) -> None:
+        """Stops the dispatcher and group threads once the queued searches are served."""
+        with self._lifecycle_lock:
+            if self._dispatcher is not None:
+                self._queue.put(None)
+                self._dispatcher.join()
+                self._dispatcher = None
+            if self._group_executor is not None:
+                self._group_executor.shutdown(wait=True)
+                self._group_executor = None
+
+    @property
+    def stats(self) -> CoalescingStats:
+        """Snapshot of the batching counters."""
+        with self._lock:
+            return replace(self._stats)
+
+    def clean(self) -> None:
+        self.vectorstore.clean()
+
+    @override
+    def add_documents(self,
+                      documents: list[schema.BaseDocument],
+                      embeddings: np.ndarray
+                      ) -> None:
+        """Adds documents and their embeddings to the wrapped store."""
+        self.vectorstore.add_documents(documents, embeddings)
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        return self.vectorstore.delete_by_ids(ids)
+
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        return self.vectorstore.delete_where(search_filter)
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        return self.vectorstore.compact(num_probe_queries)
+
+    @override
+    def similarity_search(self,
+                          query: str,
+                          k: int = 5
+                          ) -> List[schema.BaseDocument]:
+        """Coalesced similarity search, see similarity_search_with_scores."""
+        return [document for document, _ in self.similarity_search_with_scores(query, k)]
+
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Queues a scored similarity search and waits for the batch serving it.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter. Only queries with the same k and filter share a batched search.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If the batched search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, similarity score) pairs, best first.
+        """
+        utils.validate_dtypes(
+            inputs=[query, k],
+            input_names=['query', 'k'],
+            required_dtypes=[str, int]
+            )
+        return self._enqueue([query], k, search_filter).result()[0]
+
+    def _enqueue(self, queries: List[str], k: int, search_filter: Optional[SearchFilter]) -> Future:
+        """Queues the queries as one unit for the dispatcher and returns the future of their per-query (document, score) pairs."""
+        pending = _PendingSearch(queries=queries, k=k, search_filter=search_filter)
+        with self._lifecycle_lock:
+            self._ensure_dispatcher()
+            self._queue.put(pending)
+        return pending.future
+
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int = 5,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> List[Tuple[schema.BaseDocument, float]]:
+        return self.vectorstore.similarity_search_by_vector(embedding, k, search_filter=search_filter)
+
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int = 5,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        return self.vectorstore.similarity_search_by_vectors(embeddings, k, search_filter=search_filter)
+
+    def similarity_search_batch_with_scores(self,
+                                            queries: List[str],
+                                            k: int = 5,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Queues the queries as one unit of scored similarity searches and waits for it.
+
+        The unit is never split across batches, so the queries are always served by one batched
+        search, shared with the concurrent searches of other callers.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If a batched search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Per-query top-K (document, similarity score) pairs, best first.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        if not queries:
+            return []
+        return self._enqueue(queries, k, search_filter).result()
+
+    @override
+    def save(self) -> None:
+        self.vectorstore.save()
+
+    @override
+    def load(self, vectorestore_path: str) -> None:
+        self.vectorstore.load(vectorestore_path)
@@ -0,0 +1,90 @@
+"""Provides the report and measurement helpers shared by the compact() operations of the stores."""
+
+from typing import Callable, List, Any
+from dataclasses import dataclass
+import time
+import os
+
+import numpy as np
+
+from Internals.logger import logger
+
+
+@dataclass
+class CompactionReport:
+    """ Store size and query latency before and after a compaction.
+
+    Attributes:
+        num_documents_before: Number of documents before compaction.
+        num_documents_after: Number of documents after compaction.
+        size_bytes_before: On-disk size of the persist directory before compaction.
+        size_bytes_after: On-disk size of the persist directory after compaction.
+        query_latency_ms_before: Median latency of the probe queries before compaction.
+        query_latency_ms_after: Median latency of the probe queries after compaction.
+        elapsed_seconds: Wall time of the rewrite itself, excluding measurements.
+    """
+    num_documents_before: int = 0
+    num_documents_after: int = 0
+    size_bytes_before: int = 0
+    size_bytes_after: int = 0
+    query_latency_ms_before: float = 0.0
+    query_latency_ms_after: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return self.size_bytes_before - self.size_bytes_after
+
+
+def directory_size(path: str) -> int:
+    """Returns the total size in bytes of the files under path, 0 if it does not exist."""
+    size = 0
+    for directory, _, file_names in os.walk(path):
+        for file_name in file_names:
+            file_path = os.path.join(directory, file_name)
+            if os.path.isfile(file_path):
+                size += os.path.getsize(file_path)
+    return size
+
+
+def median_latency_ms(probes: List[Callable[[], Any]]) -> float:
+    """Runs every probe query once and returns their median latency in milliseconds, 0 without probes."""
+    latencies = []
+    for probe in probes:
+        start = time.perf_counter()
+        probe()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return float(np.median(latencies)) if latencies else 0.0
+
+
+def run_compaction(rewrite: Callable[[], None],
+                   count: Callable[[], int],
+                   persist_directories: List[str],
+                   probes: List[Callable[[], Any]]
+                   ) -> CompactionReport:
+    """ Runs a store rewrite and measures document count, on-disk size and probe query latency around it.
+
+    Args:
+        rewrite: Callable rewriting the store in place.
+        count: Callable returning the number of documents of the store.
+        persist_directories: Directories whose total size is reported.
+        probes: Probe queries timed before and after the rewrite. Built before the rewrite,
+                so they must not depend on internal state the rewrite replaces.
+
+    Returns:
+        CompactionReport: Sizes and latencies before and after the rewrite.
+    """
+    report = CompactionReport(num_documents_before=count(),
+                              size_bytes_before=sum(directory_size(path) for path in persist_directories),
+                              query_latency_ms_before=median_latency_ms(probes))
+    start = time.perf_counter()
+    rewrite()
+    report.elapsed_seconds = time.perf_counter() - start
+    report.num_documents_after = count()
+    report.size_bytes_after = sum(directory_size(path) for path in persist_directories)
+    report.query_latency_ms_after = median_latency_ms(probes)
+    logger.info("Compaction done in %.2fs: %s -> %s documents, %s -> %s bytes, p50 query latency %.2f -> %.2f ms.",
+                report.elapsed_seconds, report.num_documents_before, report.num_documents_after,
+                report.size_bytes_before, report.size_bytes_after,
+                report.query_latency_ms_before, report.query_latency_ms_after)
+    return report
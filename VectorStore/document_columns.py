@@ -0,0 +1,85 @@
+"""Columnar storage of document metadata aligned with the rows of a vector index."""
+
+from typing import Any, Callable, ClassVar, Dict, Iterable, List, Optional
+
+import numpy as np
+
+import Schema.schema as schema
+
+
+class DocumentColumns:
+    """ Stores document metadata column by column, row i describing the i-th vector of an index.
+
+    Columns are created on the fly from the keys of BaseDocument.metadata, missing values are
+    stored as None. Documents are rebuilt from their row on demand. Columns used for filtering get
+    a value index (value -> rows), built on first use and kept up to date on append.
+
+    Attributes:
+        columns: Mapping from metadata field name to the list of values of every row.
+        id_to_index: Mapping from document id to row index.
+    """
+    document_types: ClassVar[Dict[str, Any]] = {
+        schema.ImageDocument.type: schema.ImageDocument,
+        schema.TextDocument.type: schema.TextDocument,
+        }
+
+    def __init__(self, columns: Optional[Dict[str, List[Any]]] = None):
+        self.columns: Dict[str, List[Any]] = columns if columns is not None else {}
+        self.id_to_index: Dict[str, int] = {doc_id: index for index, doc_id in enumerate(self.columns.get('id', []))}
+        self._value_index: Dict[str, Dict[Any, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns.get('id', []))
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.id_to_index
+
+    def __repr__(self) -> str:
+        return f'DocumentColumns(rows={len(self)}, columns={list(self.columns)})'
+
+    @classmethod
+    def is_supported(cls, document: schema.BaseDocument) -> bool:
+        return document.type in cls.document_types
+
+    def append(self, document: schema.BaseDocument) -> int:
+        """Appends the document's metadata as a new row and returns the row index."""
+        index = len(self)
+        metadata = document.metadata
+        for name in metadata.keys() - self.columns.keys():
+            self.columns[name] = [None] * index
+        for name, column in self.columns.items():
+            column.append(metadata.get(name))
+        for name, value_rows in self._value_index.items():
+            value_rows.setdefault(metadata.get(name), []).append(index)
+        self.id_to_index[document.id] = index
+        return index
+
+    def rows_matching(self, name: str, predicate: Callable[[Any], bool]) -> np.ndarray:
+        """Returns the sorted indices of the rows whose value in column name satisfies predicate.
+
+        The predicate is evaluated once per distinct value of the column, not once per row.
+        """
+        if name not in self._value_index:
+            value_rows = {}
+            for index, value in enumerate(self.columns.get(name, [None] * len(self))):
+                value_rows.setdefault(value, []).append(index)
+            self._value_index[name] = value_rows
+        rows = [rows for value, rows in self._value_index[name].items() if predicate(value)]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(rows))
+
+    def take(self, rows: Iterable[int]) -> 'DocumentColumns':
+        """Returns new columns holding the given rows, in the given order."""
+        rows = list(rows)
+        return DocumentColumns({name: [column[row] for row in rows] for name, column in self.columns.items()})
+
+    def row(self, index: int) -> Dict[str, Any]:
+        """Returns the non-missing metadata values of a row."""
+        return {name: column[index] for name, column in self.columns.items() if column[index] is not None}
+
+    def document(self, index: int) -> schema.BaseDocument:
+        """Rebuilds the document stored at a row."""
+        row = self.row(index)
+        document_type = self.document_types[row.pop('type')]
+        return document_type(**row)
@@ -0,0 +1,107 @@
+"""Provides functions for merging ranked retrieval results coming from different indexes."""
+
+from typing import List, Tuple, Dict, Optional
+
+from Schema.schema import BaseDocument
+from Internals import utils
+
+ScoredDocuments = List[Tuple[BaseDocument, float]]
+
+
+def _min_max_normalize(scores: List[float]) -> List[float]:
+    """Rescales scores to the [0, 1] range, mapping a constant list to 1.0."""
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0 for _ in scores]
+    return [(score - low) / (high - low) for score in scores]
+
+
+def score_fusion(results: List[ScoredDocuments],
+                 weights: Optional[List[float]] = None,
+                 k: Optional[int] = None
+                 ) -> ScoredDocuments:
+    """Merges scored result lists from different indexes with weighted min-max score fusion (CombSUM).
+
+    Scores from different embedding models are not directly comparable, so each result list
+    is min-max normalized first. Documents found in several lists (matched by id) accumulate
+    the weighted normalized scores of every list they appear in.
+
+    Args:
+        results: Result lists of (document, similarity score) pairs, one per index.
+        weights: Optional weight per result list. Defaults to equal weights.
+        k: Optional number of fused results to return. Defaults to all.
+
+    Raises:
+        TypeError: If results is not a list.
+        ValueError: If the number of weights does not match the number of result lists.
+
+    Returns:
+        List[Tuple[BaseDocument, float]]: Fused (document, score) pairs, highest score first.
+    """
+    utils.validate_dtypes(
+        inputs=[results],
+        input_names=['results'],
+        required_dtypes=[list]
+        )
+    if weights is None:
+        weights = [1.0] * len(results)
+    if len(weights) != len(results):
+        raise ValueError(f"weights must have the same length as results. Got {len(weights)} weights for {len(results)} results.")
+    fused_scores: Dict[str, float] = {}
+    fused_docs: Dict[str, BaseDocument] = {}
+    for scored_docs, weight in zip(results, weights):
+        normalized_scores = _min_max_normalize([score for _, score in scored_docs])
+        for (document, _), score in zip(scored_docs, normalized_scores):
+            fused_docs.setdefault(document.id, document)
+            fused_scores[document.id] = fused_scores.get(document.id, 0.0) + weight * score
+    ranked_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)
+    if k is not None:
+        ranked_ids = ranked_ids[:k]
+    return [(fused_docs[doc_id], fused_scores[doc_id]) for doc_id in ranked_ids]
+
+
+def reciprocal_rank_fusion(results: List[ScoredDocuments],
+                           weights: Optional[List[float]] = None,
+                           k: Optional[int] = None,
+                           rank_constant: int = 60
+                           ) -> ScoredDocuments:
+    """Merges ranked result lists with weighted reciprocal rank fusion (RRF).
+
+    Only ranks are used, so lists with unrelated score scales (e.g. BM25 and cosine similarity)
+    can be fused without normalization. A document at rank r (starting at 1) in a list with
+    weight w contributes w / (rank_constant + r).
+
+    Args:
+        results: Ranked result lists of (document, score) pairs, best first, one per index.
+        weights: Optional weight per result list. Defaults to equal weights.
+        k: Optional number of fused results to return. Defaults to all.
+        rank_constant: Damping constant of RRF, 60 in the original paper.
+
+    Raises:
+        TypeError: If results is not a list.
+        ValueError: If the number of weights does not match the number of result lists.
+
+    Returns:
+        List[Tuple[BaseDocument, float]]: Fused (document, RRF score) pairs, highest score first.
+    """
+    utils.validate_dtypes(
+        inputs=[results],
+        input_names=['results'],
+        required_dtypes=[list]
+        )
+    if weights is None:
+        weights = [1.0] * len(results)
+    if len(weights) != len(results):
+        raise ValueError(f"weights must have the same length as results. Got {len(weights)} weights for {len(results)} results.")
+    fused_scores: Dict[str, float] = {}
+    fused_docs: Dict[str, BaseDocument] = {}
+    for scored_docs, weight in zip(results, weights):
+        for rank, (document, _) in enumerate(scored_docs, start=1):
+            fused_docs.setdefault(document.id, document)
+            fused_scores[document.id] = fused_scores.get(document.id, 0.0) + weight / (rank_constant + rank)
+    ranked_ids = sorted(fused_scores, key=fused_scores.get, reverse=True)
+    if k is not None:
+        ranked_ids = ranked_ids[:k]
+    return [(fused_docs[doc_id], fused_scores[doc_id]) for doc_id in ranked_ids]
@@ -0,0 +1,531 @@
+"""HNSW approximate-nearest-neighbour VectorStore built on hnswlib with tunable recall and disk persistence."""
+
+from typing import ClassVar, Optional, List, Tuple, Literal
+from typing_extensions import override
+import threading
+import json
+import os
+
+import pydantic
+import numpy as np
+import hnswlib
+
+import Schema.schema as schema
+from Embedding.text_embedding import TextEmbeddingI
+from VectorStore import compaction
+from VectorStore.base_vector_store import VectorStoreI
+from VectorStore.document_columns import DocumentColumns
+from VectorStore.search_filter import SearchFilter
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import vectore_store_exceptions
+
+
+class HNSWVectorStore(pydantic.BaseModel, VectorStoreI):
+    """Vector Store backed by an hnswlib HNSW graph, trading exactness for sub-linear search time.
+
+    The graph is built incrementally: every add_documents call inserts into the existing graph,
+    growing its capacity geometrically. Search recall and latency are tuned with M and
+    ef_construction (fixed at build time) and ef_search (adjustable at any time). Deleted
+    documents are marked deleted in the graph and dropped from it on the next compact.
+
+    Attributes:
+        embedding_function: Text embedding used to encode queries.
+        persist_directory: Directory holding index.bin and documents.json. Loaded on
+                           initialization if the files exist.
+        space: Distance space of the index.
+        M: Number of bi-directional links per node. Higher means better recall and more memory.
+        ef_construction: Candidate list size during insertion. Higher means better graph and slower build.
+        ef_search: Candidate list size during search (at least k). Higher means better recall and slower search.
+                   Applied to the graph when assigned; searches with a larger k only ever raise it.
+        initial_capacity: Number of elements allocated when the index is created.
+        filter_exact_threshold: Filtered searches matching at most this many documents are
+                                computed exactly instead of traversing the graph.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+        VectoreStoreLoadingError: If the persisted store exists but cannot be loaded.
+    """
+    _index_file: ClassVar = 'index.bin'
+    _documents_file: ClassVar = 'documents.json'
+
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    embedding_function: TextEmbeddingI
+    persist_directory: str
+    space: Literal['cosine', 'ip', 'l2'] = pydantic.Field(default='cosine')
+    M: int = pydantic.Field(default=16, gt=1)
+    ef_construction: int = pydantic.Field(default=200, gt=0)
+    ef_search: int = pydantic.Field(default=64, gt=0)
+    initial_capacity: int = pydantic.Field(default=1024, gt=0)
+    filter_exact_threshold: int = pydantic.Field(default=2048, ge=0)
+    _index: Optional[hnswlib.Index] = pydantic.PrivateAttr(default=None)
+    _columns: DocumentColumns = pydantic.PrivateAttr(default_factory=DocumentColumns)
+    _deleted_rows: List[int] = pydantic.PrivateAttr(default_factory=list)
+    # ef currently set on the shared graph, guarded by _ef_lock
+    _ef: int = pydantic.PrivateAttr(default=0)
+    _ef_lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context):
+        if os.path.exists(os.path.join(self.persist_directory, self._index_file)):
+            self.load(self.persist_directory)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == 'ef_search':
+            self._apply_ef_search()
+
+    def _apply_ef_search(self) -> None:
+        """Sets the graph's ef to ef_search, when it is assigned or a graph is built or loaded."""
+        with self._ef_lock:
+            if self._index is not None:
+                self._index.set_ef(self.ef_search)
+                self._ef = self.ef_search
+
+    def _raise_ef(self, k: int) -> None:
+        """Raises the graph's ef to k if needed. ef never drops below the k of a concurrent search."""
+        with self._ef_lock:
+            if k > self._ef:
+                self._index.set_ef(k)
+                self._ef = k
+
+    def __len__(self) -> int:
+        return len(self._columns) - len(self._deleted_rows)
+
+    def _distances_to_similarities(self, distances: np.ndarray) -> np.ndarray:
+        """Converts hnswlib distances into similarity scores where higher is more similar."""
+        if self.space == 'l2':
+            return 1.0 - distances / 2.0
+        return 1.0 - distances
+
+    def _reserve(self, num_new: int, dim: int) -> None:
+        """Creates the index on first use and grows its capacity geometrically."""
+        if self._index is None:
+            self._index = hnswlib.Index(space=self.space, dim=dim)
+            self._index.init_index(max_elements=max(self.initial_capacity, num_new),
+                                   ef_construction=self.ef_construction,
+                                   M=self.M)
+            self._apply_ef_search()
+            return
+        if self._index.dim != dim:
+            raise ValueError(f"Embedding dimension must be {self._index.dim}. Got instead: {dim}")
+        required = self._index.get_current_count() + num_new
+        if required > self._index.get_max_elements():
+            self._index.resize_index(max(required, 2 * self._index.get_max_elements()))
+
+    def clean(self) -> None:
+        """Removes all stored documents and the HNSW graph from memory."""
+        logger.info("HNSWVectorStore cleaning.")
+        self._index = None
+        self._columns = DocumentColumns()
+        self._deleted_rows = []
+        logger.info("HNSWVectorStore successfully clean.")
+
+    @override
+    def add_documents(self,
+                      documents: list[schema.BaseDocument],
+                      embeddings: np.ndarray
+                      ) -> None:
+        """ Inserts documents and their embeddings into the HNSW graph. Documents whose id is already stored are skipped.
+
+        Args:
+            documents: List of BaseDocument instances to store.
+            embeddings: 2D numpy array of embedding vectors corresponding to the documents.
+
+        Raises:
+            TypeError: If embeddings are not a numpy ndarray, or if a document type is not supported.
+            DocumentAdditionError: If documents and embeddings cannot be added.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings],
+            input_names=['embeddings'],
+            required_dtypes=[np.ndarray]
+            )
+        for document in documents:
+            if not DocumentColumns.is_supported(document):
+                raise TypeError(
+                    f'Only {list(DocumentColumns.document_types.values())} are currently supported with HNSWVectorStore. Got instead: {type(document)}'
+                    )
+        try:
+            logger.info("Adding new (documents, embeddings) to HNSWVectorStore.")
+            new_rows = [row for row, document in enumerate(documents) if document.id not in self._columns]
+            if len(new_rows) < len(documents):
+                logger.warning("HNSWVectorStore skipped %s documents with already stored ids.", len(documents) - len(new_rows))
+            if not new_rows:
+                return
+            embeddings = np.asarray(embeddings[new_rows], dtype=np.float32)
+            self._reserve(len(new_rows), embeddings.shape[1])
+            labels = np.arange(len(self._columns), len(self._columns) + len(new_rows))
+            self._index.add_items(embeddings, labels)
+            for row in new_rows:
+                self._columns.append(documents[row])
+            logger.info("New (documents, embeddings) successfully added to HNSWVectorStore.")
+        except Exception as e:
+            msg = "HNSWVectorStore failed document addition."
+            logger.exception(msg)
+            raise vectore_store_exceptions.DocumentAdditionError(msg) from e
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """ Deletes documents by id. Unknown ids are ignored.
+
+        Deleted documents are marked deleted in the HNSW graph, so searches skip them at once,
+        and are removed from the graph on the next compact.
+
+        Args:
+            ids: Ids of the documents to delete.
+
+        Raises:
+            TypeError: If `ids` is not a list.
+            VectoreStoreCleaningError: If deletion fails.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        utils.validate_dtypes(
+            inputs=[ids],
+            input_names=['ids'],
+            required_dtypes=[list]
+            )
+        try:
+            logger.info(f"Deleting {len(ids)} documents by id from HNSWVectorStore.")
+            rows = [self._columns.id_to_index[doc_id] for doc_id in dict.fromkeys(ids) if doc_id in self._columns]
+            for row in rows:
+                self._index.mark_deleted(row)
+                del self._columns.id_to_index[self._columns.columns['id'][row]]
+                self._deleted_rows.append(row)
+            logger.info(f"{len(rows)} documents successfully deleted from HNSWVectorStore.")
+            return len(rows)
+        except Exception as e:
+            msg = "HNSWVectorStore failed to delete documents by id."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreCleaningError(msg) from e
+
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        """Deletes the live documents matching a non-empty metadata filter, see delete_by_ids."""
+        deleted_rows = set(self._deleted_rows)
+        ids = [self._columns.columns['id'][row] for row in search_filter.rows(self._columns) if row not in deleted_rows]
+        return self.delete_by_ids(ids)
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        """ Rebuilds the HNSW graph from its live documents, dropping deleted nodes, and saves it.
+
+        The new graph and columns are built aside and swapped in once complete, so a failed
+        rebuild leaves the store as it was.
+
+        Args:
+            num_probe_queries: Number of stored embeddings used as probe queries to measure
+                               search latency before and after compaction.
+
+        Raises:
+            VectoreStoreSavingError: If the rebuild or the save fails.
+
+        Returns:
+            compaction.CompactionReport: Document count, persist directory size and probe query
+                                         latency before and after compaction.
+        """
+        deleted_rows = set(self._deleted_rows)
+        live_rows = np.array([row for row in range(len(self._columns)) if row not in deleted_rows], dtype=np.int64)
+        probe_embeddings = (np.asarray(self._index.get_items(live_rows[:num_probe_queries], return_type='numpy'), dtype=np.float32)
+                            if self._index is not None and len(live_rows) else [])
+        probes = [lambda embedding=embedding: self._search(embedding[np.newaxis, :], 10) for embedding in probe_embeddings]
+
+        def rewrite() -> None:
+            rebuilt = HNSWVectorStore(embedding_function=self.embedding_function,
+                                      persist_directory=os.path.join(self.persist_directory, 'compacting'),
+                                      space=self.space,
+                                      M=self.M,
+                                      ef_construction=self.ef_construction,
+                                      ef_search=self.ef_search,
+                                      initial_capacity=max(self.initial_capacity, len(live_rows)),
+                                      filter_exact_threshold=self.filter_exact_threshold)
+            if len(live_rows):
+                vectors = np.asarray(self._index.get_items(live_rows, return_type='numpy'), dtype=np.float32)
+                rebuilt.add_documents([self._columns.document(int(row)) for row in live_rows], vectors)
+            self._index, self._columns, self._deleted_rows = rebuilt._index, rebuilt._columns, []
+            self._apply_ef_search()
+            self.save()
+
+        try:
+            logger.info("Compacting HNSWVectorStore.")
+            return compaction.run_compaction(rewrite=rewrite,
+                                             count=lambda: len(self),
+                                             persist_directories=[self.persist_directory],
+                                             probes=probes)
+        except Exception as e:
+            msg = f"HNSWVectorStore failed to compact to {self.persist_directory}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreSavingError(msg) from e
+
+    def _exact_search(self,
+                      query_embeddings: np.ndarray,
+                      k: int,
+                      rows: np.ndarray
+                      ) -> Tuple[np.ndarray, np.ndarray]:
+        """Computes exact (labels, distances) of the top-k among the given rows, in the index distance space."""
+        vectors = np.asarray(self._index.get_items(rows, return_type='numpy'), dtype=np.float32)
+        if self.space == 'l2':
+            distances = ((query_embeddings ** 2).sum(axis=1)[:, np.newaxis] + (vectors ** 2).sum(axis=1)[np.newaxis, :]
+                         - 2.0 * query_embeddings @ vectors.T)
+        else:
+            if self.space == 'cosine':
+                query_embeddings = query_embeddings / np.maximum(np.linalg.norm(query_embeddings, axis=1, keepdims=True), 1e-12)
+            distances = 1.0 - query_embeddings @ vectors.T
+        indices, negative_distances = utils.top_k(-distances, k)
+        return rows[indices], -negative_distances
+
+    def _search(self,
+                query_embeddings: np.ndarray,
+                k: int,
+                search_filter: Optional[SearchFilter] = None
+                ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """Runs a batched knn query on the HNSW graph with ef at least max(ef_search, k).
+
+        With a search_filter, the graph traversal only accepts matching labels. Filters matching at
+        most filter_exact_threshold rows are searched exactly over those rows instead, since graph
+        traversal degrades when few nodes are allowed.
+        """
+        rows = None if search_filter is None else search_filter.rows(self._columns)
+        if rows is not None and self._deleted_rows:
+            rows = np.setdiff1d(rows, self._deleted_rows, assume_unique=True)
+        count = len(self) if rows is None else len(rows)
+        k = min(k, count)
+        if k == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        if rows is not None and len(rows) <= self.filter_exact_threshold:
+            labels, distances = self._exact_search(query_embeddings, k, rows)
+        else:
+            self._raise_ef(k)
+            if rows is None:
+                labels, distances = self._index.knn_query(query_embeddings, k=k)
+            else:
+                allowed = np.zeros(len(self._columns), dtype=bool)
+                allowed[rows] = True
+                labels, distances = self._index.knn_query(query_embeddings, k=k, num_threads=1,
+                                                          filter=lambda label: bool(allowed[label]))
+        similarities = self._distances_to_similarities(distances)
+        return [[(self._columns.document(int(label)), float(score)) for label, score in zip(row_labels, row_scores)]
+                for row_labels, row_scores in zip(labels, similarities)]
+
+    @override
+    def similarity_search(self,
+                          query: str,
+                          k: int = 5
+                          ) -> List[schema.BaseDocument]:
+        """ Performs an approximate similarity search for a given query.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[schema.BaseDocument]: List of top-K similar documents.
+        """
+        return [document for document, _ in self.similarity_search_with_scores(query, k)]
+
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs an approximate similarity search for a given query and returns similarity scores.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[query, k],
+            input_names=['query', 'k'],
+            required_dtypes=[str, int]
+            )
+        try:
+            logger.info(f"Searching {k} similar documents for query: {query} in HNSWVectorStore")
+            query_embedding = self.embedding_function.encode([query])
+            scored_docs = self._search(query_embeddings=query_embedding, k=k, search_filter=search_filter)[0]
+            logger.info(f"{k} similar documents for query: {query} successfully retieved from HNSWVectorStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"HNSWVectorStore failed similarity search for query: {query}"
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int = 5,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs a similarity search for a precomputed query embedding, skipping query encoding.
+
+        Args:
+            embedding: 1D numpy array query embedding.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `embedding` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[embedding, k],
+            input_names=['embedding', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        return self.similarity_search_by_vectors(np.atleast_2d(embedding), k, search_filter)[0]
+
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int = 5,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs one batched similarity search for precomputed query embeddings, skipping query encoding.
+
+        Args:
+            embeddings: 2D numpy array of query embeddings, one row per query.
+            k: The number of top results to return per query. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `embeddings` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Per-query top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings, k],
+            input_names=['embeddings', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        try:
+            logger.info(f"Searching {k} similar documents for {len(embeddings)} query embeddings in HNSWVectorStore")
+            scored_docs = self._search(query_embeddings=np.asarray(embeddings, dtype=np.float32), k=k, search_filter=search_filter)
+            logger.info(f"{k} similar documents for {len(embeddings)} query embeddings successfully retieved from HNSWVectorStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"HNSWVectorStore failed similarity search for {len(embeddings)} query embeddings."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_batch_with_scores(self,
+                                            queries: List[str],
+                                            k: int = 5,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs a similarity search for many queries with one encoder call and one batched search.
+
+        Args:
+            queries: The query strings to search for.
+            k: The number of top results to return per query. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Top-K (document, similarity score) pairs of every query, in query order.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        if not queries:
+            return []
+        try:
+            logger.info(f"Searching {k} similar documents for {len(queries)} queries in HNSWVectorStore")
+            query_embeddings = self.embedding_function.encode(queries)
+            scored_docs = self._search(query_embeddings=query_embeddings, k=k, search_filter=search_filter)
+            logger.info(f"{k} similar documents for {len(queries)} queries successfully retieved from HNSWVectorStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"HNSWVectorStore failed batch similarity search for {len(queries)} queries."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    @override
+    def save(self) -> None:
+        """ Saves the HNSW graph and the metadata columns to persist_directory.
+
+        Both files are written to temporary files first and then moved over the previous ones, so
+        an interrupted save does not leave a truncated index behind.
+
+        Raises:
+            VectoreStoreSavingError: If saving the vector store fails.
+        """
+        try:
+            logger.info(f"Saving HNSWVectorStore to path: {self.persist_directory}")
+            os.makedirs(self.persist_directory, exist_ok=True)
+            index_path = os.path.join(self.persist_directory, self._index_file)
+            documents_path = os.path.join(self.persist_directory, self._documents_file)
+            if self._index is not None:
+                self._index.save_index(index_path + '.tmp')
+            with open(documents_path + '.tmp', 'w') as f:
+                json.dump({'dim': None if self._index is None else self._index.dim,
+                           'space': self.space,
+                           'columns': self._columns.columns,
+                           'deleted_rows': self._deleted_rows}, f)
+            if self._index is not None:
+                os.replace(index_path + '.tmp', index_path)
+            os.replace(documents_path + '.tmp', documents_path)
+            logger.info(f"HNSWVectorStore successfully saved to {self.persist_directory}")
+        except Exception as e:
+            msg = f"HNSWVectorStore failed to save to {self.persist_directory}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreSavingError(msg) from e
+
+    @override
+    def load(self, vectorestore_path: str) -> None:
+        """ Loads the HNSW graph and metadata columns saved in vectorestore_path.
+
+        Args:
+            vectorestore_path: Directory holding index.bin and documents.json.
+
+        Raises:
+            TypeError: If `vectorestore_path` is not a string.
+            VectoreStoreLoadingError: If loading the vector store fails.
+        """
+        utils.validate_dtypes(
+            inputs=[vectorestore_path],
+            input_names=['vectorestore_path'],
+            required_dtypes=[str]
+        )
+        try:
+            logger.info(f"Loading HNSWVectorStore from path: {vectorestore_path}")
+            with open(os.path.join(vectorestore_path, self._documents_file)) as f:
+                persisted = json.load(f)
+            columns = DocumentColumns(persisted['columns'])
+            index = hnswlib.Index(space=persisted['space'], dim=persisted['dim'])
+            index.load_index(os.path.join(vectorestore_path, self._index_file),
+                             max_elements=max(self.initial_capacity, len(columns)))
+            deleted_rows = persisted.get('deleted_rows', [])
+            for row in deleted_rows:
+                doc_id = columns.columns['id'][row]
+                if columns.id_to_index.get(doc_id) == row:
+                    del columns.id_to_index[doc_id]
+            self._index = index
+            self._columns = columns
+            self._deleted_rows = deleted_rows
+            self._apply_ef_search()
+            self.space = persisted['space']
+            self.persist_directory = vectorestore_path
+            logger.info(f"HNSWVectorStore successfully loaded from {vectorestore_path}")
+        except Exception as e:
+            msg = f"HNSWVectorStore failed to load from {vectorestore_path}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreLoadingError(msg) from e
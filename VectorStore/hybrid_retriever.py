@@ -0,0 +1,243 @@
+"""Hybrid dense + BM25 retrieval fused with reciprocal rank fusion, exposed through the VectorStoreI interface."""
+
+from typing import Optional, List, Tuple
+from typing_extensions import override
+from concurrent.futures import ThreadPoolExecutor
+
+import pydantic
+import numpy as np
+
+import Schema.schema as schema
+from VectorStore import compaction
+from VectorStore.base_vector_store import VectorStoreI
+from VectorStore.bm25_index import BM25Index
+from VectorStore.fusion import reciprocal_rank_fusion
+from VectorStore.search_filter import SearchFilter
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import vectore_store_exceptions
+
+
+class HybridRetriever(pydantic.BaseModel, VectorStoreI):
+    """Vector store combining a dense vector store with a sparse BM25 index.
+
+    Every search runs the BM25 search on a background thread while the dense search runs on the
+    calling thread, so hybrid latency stays close to max(dense, sparse) rather than their sum.
+    Both result lists are fused with reciprocal rank fusion. Added documents are embedded into
+    the dense store, and TextDocuments are also indexed by BM25.
+
+    Searches by precomputed vector have no query text for BM25 and fall back to the dense store.
+
+    Attributes:
+        vectorstore: Dense vector store.
+        bm25_index: Sparse BM25 index over the TextDocument chunks of the dense store.
+        candidates: Number of results retrieved from each index before fusion (at least k).
+        weights: Weights of (dense, sparse) results in reciprocal rank fusion.
+        rank_constant: Damping constant of reciprocal rank fusion.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    vectorstore: VectorStoreI
+    bm25_index: BM25Index
+    candidates: int = pydantic.Field(default=20, gt=0)
+    weights: List[float] = pydantic.Field(default_factory=lambda: [1.0, 1.0])
+    rank_constant: int = pydantic.Field(default=60, ge=0)
+    _executor: ThreadPoolExecutor = pydantic.PrivateAttr(
+        default_factory=lambda: ThreadPoolExecutor(max_workers=2, thread_name_prefix='bm25-search'))
+
+    @property
+    def persist_directory(self) -> str:
+        return self.vectorstore.persist_directory
+
+    def clean(self) -> None:
+        """Clears both the dense store and the BM25 index."""
+        self.vectorstore.clean()
+        self.bm25_index.clean()
+
+    @override
+    def add_documents(self,
+                      documents: list[schema.BaseDocument],
+                      embeddings: np.ndarray
+                      ) -> None:
+        """ Adds documents and their embeddings to the dense store, and TextDocuments to the BM25 index.
+
+        Args:
+            documents: List of BaseDocument instances to store.
+            embeddings: 2D numpy array of embedding vectors corresponding to the documents.
+
+        Raises:
+            TypeError: If embeddings are not a numpy ndarray, or if a document type is not supported.
+            DocumentAdditionError: If documents cannot be added.
+        """
+        self.vectorstore.add_documents(documents, embeddings)
+        self.bm25_index.add_documents([document for document in documents if isinstance(document, schema.TextDocument)])
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """Deletes documents by id from both indexes and returns the number deleted from the dense store.
+
+        The dense store is the source of truth and is updated first, so a failed deletion leaves
+        the BM25 index untouched rather than out of sync.
+        """
+        num_deleted = self.vectorstore.delete_by_ids(ids)
+        self.bm25_index.delete_by_ids(ids)
+        return num_deleted
+
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        """Deletes the documents matching a non-empty metadata filter from both indexes and returns the number deleted from the dense store."""
+        num_deleted = self.vectorstore.delete_where(search_filter)
+        self.bm25_index.delete_where(search_filter)
+        return num_deleted
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        """ Compacts the dense store and the BM25 index.
+
+        Args:
+            num_probe_queries: Number of probe queries (see BM25Index.sample_queries) used to
+                               measure hybrid search latency before and after compaction.
+
+        Returns:
+            compaction.CompactionReport: BM25 document count, total size of both persist
+                                         directories and hybrid probe query latency before and after.
+        """
+        probes = [lambda query=query: self.similarity_search_with_scores(query, 10)
+                  for query in self.bm25_index.sample_queries(num_probe_queries)]
+        return compaction.run_compaction(rewrite=lambda: (self.vectorstore.compact(), self.bm25_index.compact()),
+                                         count=lambda: len(self.bm25_index),
+                                         persist_directories=[self.vectorstore.persist_directory, self.bm25_index.persist_directory],
+                                         probes=probes)
+
+    def _fuse(self,
+              dense_results: List[Tuple[schema.BaseDocument, float]],
+              sparse_results: List[Tuple[schema.BaseDocument, float]],
+              k: int
+              ) -> List[Tuple[schema.BaseDocument, float]]:
+        return reciprocal_rank_fusion([dense_results, sparse_results],
+                                      weights=self.weights,
+                                      k=k,
+                                      rank_constant=self.rank_constant)
+
+    @override
+    def similarity_search(self,
+                          query: str,
+                          k: int = 5
+                          ) -> List[schema.BaseDocument]:
+        """ Performs a hybrid dense + BM25 search for a given query.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[schema.BaseDocument]: List of top-K documents by fused rank.
+        """
+        return [document for document, _ in self.similarity_search_with_scores(query, k)]
+
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs a hybrid dense + BM25 search for a given query and returns RRF scores.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter, applied inside both indexes.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, RRF score) pairs, best first.
+        """
+        utils.validate_dtypes(
+            inputs=[query, k],
+            input_names=['query', 'k'],
+            required_dtypes=[str, int]
+            )
+        try:
+            logger.info(f"Searching {k} documents for query: {query} in HybridRetriever")
+            candidates = max(k, self.candidates)
+            sparse_search = self._executor.submit(self.bm25_index.search, query, candidates, search_filter)
+            dense_results = self.vectorstore.similarity_search_with_scores(query, candidates, search_filter=search_filter)
+            scored_docs = self._fuse(dense_results, sparse_search.result(), k)
+            logger.info(f"{k} documents for query: {query} successfully retieved from HybridRetriever")
+            return scored_docs
+        except Exception as e:
+            msg = f"HybridRetriever failed similarity search for query: {query}"
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int = 5,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> List[Tuple[schema.BaseDocument, float]]:
+        """Dense-only search for a precomputed query embedding, see VectorStoreI.similarity_search_by_vector."""
+        return self.vectorstore.similarity_search_by_vector(embedding, k, search_filter=search_filter)
+
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int = 5,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """Dense-only search for precomputed query embeddings, see VectorStoreI.similarity_search_by_vectors."""
+        return self.vectorstore.similarity_search_by_vectors(embeddings, k, search_filter=search_filter)
+
+    def similarity_search_batch_with_scores(self,
+                                            queries: List[str],
+                                            k: int = 5,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs a hybrid search for many queries, with one batched dense search and one batched BM25 search.
+
+        Args:
+            queries: The query strings to search for.
+            k: The number of top results to return per query. Defaults to 5.
+            search_filter: Optional metadata filter, applied inside both indexes.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Top-K (document, RRF score) pairs of every query, in query order.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        if not queries:
+            return []
+        try:
+            logger.info(f"Searching {k} documents for {len(queries)} queries in HybridRetriever")
+            candidates = max(k, self.candidates)
+            sparse_search = self._executor.submit(self.bm25_index.search_batch, queries, candidates, search_filter)
+            dense_results = self.vectorstore.similarity_search_batch_with_scores(queries, candidates, search_filter=search_filter)
+            fused = [self._fuse(dense, sparse, k) for dense, sparse in zip(dense_results, sparse_search.result())]
+            logger.info(f"{k} documents for {len(queries)} queries successfully retieved from HybridRetriever")
+            return fused
+        except Exception as e:
+            msg = f"HybridRetriever failed batch similarity search for {len(queries)} queries."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    @override
+    def save(self) -> None:
+        """Saves the dense store and the BM25 index to their persist directories."""
+        self.vectorstore.save()
+        self.bm25_index.save()
+
+    @override
+    def load(self, vectorestore_path: str) -> None:
+        """Loads the dense store from vectorestore_path and the BM25 index from its persist directory."""
+        self.vectorstore.load(vectorestore_path)
+        self.bm25_index.load(self.bm25_index.persist_directory)
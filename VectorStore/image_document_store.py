@@ -0,0 +1,223 @@
+"""Append-only binary store of ImageDocuments with a memory-mapped blob file and an offset index keyed by document id."""
+
+from typing import ClassVar, Dict, Iterable, List, Optional, Any
+from io import BytesIO
+import threading
+import base64
+import mmap
+import json
+import os
+
+import pydantic
+from PIL import Image
+
+import Schema.schema as schema
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import vectore_store_exceptions
+
+
+def encoded_image_bytes(image_document: schema.ImageDocument) -> Optional[bytes]:
+    """Returns the original compressed bytes of an image, or the image encoded in its own format (PNG if unknown)."""
+    if image_document.image_bytes is not None:
+        return image_document.image_bytes
+    if image_document.image is None:
+        return None
+    buffered = BytesIO()
+    image_document.image.save(buffered, format=image_document.image.format or "PNG")
+    return buffered.getvalue()
+
+
+class ImageDocumentStore(pydantic.BaseModel):
+    """Store of ImageDocuments whose images are fetched lazily by id.
+
+    Compressed image bytes are appended to a single blob file, and a small JSON index maps each
+    document id to its metadata and the (offset, length) of its bytes in the blob. Opening the
+    store only reads the index; the blob is memory-mapped and each image is decoded on first
+    access, so start-up is near-instant and memory stays proportional to the images displayed.
+
+    Attributes:
+        store_directory: Directory holding images.bin and index.json. Loaded on initialization
+                         if the files exist.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+        VectoreStoreLoadingError: If the persisted store exists but cannot be loaded.
+    """
+    _blob_file: ClassVar = 'images.bin'
+    _index_file: ClassVar = 'index.json'
+
+    store_directory: str
+    _index: Dict[str, Dict[str, Any]] = pydantic.PrivateAttr(default_factory=dict)
+    _mmap: Optional[mmap.mmap] = pydantic.PrivateAttr(default=None)
+    _lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context):
+        if os.path.exists(self._index_path):
+            self.load()
+
+    @property
+    def _blob_path(self) -> str:
+        return os.path.join(self.store_directory, self._blob_file)
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.store_directory, self._index_file)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._index
+
+    def __getitem__(self, doc_id: str) -> schema.ImageDocument:
+        return self.get(doc_id)
+
+    @property
+    def ids(self) -> List[str]:
+        return list(self._index)
+
+    def _blob(self) -> Optional[mmap.mmap]:
+        """Returns the read-only memory map of the blob file, mapping it on first use. Must be called with _lock held."""
+        if self._mmap is None and os.path.exists(self._blob_path) and os.path.getsize(self._blob_path) > 0:
+            with open(self._blob_path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def _unmap(self) -> None:
+        """Releases the memory map of the blob file. Must be called with _lock held."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def close(self) -> None:
+        """Releases the memory map of the blob file."""
+        with self._lock:
+            self._unmap()
+
+    def add_documents(self, image_documents: Iterable[schema.ImageDocument]) -> None:
+        """ Appends the images of new documents to the blob file and records them in the index.
+
+        Documents whose id is already stored are skipped.
+
+        Args:
+            image_documents: ImageDocument instances to store. Documents without an image are
+                             stored with their metadata only.
+
+        Raises:
+            TypeError: If a document is not an ImageDocument.
+            DocumentAdditionError: If documents cannot be stored.
+        """
+        image_documents = list(image_documents)
+        for image_document in image_documents:
+            utils.validate_dtypes(
+                inputs=[image_document],
+                input_names=['image_document'],
+                required_dtypes=[schema.ImageDocument]
+                )
+        try:
+            logger.info(f"Adding {len(image_documents)} image documents to ImageDocumentStore.")
+            # Images are encoded before taking the lock, so concurrent readers are only blocked by the writes
+            encoded = [(image_document, encoded_image_bytes(image_document))
+                       for image_document in image_documents if image_document.id not in self._index]
+            os.makedirs(self.store_directory, exist_ok=True)
+            with self._lock:
+                with open(self._blob_path, 'ab') as blob:
+                    offset = blob.tell()
+                    for image_document, image_bytes in encoded:
+                        if image_document.id in self._index:
+                            continue
+                        entry = {'metadata': image_document.metadata, 'offset': None, 'length': 0}
+                        if image_bytes is not None:
+                            blob.write(image_bytes)
+                            entry['offset'], entry['length'] = offset, len(image_bytes)
+                            offset += len(image_bytes)
+                        self._index[image_document.id] = entry
+                self._write_index()
+                # The blob grew, remap it on next access
+                self._unmap()
+            logger.info("Image documents successfully added to ImageDocumentStore.")
+        except Exception as e:
+            msg = "ImageDocumentStore failed image document addition."
+            logger.exception(msg)
+            raise vectore_store_exceptions.DocumentAdditionError(msg) from e
+
+    def add_documents_from_json(self, image_documents_store_path: str) -> None:
+        """ Imports a JSON store written by utils.save_image_documents_to_json, copying its encoded images as they are.
+
+        Args:
+            image_documents_store_path: Path of the JSON image documents store.
+
+        Raises:
+            DocumentAdditionError: If documents cannot be stored.
+        """
+        with open(image_documents_store_path, 'r') as f:
+            loaded_data = json.load(f)
+        image_documents = []
+        for serialized_image_document in loaded_data.values():
+            image_base64 = serialized_image_document.pop('image_base64', None)
+            image_bytes = base64.b64decode(image_base64) if image_base64 else None
+            image_documents.append(schema.ImageDocument(**serialized_image_document, image_bytes=image_bytes))
+        self.add_documents(image_documents)
+
+    def _write_index(self) -> None:
+        """Writes the index next to the blob file, replacing the previous index atomically. Must be called with _lock held."""
+        temporary_path = self._index_path + '.tmp'
+        with open(temporary_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(temporary_path, self._index_path)
+
+    def get_image_bytes(self, doc_id: str) -> Optional[bytes]:
+        """ Returns the compressed bytes of one image, read from the memory-mapped blob file.
+
+        Raises:
+            KeyError: If doc_id is not stored.
+        """
+        # The slice copies the bytes under the lock, so add_documents cannot unmap the blob while it is read
+        with self._lock:
+            entry = self._index[doc_id]
+            if entry['offset'] is None:
+                return None
+            return self._blob()[entry['offset']: entry['offset'] + entry['length']]
+
+    def get(self, doc_id: str) -> schema.ImageDocument:
+        """ Returns one ImageDocument with its image decoded from the blob file.
+
+        Args:
+            doc_id: Id of the image document.
+
+        Raises:
+            KeyError: If doc_id is not stored.
+
+        Returns:
+            schema.ImageDocument: The image document, with image and image_bytes set if it has an image.
+        """
+        image_bytes = self.get_image_bytes(doc_id)
+        with self._lock:
+            metadata = self._index[doc_id]['metadata']
+        image = Image.open(BytesIO(image_bytes)) if image_bytes is not None else None
+        return schema.ImageDocument(**metadata, image=image, image_bytes=image_bytes)
+
+    def load(self, store_directory: Optional[str] = None) -> None:
+        """ Loads the index of the store saved in store_directory. Images are read lazily.
+
+        Args:
+            store_directory: Directory holding images.bin and index.json. Defaults to store_directory.
+
+        Raises:
+            VectoreStoreLoadingError: If loading the index fails.
+        """
+        try:
+            if store_directory is not None:
+                self.store_directory = store_directory
+            logger.info(f"Loading ImageDocumentStore from path: {self.store_directory}")
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+            with self._lock:
+                self._unmap()
+                self._index = index
+            logger.info(f"ImageDocumentStore with {len(self._index)} documents successfully loaded from {self.store_directory}")
+        except Exception as e:
+            msg = f"ImageDocumentStore failed to load from {self.store_directory}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreLoadingError(msg) from e
@@ -0,0 +1,496 @@
+"""In-process NumPy VectorStore keeping normalized embeddings in one contiguous matrix with memory-mapped persistence."""
+
+from typing import ClassVar, Optional, List, Tuple
+from typing_extensions import override
+import threading
+import json
+import os
+
+import pydantic
+import numpy as np
+
+import Schema.schema as schema
+from Embedding.text_embedding import TextEmbeddingI
+from Embedding.vector_compression import PCAVectorCompression
+from VectorStore import compaction
+from VectorStore.base_vector_store import VectorStoreI
+from VectorStore.document_columns import DocumentColumns
+from VectorStore.search_filter import SearchFilter
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import vectore_store_exceptions
+
+
+class NumpyVectorStore(pydantic.BaseModel, VectorStoreI):
+    """Vector Store kept in process memory, for corpora small enough to scan exhaustively.
+
+    Embeddings are L2-normalized and stored in one contiguous float32 matrix, so a search is a
+    single matrix-vector product followed by an argpartition top-k. Document metadata is stored
+    column by column in lists aligned with the matrix rows. On disk, the matrix is saved as a
+    .npy file that is memory-mapped on load, and the metadata columns as JSON.
+
+    With a compression, searches scan compressed codes kept in memory instead of the float32
+    matrix, then rescore the best k * rescore_factor candidates exactly. Only the candidate rows
+    of a memory-mapped matrix are read, so resident memory shrinks with the codes. The
+    compression is fitted on the stored embeddings at the first search and saved next to them.
+
+    Attributes:
+        embedding_function: Text embedding used to encode queries.
+        persist_directory: Directory holding embeddings.npy and documents.json. Loaded on
+                           initialization if the files exist.
+        mmap: Whether to memory-map the persisted embeddings instead of reading them into memory.
+        compression: Optional PCA and float16/int8 compression of the searched vectors.
+        rescore_factor: With a compression, number of candidates rescored exactly per result.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+        VectoreStoreLoadingError: If the persisted store exists but cannot be loaded.
+    """
+    _embeddings_file: ClassVar = 'embeddings.npy'
+    _documents_file: ClassVar = 'documents.json'
+    _compression_file: ClassVar = 'compression.npz'
+
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    embedding_function: TextEmbeddingI
+    persist_directory: str
+    mmap: bool = pydantic.Field(default=True)
+    compression: Optional[PCAVectorCompression] = pydantic.Field(default=None)
+    rescore_factor: int = pydantic.Field(default=4, gt=0)
+    _matrix: Optional[np.ndarray] = pydantic.PrivateAttr(default=None)
+    _size: int = pydantic.PrivateAttr(default=0)
+    _columns: DocumentColumns = pydantic.PrivateAttr(default_factory=DocumentColumns)
+    _codes: Optional[np.ndarray] = pydantic.PrivateAttr(default=None)
+    _codes_lock: threading.Lock = pydantic.PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, context):
+        if os.path.exists(os.path.join(self.persist_directory, self._embeddings_file)):
+            self.load(self.persist_directory)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """Normalized embeddings of the stored documents, one row per document."""
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _reserve(self, num_new: int, dim: int) -> None:
+        """Grows the matrix capacity geometrically so repeated adds stay amortized O(1) per row."""
+        if self._size == 0:
+            self._matrix = None
+        if self._matrix is not None and self._matrix.shape[1] != dim:
+            raise ValueError(f"Embedding dimension must be {self._matrix.shape[1]}. Got instead: {dim}")
+        required = self._size + num_new
+        if self._matrix is not None and self._matrix.shape[0] >= required and self._matrix.flags.writeable:
+            return
+        capacity = max(required, 2 * (0 if self._matrix is None else self._matrix.shape[0]), 1024)
+        matrix = np.empty((capacity, dim), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def clean(self) -> None:
+        """Removes all stored documents and embeddings from memory."""
+        logger.info("NumpyVectorStore cleaning.")
+        self._matrix = None
+        self._size = 0
+        self._columns = DocumentColumns()
+        self._codes = None
+        logger.info("NumpyVectorStore successfully clean.")
+
+    @override
+    def add_documents(self,
+                      documents: list[schema.BaseDocument],
+                      embeddings: np.ndarray
+                      ) -> None:
+        """ Adds documents and their embeddings to the store. Documents whose id is already stored are skipped.
+
+        Args:
+            documents: List of BaseDocument instances to store.
+            embeddings: 2D numpy array of embedding vectors corresponding to the documents.
+
+        Raises:
+            TypeError: If embeddings are not a numpy ndarray, or if a document type is not supported.
+            DocumentAdditionError: If documents and embeddings cannot be added.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings],
+            input_names=['embeddings'],
+            required_dtypes=[np.ndarray]
+            )
+        for document in documents:
+            if not DocumentColumns.is_supported(document):
+                raise TypeError(
+                    f'Only {list(DocumentColumns.document_types.values())} are currently supported with NumpyVectorStore. Got instead: {type(document)}'
+                    )
+        try:
+            logger.info("Adding new (documents, embeddings) to NumpyVectorStore.")
+            new_rows = [row for row, document in enumerate(documents) if document.id not in self._columns]
+            if len(new_rows) < len(documents):
+                logger.warning("NumpyVectorStore skipped %s documents with already stored ids.", len(documents) - len(new_rows))
+            if not new_rows:
+                return
+            embeddings = self._normalize(embeddings[new_rows])
+            self._reserve(len(new_rows), embeddings.shape[1])
+            self._matrix[self._size: self._size + len(new_rows)] = embeddings
+            for row in new_rows:
+                self._columns.append(documents[row])
+                self._size += 1
+            logger.info("New (documents, embeddings) successfully added to NumpyVectorStore.")
+        except Exception as e:
+            msg = "NumpyVectorStore failed document addition."
+            logger.exception(msg)
+            raise vectore_store_exceptions.DocumentAdditionError(msg) from e
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """ Deletes documents by id, removing their rows from the matrix and the metadata columns. Unknown ids are ignored.
+
+        Args:
+            ids: Ids of the documents to delete.
+
+        Raises:
+            TypeError: If `ids` is not a list.
+            VectoreStoreCleaningError: If deletion fails.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        utils.validate_dtypes(
+            inputs=[ids],
+            input_names=['ids'],
+            required_dtypes=[list]
+            )
+        try:
+            logger.info(f"Deleting {len(ids)} documents by id from NumpyVectorStore.")
+            deleted_rows = {self._columns.id_to_index[doc_id] for doc_id in ids if doc_id in self._columns}
+            if deleted_rows:
+                live_rows = np.array([row for row in range(self._size) if row not in deleted_rows], dtype=np.int64)
+                # Fancy indexing copies, so a memory-mapped matrix is detached from its file
+                self._matrix = self.embeddings[live_rows]
+                self._size = len(live_rows)
+                self._columns = self._columns.take(live_rows)
+                if self._codes is not None:
+                    self._codes = self._codes[live_rows[live_rows < len(self._codes)]]
+            logger.info(f"{len(deleted_rows)} documents successfully deleted from NumpyVectorStore.")
+            return len(deleted_rows)
+        except Exception as e:
+            msg = "NumpyVectorStore failed to delete documents by id."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreCleaningError(msg) from e
+
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        """Deletes the documents matching a non-empty metadata filter, see delete_by_ids."""
+        return self.delete_by_ids([self._columns.columns['id'][row] for row in search_filter.rows(self._columns)])
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        """ Rewrites the persisted files from the live rows, refitting the compression if any.
+
+        Deletions already remove rows in memory, so compaction only reclaims the disk space the
+        deleted rows still take in persist_directory.
+
+        Args:
+            num_probe_queries: Number of stored embeddings used as probe queries to measure
+                               search latency before and after compaction.
+
+        Raises:
+            VectoreStoreSavingError: If saving the vector store fails.
+
+        Returns:
+            compaction.CompactionReport: Document count, persist directory size and probe query
+                                         latency before and after compaction.
+        """
+        probes = [lambda embedding=embedding: self._search(embedding[np.newaxis, :], 10)
+                  for embedding in np.array(self.embeddings[:num_probe_queries])]
+
+        def rewrite() -> None:
+            if self.compression is not None and self._size > 0:
+                with self._codes_lock:
+                    self.compression.fit(np.asarray(self.embeddings))
+                    self._codes = None
+            self.save()
+
+        return compaction.run_compaction(rewrite=rewrite,
+                                         count=lambda: len(self),
+                                         persist_directories=[self.persist_directory],
+                                         probes=probes)
+
+    def get_documents(self, search_filter: Optional[SearchFilter] = None) -> List[schema.BaseDocument]:
+        """ Returns the stored documents matching an optional metadata filter, without their embeddings.
+
+        Used to rebuild derived indexes (e.g. BM25) from an existing store.
+
+        Returns:
+            List[schema.BaseDocument]: Documents in insertion order.
+        """
+        rows = range(self._size) if search_filter is None else search_filter.rows(self._columns)
+        return [self._columns.document(int(row)) for row in rows]
+
+    def _search(self,
+                query_embeddings: np.ndarray,
+                k: int,
+                search_filter: Optional[SearchFilter] = None
+                ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """Scores normalized queries against every stored row (or only the rows matching search_filter)
+        with one matrix product and keeps the top-k. With a compression, the matrix product runs
+        on the compressed codes and the candidates it keeps are rescored exactly."""
+        rows = None if search_filter is None else search_filter.rows(self._columns)
+        if self._size == 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in range(len(query_embeddings))]
+        query_embeddings = self._normalize(query_embeddings)
+        if self.compression is None:
+            candidates = self.embeddings if rows is None else self.embeddings[rows]
+            indices, top_scores = utils.top_k(query_embeddings @ candidates.T, k)
+            if rows is not None:
+                indices = rows[indices]
+        else:
+            codes = self._compressed_codes()
+            candidate_indices, _ = self.compression.search(query_embeddings, codes if rows is None else codes[rows], k * self.rescore_factor)
+            if rows is not None:
+                candidate_indices = rows[candidate_indices]
+            scores = np.einsum('qd,qcd->qc', query_embeddings, self.embeddings[candidate_indices])
+            order, top_scores = utils.top_k(scores, k)
+            indices = np.take_along_axis(candidate_indices, order, axis=1)
+        return [[(self._columns.document(index), float(score)) for index, score in zip(row_indices, row_scores)]
+                for row_indices, row_scores in zip(indices, top_scores)]
+
+    def _compressed_codes(self) -> np.ndarray:
+        """Returns the codes of the stored rows, fitting the compression at the first search and compressing rows added since."""
+        with self._codes_lock:
+            if not self.compression.is_fitted:
+                self.compression.fit(np.asarray(self.embeddings))
+            if self._codes is None:
+                self._codes = self.compression.compress(self.embeddings)
+            elif len(self._codes) < self._size:
+                self._codes = np.concatenate([self._codes, self.compression.compress(self.embeddings[len(self._codes):])])
+            return self._codes
+
+    @override
+    def similarity_search(self,
+                          query: str,
+                          k: int = 5
+                          ) -> List[schema.BaseDocument]:
+        """ Performs a cosine similarity search for a given query.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[schema.BaseDocument]: List of top-K similar documents.
+        """
+        return [document for document, _ in self.similarity_search_with_scores(query, k)]
+
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs a cosine similarity search for a given query and returns similarity scores.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, cosine similarity) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[query, k],
+            input_names=['query', 'k'],
+            required_dtypes=[str, int]
+            )
+        try:
+            logger.info(f"Searching {k} similar documents for query: {query} in NumpyVectorStore")
+            query_embedding = self.embedding_function.encode([query])
+            scored_docs = self._search(query_embeddings=query_embedding, k=k, search_filter=search_filter)[0]
+            logger.info(f"{k} similar documents for query: {query} successfully retieved from NumpyVectorStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"NumpyVectorStore failed similarity search for query: {query}"
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int = 5,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> List[Tuple[schema.BaseDocument, float]]:
+        """ Performs a similarity search for a precomputed query embedding, skipping query encoding.
+
+        Args:
+            embedding: 1D numpy array query embedding.
+            k: The number of top results to return. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `embedding` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[Tuple[schema.BaseDocument, float]]: Top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[embedding, k],
+            input_names=['embedding', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        return self.similarity_search_by_vectors(np.atleast_2d(embedding), k, search_filter)[0]
+
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int = 5,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs one batched similarity search for precomputed query embeddings, skipping query encoding.
+
+        Args:
+            embeddings: 2D numpy array of query embeddings, one row per query.
+            k: The number of top results to return per query. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `embeddings` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Per-query top-K (document, similarity score) pairs, most similar first.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings, k],
+            input_names=['embeddings', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        try:
+            logger.info(f"Searching {k} similar documents for {len(embeddings)} query embeddings in NumpyVectorStore")
+            scored_docs = self._search(query_embeddings=np.asarray(embeddings, dtype=np.float32), k=k, search_filter=search_filter)
+            logger.info(f"{k} similar documents for {len(embeddings)} query embeddings successfully retieved from NumpyVectorStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"NumpyVectorStore failed similarity search for {len(embeddings)} query embeddings."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_batch_with_scores(self,
+                                            queries: List[str],
+                                            k: int = 5,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Performs a similarity search for many queries with one encoder call and one batched search.
+
+        Args:
+            queries: The query strings to search for.
+            k: The number of top results to return per query. Defaults to 5.
+            search_filter: Optional metadata filter, applied before ranking.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Top-K (document, similarity score) pairs of every query, in query order.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        if not queries:
+            return []
+        try:
+            logger.info(f"Searching {k} similar documents for {len(queries)} queries in NumpyVectorStore")
+            query_embeddings = self.embedding_function.encode(queries)
+            scored_docs = self._search(query_embeddings=query_embeddings, k=k, search_filter=search_filter)
+            logger.info(f"{k} similar documents for {len(queries)} queries successfully retieved from NumpyVectorStore")
+            return scored_docs
+        except Exception as e:
+            msg = f"NumpyVectorStore failed batch similarity search for {len(queries)} queries."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    @override
+    def save(self) -> None:
+        """ Saves embeddings as a .npy file and metadata columns as JSON to persist_directory.
+
+        Both files are written next to their targets and then renamed over them, so the store
+        memory-mapped from persist_directory is never truncated while it is being read, and an
+        interrupted save leaves the previous files intact.
+        A compression is fitted if needed and saved as compression.npz.
+
+        Raises:
+            VectoreStoreSavingError: If saving the vector store fails.
+        """
+        try:
+            logger.info(f"Saving NumpyVectorStore to path: {self.persist_directory}")
+            os.makedirs(self.persist_directory, exist_ok=True)
+            embeddings_path = os.path.join(self.persist_directory, self._embeddings_file)
+            documents_path = os.path.join(self.persist_directory, self._documents_file)
+            with open(embeddings_path + '.tmp', 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.embeddings))
+            with open(documents_path + '.tmp', 'w') as f:
+                json.dump(self._columns.columns, f)
+            os.replace(embeddings_path + '.tmp', embeddings_path)
+            os.replace(documents_path + '.tmp', documents_path)
+            if self.compression is not None and self._size > 0:
+                # Fits the compression if no search did yet, so it is persisted with the embeddings
+                self._compressed_codes()
+                self.compression.save(os.path.join(self.persist_directory, self._compression_file))
+            if isinstance(self._matrix, np.memmap):
+                # Map the new file so the replaced one can be reclaimed
+                self._matrix = np.load(embeddings_path, mmap_mode='r')
+            logger.info(f"NumpyVectorStore successfully saved to {self.persist_directory}")
+        except Exception as e:
+            msg = f"NumpyVectorStore failed to save to {self.persist_directory}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreSavingError(msg) from e
+
+    @override
+    def load(self, vectorestore_path: str) -> None:
+        """ Loads the store saved in vectorestore_path, memory-mapping the embeddings if mmap is set.
+
+        Args:
+            vectorestore_path: Directory holding embeddings.npy, documents.json and, with a compression, compression.npz.
+
+        Raises:
+            TypeError: If `vectorestore_path` is not a string.
+            VectoreStoreLoadingError: If loading the vector store fails.
+        """
+        utils.validate_dtypes(
+            inputs=[vectorestore_path],
+            input_names=['vectorestore_path'],
+            required_dtypes=[str]
+        )
+        try:
+            logger.info(f"Loading NumpyVectorStore from path: {vectorestore_path}")
+            matrix = np.load(os.path.join(vectorestore_path, self._embeddings_file), mmap_mode='r' if self.mmap else None)
+            with open(os.path.join(vectorestore_path, self._documents_file)) as f:
+                columns = json.load(f)
+            compression_path = os.path.join(vectorestore_path, self._compression_file)
+            if self.compression is not None and os.path.exists(compression_path):
+                self.compression.load(compression_path)
+            self._matrix = matrix
+            self._size = matrix.shape[0]
+            self._columns = DocumentColumns(columns)
+            self._codes = None
+            self.persist_directory = vectorestore_path
+            logger.info(f"NumpyVectorStore successfully loaded from {vectorestore_path}")
+        except Exception as e:
+            msg = f"NumpyVectorStore failed to load from {vectorestore_path}."
+            logger.exception(msg)
+            raise vectore_store_exceptions.VectoreStoreLoadingError(msg) from e
@@ -0,0 +1,103 @@
+"""Metadata filters applied inside vector store indexes before ranking."""
+
+from typing import Any, Dict, List, Optional, Sequence
+import bisect
+
+import pydantic
+import numpy as np
+
+from VectorStore.document_columns import DocumentColumns
+
+
+def prefix_matches(sorted_values: Sequence[str], prefix: str) -> List[str]:
+    """Returns the values of a sorted sequence starting with prefix, using binary search."""
+    start = bisect.bisect_left(sorted_values, prefix)
+    end = start
+    while end < len(sorted_values) and sorted_values[end].startswith(prefix):
+        end += 1
+    return list(sorted_values[start:end])
+
+
+class SearchFilter(pydantic.BaseModel):
+    """ Conjunction of metadata conditions restricting which documents a similarity search may return.
+
+    Unset conditions are ignored. Documents missing publication_date never match a date condition.
+
+    Attributes:
+        type: Document type to keep (e.g. 'image').
+        source_url: Keeps documents whose source_url is exactly this URL.
+        source_url_prefix: Keeps documents whose source_url starts with this prefix.
+        published_after: Keeps documents published on or after this YYYYMMDD date.
+        published_before: Keeps documents published on or before this YYYYMMDD date.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+    """
+    type: Optional[str] = pydantic.Field(default=None)
+    source_url: Optional[str] = pydantic.Field(default=None)
+    source_url_prefix: Optional[str] = pydantic.Field(default=None)
+    published_after: Optional[int] = pydantic.Field(default=None)
+    published_before: Optional[int] = pydantic.Field(default=None)
+
+    @property
+    def is_empty(self) -> bool:
+        return (self.type is None and self.source_url is None and self.source_url_prefix is None
+                and self.published_after is None and self.published_before is None)
+
+    def _matches_date(self, publication_date: Optional[int]) -> bool:
+        if publication_date is None:
+            return False
+        if self.published_after is not None and publication_date < self.published_after:
+            return False
+        if self.published_before is not None and publication_date > self.published_before:
+            return False
+        return True
+
+    def rows(self, columns: DocumentColumns) -> Optional[np.ndarray]:
+        """ Returns the sorted row indices of the columns matching the filter, or None if the filter is empty.
+
+        Conditions are evaluated once per distinct column value through the columns' value index,
+        not once per row.
+        """
+        if self.is_empty:
+            return None
+        rows = np.arange(len(columns))
+        if self.type is not None:
+            rows = np.intersect1d(rows, columns.rows_matching('type', lambda value: value == self.type), assume_unique=True)
+        if self.source_url is not None:
+            rows = np.intersect1d(rows, columns.rows_matching('source_url', lambda value: value == self.source_url), assume_unique=True)
+        if self.source_url_prefix is not None:
+            rows = np.intersect1d(rows, columns.rows_matching(
+                'source_url', lambda value: value is not None and value.startswith(self.source_url_prefix)), assume_unique=True)
+        if self.published_after is not None or self.published_before is not None:
+            rows = np.intersect1d(rows, columns.rows_matching('publication_date', self._matches_date), assume_unique=True)
+        return rows
+
+    def to_chroma_where(self, source_urls: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """ Translates the filter into a Chroma `where` clause.
+
+        Chroma has no string prefix operator, so the source_url prefix is resolved against the
+        sorted distinct source URLs of the collection into an `$in` condition.
+
+        Args:
+            source_urls: Sorted distinct source URLs stored in the collection.
+
+        Returns:
+            Optional[Dict[str, Any]]: The where clause, or None if the filter is empty.
+        """
+        clauses = []
+        if self.type is not None:
+            clauses.append({'type': self.type})
+        if self.source_url is not None:
+            clauses.append({'source_url': self.source_url})
+        if self.source_url_prefix is not None:
+            clauses.append({'source_url': {'$in': prefix_matches(source_urls, self.source_url_prefix)}})
+        if self.published_after is not None:
+            clauses.append({'publication_date': {'$gte': self.published_after}})
+        if self.published_before is not None:
+            clauses.append({'publication_date': {'$lte': self.published_before}})
+        if not clauses:
+            return None
+        if len(clauses) == 1:
+            return clauses[0]
+        return {'$and': clauses}
@@ -0,0 +1,354 @@
+"""Sharded VectorStore partitioning documents over several VectorStoreI shards, searched in parallel."""
+
+from typing import Optional, List, Tuple, Iterable, Literal, Dict
+from typing_extensions import override
+from concurrent.futures import ThreadPoolExecutor
+import itertools
+import hashlib
+import bisect
+import heapq
+import os
+
+import pydantic
+import numpy as np
+
+import Schema.schema as schema
+from Embedding.text_embedding import TextEmbeddingI
+from VectorStore import bulk_insert
+from VectorStore import compaction
+from VectorStore.base_vector_store import VectorStoreI
+from VectorStore.search_filter import SearchFilter
+from Internals import utils
+from Internals.logger import logger
+from CustomExceptions import vectore_store_exceptions
+
+ScoredDocuments = List[Tuple[schema.BaseDocument, float]]
+
+
+class ShardedVectorStore(pydantic.BaseModel, VectorStoreI):
+    """Vector Store partitioning documents over N shards, each one an independent VectorStoreI.
+
+    Documents are assigned to shards either by a stable hash of their id, which spreads them
+    evenly, or by publication date ranges, which keeps old shards immutable and lets date filters
+    skip whole shards. A query is embedded once, searched on every relevant shard concurrently on
+    a thread pool, and the per-shard top-k lists (already sorted by similarity) are merged with a
+    heap. Shards must use the same embedding space so their similarity scores are comparable.
+
+    Attributes:
+        shards: Shard vector stores. Shard i is persisted in persist_directory/shard_<i>.
+        embedding_function: Text embedding used to encode queries once for all shards.
+        persist_directory: Root directory of the shards.
+        sharding: 'hash' to assign documents by id hash, 'time' to assign them by publication date.
+        time_boundaries: For 'time' sharding, sorted YYYYMMDD dates splitting the shards: shard i
+                         holds documents published in [time_boundaries[i - 1], time_boundaries[i]).
+                         Requires len(shards) - 1 boundaries. Undated documents go to shard 0.
+        max_workers: Size of the search thread pool. Defaults to the number of shards.
+
+    Raises:
+        ValidationError: If attribute does not match expected data type.
+        VectoreStoreInitializationError: If the sharding configuration is invalid.
+    """
+    model_config = pydantic.ConfigDict(arbitrary_types_allowed=True)
+    shards: List[VectorStoreI] = pydantic.Field(min_length=1)
+    embedding_function: TextEmbeddingI
+    persist_directory: str
+    sharding: Literal['hash', 'time'] = pydantic.Field(default='hash')
+    time_boundaries: List[int] = pydantic.Field(default_factory=list)
+    max_workers: Optional[int] = pydantic.Field(default=None, gt=0)
+    _executor: Optional[ThreadPoolExecutor] = pydantic.PrivateAttr(default=None)
+
+    def model_post_init(self, context):
+        if self.sharding == 'time' and len(self.time_boundaries) != len(self.shards) - 1:
+            msg = (f"Time sharding requires len(shards) - 1 time boundaries. "
+                   f"Got {len(self.time_boundaries)} boundaries for {len(self.shards)} shards.")
+            logger.error(msg)
+            raise vectore_store_exceptions.VectoreStoreInitializationError(msg)
+        if self.time_boundaries != sorted(self.time_boundaries):
+            msg = f"time_boundaries must be sorted. Got instead: {self.time_boundaries}"
+            logger.error(msg)
+            raise vectore_store_exceptions.VectoreStoreInitializationError(msg)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers or len(self.shards),
+                                            thread_name_prefix='shard-search')
+
+    def shard_directory(self, shard_index: int) -> str:
+        """Returns the persist directory of shard shard_index."""
+        return os.path.join(self.persist_directory, f'shard_{shard_index}')
+
+    def shard_of(self, document: schema.BaseDocument) -> int:
+        """Returns the index of the shard a document is assigned to."""
+        if self.sharding == 'time':
+            if document.publication_date is None:
+                return 0
+            return bisect.bisect_right(self.time_boundaries, document.publication_date)
+        # Stable across processes, unlike the salted built-in hash
+        digest = hashlib.md5(document.id.encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'little') % len(self.shards)
+
+    def _shards_for(self, search_filter: Optional[SearchFilter]) -> List[int]:
+        """Returns the shards that may hold documents matching search_filter, pruning time shards outside the date range."""
+        if self.sharding != 'time' or search_filter is None:
+            return list(range(len(self.shards)))
+        first, last = 0, len(self.shards) - 1
+        if search_filter.published_after is not None:
+            first = bisect.bisect_right(self.time_boundaries, search_filter.published_after)
+        if search_filter.published_before is not None:
+            last = bisect.bisect_right(self.time_boundaries, search_filter.published_before)
+        return list(range(first, last + 1))
+
+    def clean(self) -> None:
+        """Clears every shard."""
+        for shard in self.shards:
+            shard.clean()
+
+    @override
+    def add_documents(self,
+                      documents: list[schema.BaseDocument],
+                      embeddings: np.ndarray
+                      ) -> None:
+        """ Splits documents and their embeddings by shard and adds each part to its shard concurrently.
+
+        Args:
+            documents: List of BaseDocument instances to store.
+            embeddings: 2D numpy array of embedding vectors corresponding to the documents.
+
+        Raises:
+            TypeError: If embeddings are not a numpy ndarray.
+            DocumentAdditionError: If documents cannot be added.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings],
+            input_names=['embeddings'],
+            required_dtypes=[np.ndarray]
+            )
+        try:
+            logger.info(f"Adding {len(documents)} documents to ShardedVectorStore.")
+            rows_by_shard: Dict[int, List[int]] = {}
+            for row, document in enumerate(documents):
+                rows_by_shard.setdefault(self.shard_of(document), []).append(row)
+            additions = [self._executor.submit(self.shards[shard_index].add_documents,
+                                               [documents[row] for row in rows],
+                                               embeddings[rows])
+                         for shard_index, rows in rows_by_shard.items()]
+            for addition in additions:
+                addition.result()
+            logger.info(f"Documents successfully added to {len(rows_by_shard)} shards.")
+        except Exception as e:
+            msg = "ShardedVectorStore failed document addition."
+            logger.exception(msg)
+            raise vectore_store_exceptions.DocumentAdditionError(msg) from e
+
+    def rebuild_shard(self,
+                      shard_index: int,
+                      batches: Iterable[bulk_insert.DocumentBatch],
+                      pipelined: bool = True
+                      ) -> bulk_insert.BulkInsertReport:
+        """ Clears one shard and refills it from (documents, embeddings) batches, leaving the other shards untouched.
+
+        Args:
+            shard_index: Index of the shard to rebuild.
+            batches: Iterable of (documents, embeddings) batches. Every document must belong to the shard.
+            pipelined: Whether to embed the next batch while the current one is inserted.
+
+        Raises:
+            IndexError: If shard_index is out of range.
+            ValueError: If a document belongs to another shard.
+            DocumentAdditionError: If documents cannot be added.
+
+        Returns:
+            bulk_insert.BulkInsertReport: Insertion report of the rebuilt shard.
+        """
+        shard = self.shards[shard_index]
+
+        def add_to_shard(documents: List[schema.BaseDocument], embeddings: np.ndarray) -> None:
+            misplaced = [document.id for document in documents if self.shard_of(document) != shard_index]
+            if misplaced:
+                raise ValueError(f"Documents {misplaced[:5]} do not belong to shard {shard_index}.")
+            shard.add_documents(documents, embeddings)
+
+        logger.info(f"Rebuilding shard {shard_index} of ShardedVectorStore.")
+        shard.clean()
+        report = bulk_insert.stream_documents(add_documents=add_to_shard, batches=batches, pipelined=pipelined)
+        shard.save()
+        logger.info(f"Shard {shard_index} successfully rebuilt.")
+        return report
+
+    def delete_by_ids(self, ids: List[str]) -> int:
+        """ Deletes documents by id from every shard. Unknown ids are ignored.
+
+        Args:
+            ids: Ids of the documents to delete.
+
+        Raises:
+            TypeError: If `ids` is not a list.
+            VectoreStoreCleaningError: If deletion fails in a shard.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        utils.validate_dtypes(
+            inputs=[ids],
+            input_names=['ids'],
+            required_dtypes=[list]
+            )
+        return sum(shard.delete_by_ids(ids) for shard in self.shards)
+
+    def _delete_where(self, search_filter: SearchFilter) -> int:
+        """Deletes the documents matching a non-empty metadata filter from the shards that may hold them."""
+        return sum(self.shards[shard_index].delete_where(search_filter) for shard_index in self._shards_for(search_filter))
+
+    def compact(self, num_probe_queries: int = 20) -> compaction.CompactionReport:
+        """ Compacts every shard, one at a time, and sums up their reports.
+
+        Args:
+            num_probe_queries: Number of probe queries per shard, see the compact method of the shards.
+
+        Raises:
+            VectoreStoreSavingError: If a shard fails to compact.
+
+        Returns:
+            compaction.CompactionReport: Summed document counts, sizes and rewrite times of the
+                                         shards, with the slowest shard's probe query latencies.
+        """
+        logger.info(f"Compacting {len(self.shards)} shards of ShardedVectorStore.")
+        report = compaction.CompactionReport()
+        for shard in self.shards:
+            shard_report = shard.compact(num_probe_queries)
+            report.num_documents_before += shard_report.num_documents_before
+            report.num_documents_after += shard_report.num_documents_after
+            report.size_bytes_before += shard_report.size_bytes_before
+            report.size_bytes_after += shard_report.size_bytes_after
+            report.elapsed_seconds += shard_report.elapsed_seconds
+            report.query_latency_ms_before = max(report.query_latency_ms_before, shard_report.query_latency_ms_before)
+            report.query_latency_ms_after = max(report.query_latency_ms_after, shard_report.query_latency_ms_after)
+        return report
+
+    def _merge(self, shard_results: List[ScoredDocuments], k: int) -> ScoredDocuments:
+        """Merges per-shard (document, score) lists, each sorted by decreasing score, into the global top-k with a heap."""
+        return list(itertools.islice(heapq.merge(*shard_results, key=lambda scored_doc: -scored_doc[1]), k))
+
+    def similarity_search_by_vectors(self,
+                                     embeddings: np.ndarray,
+                                     k: int = 5,
+                                     search_filter: Optional[SearchFilter] = None
+                                     ) -> List[ScoredDocuments]:
+        """ Searches the relevant shards concurrently with precomputed query embeddings and merges their top-k.
+
+        Args:
+            embeddings: 2D numpy array of query embeddings, one row per query.
+            k: The number of top results to return per query. Defaults to 5.
+            search_filter: Optional metadata filter, applied inside every shard.
+
+        Raises:
+            TypeError: If `embeddings` is not a numpy ndarray or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[List[Tuple[schema.BaseDocument, float]]]: Per-query top-K (document, similarity score) pairs, best first.
+        """
+        utils.validate_dtypes(
+            inputs=[embeddings, k],
+            input_names=['embeddings', 'k'],
+            required_dtypes=[np.ndarray, int]
+            )
+        try:
+            shard_indices = self._shards_for(search_filter)
+            logger.info(f"Searching {k} documents for {len(embeddings)} queries in {len(shard_indices)} shards")
+            searches = [self._executor.submit(self.shards[shard_index].similarity_search_by_vectors,
+                                              embeddings, k, search_filter=search_filter)
+                        for shard_index in shard_indices]
+            shard_results = [search.result() for search in searches]
+            return [self._merge([results[query_index] for results in shard_results], k)
+                    for query_index in range(len(embeddings))]
+        except Exception as e:
+            msg = f"ShardedVectorStore failed similarity search for {len(embeddings)} queries."
+            logger.exception(msg)
+            raise vectore_store_exceptions.SimilaritySerachError(msg) from e
+
+    def similarity_search_by_vector(self,
+                                    embedding: np.ndarray,
+                                    k: int = 5,
+                                    search_filter: Optional[SearchFilter] = None
+                                    ) -> ScoredDocuments:
+        """Searches all shards with one precomputed query embedding, see similarity_search_by_vectors."""
+        return self.similarity_search_by_vectors(np.asarray(embedding).reshape(1, -1), k, search_filter=search_filter)[0]
+
+    def similarity_search_with_scores(self,
+                                      query: str,
+                                      k: int = 5,
+                                      search_filter: Optional[SearchFilter] = None
+                                      ) -> ScoredDocuments:
+        """ Embeds the query once and searches all shards, see similarity_search_by_vectors.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+        """
+        utils.validate_dtypes(
+            inputs=[query, k],
+            input_names=['query', 'k'],
+            required_dtypes=[str, int]
+            )
+        return self.similarity_search_by_vector(self.embedding_function.encode([query])[0], k, search_filter=search_filter)
+
+    @override
+    def similarity_search(self,
+                          query: str,
+                          k: int = 5
+                          ) -> List[schema.BaseDocument]:
+        """ Performs a similarity search over all shards for a given query.
+
+        Args:
+            query: The query string to search for.
+            k: The number of top results to return. Defaults to 5.
+
+        Raises:
+            TypeError: If `query` is not a string or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+
+        Returns:
+            List[schema.BaseDocument]: List of top-K documents most similar to the query.
+        """
+        return [document for document, _ in self.similarity_search_with_scores(query, k)]
+
+    def similarity_search_batch_with_scores(self,
+                                            queries: List[str],
+                                            k: int = 5,
+                                            search_filter: Optional[SearchFilter] = None
+                                            ) -> List[List[Tuple[schema.BaseDocument, float]]]:
+        """ Embeds all queries in one encoder call and searches all shards, see similarity_search_by_vectors.
+
+        Raises:
+            TypeError: If `queries` is not a list or `k` is not an integer.
+            SimilaritySerachError: If similarity search fails.
+        """
+        utils.validate_dtypes(
+            inputs=[queries, k],
+            input_names=['queries', 'k'],
+            required_dtypes=[list, int]
+            )
+        if not queries:
+            return []
+        return self.similarity_search_by_vectors(self.embedding_function.encode(queries), k, search_filter=search_filter)
+
+    @override
+    def save(self) -> None:
+        """Saves every shard to its persist directory."""
+        for shard in self.shards:
+            shard.save()
+
+    @override
+    def load(self, vectorestore_path: str) -> None:
+        """ Loads shard i from vectorestore_path/shard_<i>.
+
+        Raises:
+            TypeError: If `vectorestore_path` is not a string.
+            VectoreStoreLoadingError: If loading a shard fails.
+        """
+        utils.validate_dtypes(
+            inputs=[vectorestore_path],
+            input_names=['vectorestore_path'],
+            required_dtypes=[str]
+        )
+        self.persist_directory = vectorestore_path
+        for shard_index, shard in enumerate(self.shards):
+            shard.load(self.shard_directory(shard_index))
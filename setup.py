@@ -8,4 +8,6 @@ setup(
     url="https://github.com/NazarLenyshyn6/MultimodalRAGSystem",
     packages=find_packages(), 
     python_requires=">=3.7",
+    # Optional in-process LLM backend (LLM_BACKEND = "llama_cpp"): pip install .[llama_cpp]
+    extras_require={"llama_cpp": ["llama_cpp_python==0.3.9"]},
 )
\ No newline at end of file
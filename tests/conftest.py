@@ -0,0 +1,34 @@
+"""Shared fixtures: deterministic embeddings and documents so the vector stores run without any model."""
+
+from typing import List
+import hashlib
+
+import numpy as np
+import pytest
+
+from Embedding.text_embedding import TextEmbeddingI
+from Schema.schema import TextDocument
+
+
+class HashTextEmbedding(TextEmbeddingI):
+    """Maps every sentence to a fixed pseudo-random vector seeded by its hash, counting encoder calls."""
+
+    def __init__(self, dim: int = 16):
+        self.dim = dim
+        self.num_calls = 0
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        self.num_calls += 1
+        return np.vstack([np.random.default_rng(int(hashlib.md5(sentence.encode()).hexdigest()[:8], 16)).normal(size=self.dim)
+                          for sentence in sentences]).astype(np.float32)
+
+
+@pytest.fixture
+def embedding_function() -> HashTextEmbedding:
+    return HashTextEmbedding()
+
+
+@pytest.fixture
+def text_documents() -> List[TextDocument]:
+    return [TextDocument(id=str(index), content=f"text {index}", source_url=f"https://example.com/{index % 3}")
+            for index in range(50)]
@@ -0,0 +1,17 @@
+from LLM.answer_cache import SemanticAnswerCache
+from LLM.rag_llm import OllamaRAGLLM
+
+
+def test_missed_query_is_embedded_once_for_lookup_and_store(embedding_function, text_documents):
+    answer_cache = SemanticAnswerCache(embedding_function=embedding_function)
+    answer_cache.store("what is text 1", ['1', '2'], "an answer")
+    rag_llm = OllamaRAGLLM.model_construct(answer_cache=answer_cache)
+    scored_docs = [(text_documents[1], 1.0), (text_documents[2], 0.5)]
+    num_calls = embedding_function.num_calls
+
+    cached_answer, query_embedding = rag_llm._cached_answer("tell me about text 2", scored_docs)
+    rag_llm._cache_answer("tell me about text 2", scored_docs, "another answer", query_embedding)
+
+    assert cached_answer is None
+    assert embedding_function.num_calls == num_calls + 1
+    assert answer_cache.lookup("Tell me about text 2?", ['1', '2']) == "another answer"
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Schema.schema import TextDocument
+from VectorStore.bm25_index import BM25Index
+from VectorStore.search_filter import SearchFilter
+from CustomExceptions.vectore_store_exceptions import VectoreStoreSavingError
+
+
+def test_searches_stay_consistent_while_documents_are_added(tmp_path, text_documents):
+    index = BM25Index(persist_directory=str(tmp_path))
+    index.add_documents(text_documents)
+    new_documents = [TextDocument(id=f"new {batch} {row}", content=f"fresh {batch}-{row}", source_url="https://example.com/1")
+                     for batch in range(100) for row in range(20)]
+
+    def add(batch):
+        index.add_documents(new_documents[batch * 20: (batch + 1) * 20])
+
+    def search(_):
+        return index.search_batch(["text 7", "fresh"], 5, search_filter=SearchFilter(source_url="https://example.com/1"))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        additions = [executor.submit(add, batch) for batch in range(100)]
+        searches = [executor.submit(search, attempt) for attempt in range(200)]
+        for future in additions + searches:
+            future.result()
+
+    assert len(index) == len(text_documents) + len(new_documents)
+    assert index.search("text 7", 1)[0][0].id == '7'
+
+
+def test_interrupted_save_keeps_the_previous_files(tmp_path, text_documents, monkeypatch):
+    index = BM25Index(persist_directory=str(tmp_path))
+    index.add_documents(text_documents[:10])
+    index.save()
+    index.add_documents(text_documents[10:])
+
+    def failing_dump(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr('VectorStore.bm25_index.json.dump', failing_dump)
+    with pytest.raises(VectoreStoreSavingError):
+        index.save()
+    monkeypatch.undo()
+
+    reloaded = BM25Index(persist_directory=str(tmp_path))
+    assert len(reloaded) == 10
+    assert reloaded.search("text 7", 1)[0][0].id == '7'
@@ -0,0 +1,38 @@
+from Internals.adapters import ChromaTextEmbeddingAdapter
+from VectorStore.chroma_vector_store import ChromaVectorStore
+
+
+def _store(persist_directory, embedding_function):
+    return ChromaVectorStore(collection_name='documents',
+                             embedding_function=ChromaTextEmbeddingAdapter(embedding_function=embedding_function),
+                             persist_directory=str(persist_directory),
+                             collection_metadata={'hnsw:space': 'cosine'})
+
+
+def test_compact_swaps_in_rebuilt_collection(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function)
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+    store.delete_by_ids(['1', '2'])
+
+    report = store.compact(num_probe_queries=5)
+
+    assert report.num_documents_before == report.num_documents_after == 48
+    names = {getattr(collection, 'name', collection) for collection in store.vectorstore._client.list_collections()}
+    assert names == {'documents'}
+    assert store.vectorstore._collection.metadata['hnsw:space'] == 'cosine'
+    assert store.similarity_search("text 30", 1)[0].id == '30'
+
+
+def test_interrupted_compaction_is_completed_on_load(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function)
+    client = store.vectorstore._client
+    compacting = client.create_collection(name='documents-compacting', metadata={'hnsw:space': 'cosine'})
+    compacting.add(ids=[document.id for document in text_documents],
+                   embeddings=embedding_function.encode([document.content for document in text_documents]),
+                   documents=[document.content for document in text_documents],
+                   metadatas=[document.metadata for document in text_documents])
+
+    store.load(str(tmp_path))
+
+    assert store.vectorstore._collection.count() == 50
+    assert store._get_collection('documents-compacting') is None
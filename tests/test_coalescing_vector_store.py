@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pydantic
+import pytest
+
+from VectorStore.numpy_vector_store import NumpyVectorStore
+from VectorStore.coalescing_vector_store import CoalescingVectorStore
+from VectorStore.search_filter import SearchFilter
+
+
+class SlowNumpyVectorStore(NumpyVectorStore):
+    """NumpyVectorStore whose batched searches take a fixed extra latency."""
+
+    def similarity_search_batch_with_scores(self, queries, k=5, search_filter=None):
+        time.sleep(0.1)
+        return super().similarity_search_batch_with_scores(queries, k, search_filter=search_filter)
+
+
+class RecordingNumpyVectorStore(NumpyVectorStore):
+    """NumpyVectorStore recording the queries of every batched search."""
+    _batches: list = pydantic.PrivateAttr(default_factory=list)
+
+    def similarity_search_batch_with_scores(self, queries, k=5, search_filter=None):
+        self._batches.append(list(queries))
+        return super().similarity_search_batch_with_scores(queries, k, search_filter=search_filter)
+
+
+def _store(tmp_path, embedding_function, text_documents, store_class=NumpyVectorStore):
+    store = store_class(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+    return store
+
+
+def test_coalesced_results_match_direct_search(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents)
+    coalescing_store = CoalescingVectorStore(vectorstore=store)
+    queries = [f"text {index}" for index in range(16)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda query: coalescing_store.similarity_search_with_scores(query, 3), queries))
+    coalescing_store.close()
+    for scored_docs, query in zip(results, queries):
+        expected = store.similarity_search_with_scores(query, 3)
+        assert [document.id for document, _ in scored_docs] == [document.id for document, _ in expected]
+        assert [score for _, score in scored_docs] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+
+def test_groups_of_a_batch_are_searched_concurrently(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents, store_class=SlowNumpyVectorStore)
+    coalescing_store = CoalescingVectorStore(vectorstore=store, batch_window_ms=20, max_wait_ms=50)
+    searches = [lambda: coalescing_store.similarity_search_with_scores("text 1", 20),
+                lambda: coalescing_store.similarity_search_with_scores("text 1", 5, search_filter=SearchFilter(source_url="https://example.com/1"))]
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        for future in [executor.submit(search) for search in searches]:
+            future.result()
+    elapsed = time.perf_counter() - started_at
+    coalescing_store.close()
+    assert coalescing_store.stats.num_batches == 2
+    assert elapsed < 0.19
+
+
+def test_batched_searches_share_the_dispatcher_queue(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents)
+    coalescing_store = CoalescingVectorStore(vectorstore=store, batch_window_ms=20, max_wait_ms=100)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        batched = executor.submit(coalescing_store.similarity_search_batch_with_scores, ["text 1", "text 2", "text 3"], 3)
+        single = executor.submit(coalescing_store.similarity_search_with_scores, "text 4", 3)
+        results = batched.result() + [single.result()]
+    coalescing_store.close()
+    assert coalescing_store.stats.num_queries == 4
+    assert coalescing_store.stats.num_batches == 1
+    for scored_docs, query in zip(results, ["text 1", "text 2", "text 3", "text 4"]):
+        assert [document.id for document, _ in scored_docs] == [document.id for document in store.similarity_search(query, 3)]
+
+
+def test_failed_batch_fails_its_searches_and_keeps_dispatching(tmp_path, embedding_function, text_documents, monkeypatch):
+    store = _store(tmp_path, embedding_function, text_documents)
+    coalescing_store = CoalescingVectorStore(vectorstore=store)
+
+    def failing_run_batch(self, batch, group_executor):
+        raise RuntimeError("cannot schedule new futures after shutdown")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(CoalescingVectorStore, '_run_batch', failing_run_batch)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            search = executor.submit(coalescing_store.similarity_search_with_scores, "text 1", 3)
+            with pytest.raises(RuntimeError):
+                search.result(timeout=5)
+    scored_docs = coalescing_store.similarity_search_with_scores("text 1", 3)
+    coalescing_store.close()
+    assert [document.id for document, _ in scored_docs] == [document.id for document in store.similarity_search("text 1", 3)]
+
+
+def test_batched_queries_are_never_split_across_batches(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents, store_class=RecordingNumpyVectorStore)
+    coalescing_store = CoalescingVectorStore(vectorstore=store, batch_window_ms=50, max_batch_size=3, max_wait_ms=200)
+    variants = ["text 1", "text 2", "text 3"]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        single = executor.submit(coalescing_store.similarity_search_with_scores, "text 4", 3)
+        time.sleep(0.01)
+        batched = executor.submit(coalescing_store.similarity_search_batch_with_scores, variants, 3)
+        results = batched.result()
+        single.result()
+    coalescing_store.close()
+    assert store._batches == [["text 4"], variants]
+    assert coalescing_store.stats.num_queries == 4
+    for scored_docs, query in zip(results, variants):
+        assert [document.id for document, _ in scored_docs] == [document.id for document in store.similarity_search(query, 3)]
+
+
+def test_wrapper_inherits_streaming_and_the_delete_where_guard(tmp_path, embedding_function, text_documents):
+    store = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    coalescing_store = CoalescingVectorStore(vectorstore=store)
+    embeddings = embedding_function.encode([document.content for document in text_documents])
+
+    report = coalescing_store.add_documents_stream([(text_documents[:25], embeddings[:25]), (text_documents[25:], embeddings[25:])])
+
+    assert report.num_documents == 50
+    with pytest.raises(ValueError):
+        coalescing_store.delete_where(SearchFilter())
+    assert coalescing_store.delete_where(SearchFilter(source_url='https://example.com/0')) == 17
+    assert [len(documents) for documents in coalescing_store.similarity_search_batch(["text 1", "text 2"], 3)] == [3, 3]
+    coalescing_store.close()
@@ -0,0 +1,11 @@
+from LLM.context_builder import ApproximateTokenCounter, HFTokenCounter
+
+
+def test_unavailable_tokenizer_falls_back_to_approximate_counts(tmp_path, monkeypatch):
+    monkeypatch.setenv('HF_HUB_OFFLINE', '1')
+    token_counter = HFTokenCounter(tokenizer_name_or_path=str(tmp_path / 'missing-tokenizer'))
+
+    token_counter.load_tokenizer()
+
+    texts = ["a short text", "a somewhat longer text to count"]
+    assert token_counter.count(texts) == ApproximateTokenCounter().count(texts)
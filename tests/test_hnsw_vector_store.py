@@ -0,0 +1,54 @@
+from VectorStore.hnsw_vector_store import HNSWVectorStore
+from VectorStore.search_filter import SearchFilter
+
+
+def _store(persist_directory, embedding_function, text_documents):
+    store = HNSWVectorStore(embedding_function=embedding_function, persist_directory=str(persist_directory))
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+    return store
+
+
+def _ids(results):
+    return {document.id for document, _ in results}
+
+
+def test_deleted_documents_are_not_returned_after_reload(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents)
+    assert store.delete_by_ids(['1', '2', 'missing']) == 2
+    assert store.delete_where(SearchFilter(source_url='https://example.com/1')) == 16
+    store.save()
+
+    reloaded = HNSWVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    assert len(reloaded) == 32
+    assert not _ids(reloaded.similarity_search_with_scores("text 1", 50)) & {'1', '2', '4'}
+    filtered = reloaded.similarity_search_with_scores("text 1", 50, search_filter=SearchFilter(source_url='https://example.com/2'))
+    assert _ids(filtered) == {str(index) for index in range(50) if index % 3 == 2 and index != 2}
+
+
+def test_compact_drops_deleted_nodes_and_keeps_live_documents(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents)
+    store.delete_by_ids([str(index) for index in range(25)])
+
+    report = store.compact(num_probe_queries=5)
+
+    assert report.num_documents_before == report.num_documents_after == 25
+    assert store._deleted_rows == [] and len(store._columns) == 25
+    reloaded = HNSWVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    assert _ids(reloaded.similarity_search_with_scores("text 30", 50)) == {str(index) for index in range(25, 50)}
+    assert reloaded.similarity_search("text 30", 1)[0].id == '30'
+
+
+def test_searches_only_raise_ef_until_ef_search_is_assigned(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents)
+    store.ef_search = 8
+    assert store._index.ef == 8
+
+    store.similarity_search_with_scores("text 1", 40)
+    store.similarity_search_with_scores("text 1", 5)
+    assert store._index.ef == 40
+
+    store.ef_search = 16
+    assert store._index.ef == 16
+    store.save()
+    reloaded = HNSWVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path), ef_search=12)
+    assert reloaded._index.ef == 12
@@ -0,0 +1,24 @@
+import os
+
+import pytest
+
+from VectorStore.bm25_index import BM25Index
+from VectorStore.hnsw_vector_store import HNSWVectorStore
+from VectorStore.hybrid_retriever import HybridRetriever
+from VectorStore.numpy_vector_store import NumpyVectorStore
+from VectorStore.search_filter import SearchFilter
+
+
+@pytest.mark.parametrize('store_class', [NumpyVectorStore, HNSWVectorStore])
+def test_delete_keeps_dense_store_and_bm25_in_sync(tmp_path, embedding_function, text_documents, store_class):
+    retriever = HybridRetriever(
+        vectorstore=store_class(embedding_function=embedding_function, persist_directory=os.path.join(tmp_path, 'dense')),
+        bm25_index=BM25Index(persist_directory=os.path.join(tmp_path, 'bm25')))
+    retriever.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+
+    assert retriever.delete_by_ids(['1', '2']) == 2
+    assert retriever.delete_where(SearchFilter(source_url='https://example.com/0')) == 17
+    retriever.compact(num_probe_queries=5)
+
+    assert len(retriever.vectorstore) == len(retriever.bm25_index) == 31
+    assert not {document.id for document in retriever.similarity_search("text 1", 50)} & {'0', '1', '2', '3'}
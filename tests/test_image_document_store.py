@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from Schema.schema import ImageDocument
+from VectorStore.image_document_store import ImageDocumentStore
+
+
+def _image_document(index):
+    return ImageDocument(id=str(index), content=f"caption {index}", image_bytes=f"image {index}".encode() * 100,
+                         source_url="https://example.com/0", image_url=f"https://example.com/{index}.png")
+
+
+def test_reads_stay_valid_while_documents_are_added(tmp_path):
+    store = ImageDocumentStore(store_directory=str(tmp_path))
+    store.add_documents([_image_document(0)])
+
+    def add(index):
+        store.add_documents([_image_document(index)])
+
+    def read(_):
+        return store.get_image_bytes('0')
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        additions = [executor.submit(add, index) for index in range(1, 200)]
+        reads = [executor.submit(read, attempt) for attempt in range(2000)]
+        for future in additions:
+            future.result()
+        assert {future.result() for future in reads} == {b"image 0" * 100}
+
+    reloaded = ImageDocumentStore(store_directory=str(tmp_path))
+    assert len(reloaded) == 200
+    assert reloaded.get_image_bytes('199') == b"image 199" * 100
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from Embedding.vector_compression import PCAVectorCompression
+from VectorStore.numpy_vector_store import NumpyVectorStore
+from VectorStore.search_filter import SearchFilter
+
+
+def _store(persist_directory, embedding_function, text_documents):
+    store = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(persist_directory))
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+    return store
+
+
+def test_save_after_memory_mapped_load_keeps_embeddings(tmp_path, embedding_function, text_documents):
+    _store(tmp_path, embedding_function, text_documents).save()
+    store = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    store.load(str(tmp_path))
+    assert isinstance(store._matrix, np.memmap)
+    expected = np.array(store.embeddings)
+
+    store.save()
+    reloaded = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    reloaded.load(str(tmp_path))
+
+    np.testing.assert_array_equal(reloaded.embeddings, expected)
+    assert [document.id for document, _ in reloaded.similarity_search_with_scores("text 7", 1)] == ['7']
+
+
+def test_save_after_load_then_add(tmp_path, embedding_function, text_documents):
+    _store(tmp_path, embedding_function, text_documents[:20]).save()
+    store = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    store.load(str(tmp_path))
+    store.add_documents(text_documents[20:], embedding_function.encode([document.content for document in text_documents[20:]]))
+    store.save()
+
+    reloaded = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    reloaded.load(str(tmp_path))
+    assert len(reloaded) == len(text_documents)
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_delete_then_compact_drops_documents(tmp_path, embedding_function, text_documents):
+    store = _store(tmp_path, embedding_function, text_documents)
+    assert store.delete_by_ids(['1', '2', 'missing']) == 2
+    assert store.delete_where(SearchFilter(source_url='https://example.com/0')) == 17
+
+    report = store.compact(num_probe_queries=5)
+    reloaded = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path))
+    reloaded.load(str(tmp_path))
+
+    assert report.num_documents_after == len(reloaded) == 31
+    returned_ids = {document.id for document, _ in reloaded.similarity_search_with_scores("text 1", 50)}
+    assert not returned_ids & {'1', '2', '0', '3'}
+
+
+def test_compressed_search_matches_exact_search_and_persists_compression(tmp_path, embedding_function, text_documents):
+    exact = _store(tmp_path / 'exact', embedding_function, text_documents)
+    store = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path / 'compressed'),
+                             compression=PCAVectorCompression(n_components=8, dtype='int8'))
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+    store.save()
+
+    reloaded = NumpyVectorStore(embedding_function=embedding_function, persist_directory=str(tmp_path / 'compressed'),
+                                compression=PCAVectorCompression(n_components=8, dtype='int8'))
+    assert reloaded.compression.is_fitted
+    for query in ("text 7", "text 23"):
+        expected = exact.similarity_search_with_scores(query, 3)
+        results = reloaded.similarity_search_with_scores(query, 3)
+        assert results[0][0].id == expected[0][0].id
+        assert results[0][1] == pytest.approx(expected[0][1], abs=1e-5)
+    filtered = reloaded.similarity_search_with_scores("text 7", 50, search_filter=SearchFilter(source_url='https://example.com/1'))
+    assert {document.id for document, _ in filtered} == {str(index) for index in range(50) if index % 3 == 1}
+    reloaded.delete_by_ids(['7'])
+    assert '7' not in {document.id for document, _ in reloaded.similarity_search_with_scores("text 7", 10)}
@@ -0,0 +1,33 @@
+import threading
+
+from LLM.reranker import CrossEncoderReranker
+
+
+class BlockingCrossEncoder:
+    """Cross-encoder stand-in whose forward pass blocks until released, counting the passes run."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.num_predictions = 0
+
+    def predict(self, pairs, batch_size, show_progress_bar):
+        self.num_predictions += 1
+        self.release.wait()
+        return [float(len(document)) for _, document in pairs]
+
+
+def test_requests_past_their_budget_are_dropped(text_documents):
+    model = BlockingCrossEncoder()
+    reranker = CrossEncoderReranker.model_construct(model=model, latency_budget_ms=20.0, max_workers=1)
+    reranker.model_post_init(None)
+    scored_docs = [(document, 1.0 / (index + 1)) for index, document in enumerate(text_documents[:5])]
+
+    first = reranker.rerank("text", scored_docs, 3)
+    queued = reranker.rerank("text", scored_docs, 3)
+    model.release.set()
+    reranker._executor.shutdown(wait=True)
+
+    assert first == queued == scored_docs[:3]
+    assert model.num_predictions == 1
+    assert reranker.stats.fallbacks == 2
+    assert reranker.stats.dropped == 1
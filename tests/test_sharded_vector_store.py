@@ -0,0 +1,42 @@
+import os
+
+from VectorStore.numpy_vector_store import NumpyVectorStore
+from VectorStore.search_filter import SearchFilter
+from VectorStore.sharded_vector_store import ShardedVectorStore
+
+
+def _sharded_store(persist_directory, embedding_function, num_shards=3):
+    shards = [NumpyVectorStore(embedding_function=embedding_function,
+                               persist_directory=os.path.join(persist_directory, f'shard_{shard_index}'))
+              for shard_index in range(num_shards)]
+    return ShardedVectorStore(shards=shards, embedding_function=embedding_function, persist_directory=persist_directory)
+
+
+def test_save_load_save_load_round_trip(tmp_path, embedding_function, text_documents):
+    store = _sharded_store(str(tmp_path), embedding_function)
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+    store.save()
+    expected = store.similarity_search_with_scores("text 11", 5)
+
+    loaded = _sharded_store(str(tmp_path), embedding_function)
+    loaded.load(str(tmp_path))
+    loaded.save()
+    reloaded = _sharded_store(str(tmp_path), embedding_function)
+    reloaded.load(str(tmp_path))
+
+    results = reloaded.similarity_search_with_scores("text 11", 5)
+    assert [document.id for document, _ in results] == [document.id for document, _ in expected]
+    assert sum(len(shard) for shard in reloaded.shards) == len(text_documents)
+
+
+def test_delete_and_compact_across_shards(tmp_path, embedding_function, text_documents):
+    store = _sharded_store(str(tmp_path), embedding_function)
+    store.add_documents(text_documents, embedding_function.encode([document.content for document in text_documents]))
+
+    assert store.delete_by_ids(['1', '2', 'missing']) == 2
+    assert store.delete_where(SearchFilter(source_url='https://example.com/0')) == 17
+    report = store.compact(num_probe_queries=5)
+
+    assert report.num_documents_before == report.num_documents_after == 31
+    assert sum(len(shard) for shard in store.shards) == 31
+    assert not {document.id for document in store.similarity_search("text 1", 50)} & {'0', '1', '2', '3'}
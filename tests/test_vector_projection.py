@@ -0,0 +1,14 @@
+import numpy as np
+
+from Embedding.vector_projection import GaussianRandomVectorProjection
+
+
+def test_projection_saved_without_extension_is_reloaded(tmp_path):
+    projection_path = str(tmp_path / 'projection')
+    projection = GaussianRandomVectorProjection(target_dim=4, random_state=0, projection_path=projection_path).fit(16)
+    projection.save()
+
+    reloaded = GaussianRandomVectorProjection(target_dim=4, random_state=1, projection_path=projection_path)
+
+    assert reloaded.is_fitted
+    np.testing.assert_array_equal(reloaded.components, projection.components)